@@ -0,0 +1,267 @@
+import os
+from datetime import date, datetime
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.chart_builder import CHART_MAX_LINE_POINTS, _label, _to_float_array, _to_json_numbers, infer_chart_columns
+
+# "auto" picks per result (see choose_method); "zscore", "iqr" or "seasonal" forces one
+ANOMALY_METHOD = os.getenv("ANOMALY_METHOD", "auto").lower()
+ANOMALY_METHODS = ("zscore", "iqr", "seasonal")
+# Trailing points the rolling z-score compares each point against
+ANOMALY_WINDOW = int(os.getenv("ANOMALY_WINDOW", "60"))
+ANOMALY_Z_THRESHOLD = float(os.getenv("ANOMALY_Z_THRESHOLD", "3.0"))
+ANOMALY_IQR_K = float(os.getenv("ANOMALY_IQR_K", "1.5"))
+# At most this many anomalies (the strongest) are listed with the chart
+ANOMALY_MAX_LISTED = int(os.getenv("ANOMALY_MAX_LISTED", "50"))
+
+# A rolling window needs a few points before its std means anything
+MIN_WINDOW_POINTS = 5
+# Scales a median absolute deviation to a standard deviation for normal data
+MAD_TO_STD = 1.4826
+
+NORMAL_COLOR = "rgba(54, 162, 235, 1)"
+ANOMALY_COLOR = "rgba(255, 99, 132, 1)"
+
+
+def _prefix_sums(array: np.ndarray) -> np.ndarray:
+    return np.concatenate([[0.0], np.cumsum(array)])
+
+
+def _std_floor(values: np.ndarray) -> float:
+    """
+    Smallest rolling std used as a divisor: a small fraction of the overall std,
+    so flat stretches neither divide by zero nor turn tiny wiggles into anomalies.
+    """
+    spread = np.nanstd(values)
+    return 0.01 * spread if spread > 0 else 1e-9
+
+
+def _robust_spread(spread: float, values: np.ndarray) -> float:
+    """`spread` (an IQR or MAD), or the std when more than half the values are identical and it is 0."""
+    if spread > 0:
+        return spread
+    return np.nanstd(values) or 1.0
+
+
+def rolling_zscore(values: np.ndarray, window: int = ANOMALY_WINDOW, exclude: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Score of every point against the mean and std of the `window` points before
+    it, from prefix sums, so the cost doesn't depend on the window size.
+    Points with fewer than MIN_WINDOW_POINTS valid predecessors score 0.
+    Points in `exclude` are still scored but left out of every window.
+    """
+    valid = ~np.isnan(values)
+    baseline = valid & ~exclude if exclude is not None else valid
+    # Centering keeps the prefix sums of squares small enough to subtract precisely
+    centered = np.where(valid, values - np.nanmean(values), 0.0)
+    in_window = np.where(baseline, centered, 0.0)
+    sums, squares, counts = _prefix_sums(in_window), _prefix_sums(in_window * in_window), _prefix_sums(baseline)
+
+    index = np.arange(len(values))
+    start = np.maximum(index - window, 0)
+    count = counts[index] - counts[start]
+    total = sums[index] - sums[start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        variance = (squares[index] - squares[start] - total * mean) / (count - 1)
+        std = np.maximum(np.sqrt(np.maximum(variance, 0)), _std_floor(values))
+        scores = (centered - mean) / std
+    scores[(count < MIN_WINDOW_POINTS) | ~valid] = 0.0
+    return scores
+
+
+def iqr_scores(values: np.ndarray, k: float = ANOMALY_IQR_K) -> np.ndarray:
+    """
+    Distance outside Tukey's fences (q1 - k*IQR, q3 + k*IQR) in IQRs, signed;
+    0 for every point inside them.
+    """
+    q1, q3 = np.nanpercentile(values, [25, 75])
+    iqr = _robust_spread(q3 - q1, values)
+    outside = values - np.clip(values, q1 - k * iqr, q3 + k * iqr)
+    return np.nan_to_num(outside / iqr)
+
+
+def _decompose(values: np.ndarray, season: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Centered moving-average trend and mean seasonal profile (per phase) of `values`."""
+    valid = ~np.isnan(values)
+    sums, counts = _prefix_sums(np.where(valid, values, 0.0)), _prefix_sums(valid)
+
+    # Centered window of one season, shrunk at both ends
+    index = np.arange(len(values))
+    start = np.maximum(index - season // 2, 0)
+    end = np.minimum(index + (season - season // 2), len(values))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        trend = (sums[end] - sums[start]) / (counts[end] - counts[start])
+        detrended = values - trend
+
+        phase = index % season
+        seen = ~np.isnan(detrended)
+        profile = (
+            np.bincount(phase[seen], weights=detrended[seen], minlength=season)
+            / np.bincount(phase[seen], minlength=season)
+        )
+    return trend, np.nan_to_num(profile - np.nanmean(profile))
+
+
+def seasonal_residual_scores(values: np.ndarray, season: int, exclude: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Robust z-score of what is left after removing a centered moving-average
+    trend and the mean seasonal profile (classical additive decomposition).
+
+    Points in `exclude` are still scored, but the decomposition sees their
+    fitted value instead - dropping them would leave a season's window one
+    phase short and bias the trend of their neighbours.
+    """
+    phase = np.arange(len(values)) % season
+    fit_values = values
+    if exclude is not None:
+        trend, profile = _decompose(values, season)
+        fit_values = np.where(exclude, trend + profile[phase], values)
+    trend, profile = _decompose(fit_values, season)
+    residual = values - trend - profile[phase]
+
+    baseline = ~np.isnan(residual)
+    if exclude is not None:
+        baseline &= ~exclude
+    median = np.median(residual[baseline])
+    spread = _robust_spread(np.median(np.abs(residual[baseline] - median)) * MAD_TO_STD, residual[baseline])
+    return np.nan_to_num((residual - median) / spread)
+
+
+def _is_time_like(labels) -> bool:
+    sample = next((v for v in labels if v is not None), None)
+    return isinstance(sample, (date, datetime, np.datetime64))
+
+
+def choose_method(values: np.ndarray, time_like: bool, method: Optional[str] = None) -> Tuple[str, Optional[int]]:
+    """
+    Returns (method, season). An explicit `method` (or ANOMALY_METHOD) wins;
+    otherwise time series use seasonal residuals when a season is detected and
+    the rolling z-score when not, and category/value results use IQR fences.
+    """
+    from app.fast_forecast import detect_seasonality
+
+    method = (method or ANOMALY_METHOD).lower()
+    if method not in ANOMALY_METHODS:
+        method = "auto"
+    if method in ("zscore", "iqr"):
+        return method, None
+    if method == "auto" and not time_like:
+        return "iqr", None
+
+    season = detect_seasonality(values[~np.isnan(values)])
+    if season:
+        return "seasonal", season
+    return "zscore", None
+
+
+def detect_anomalies(values: np.ndarray, time_like: bool = True, method: Optional[str] = None) -> Dict:
+    """
+    Scores every point and flags the anomalies.
+
+    Args:
+        values (np.ndarray): The metric, in label order (NaN for missing values).
+        time_like (bool): Whether the points are ordered in time.
+        method (str): 'zscore', 'iqr' or 'seasonal'; chosen by choose_method when omitted.
+
+    Returns:
+        dict: { "method", "season", "scores" (float array), "mask" (bool array, True for anomalies) }
+    """
+    method, season = choose_method(values, time_like, method)
+    if method == "iqr":
+        scores = iqr_scores(values)
+        return {"method": method, "season": None, "scores": scores, "mask": scores != 0}
+
+    def score(exclude=None):
+        if method == "seasonal":
+            return seasonal_residual_scores(values, season, exclude)
+        return rolling_zscore(values, exclude=exclude)
+
+    scores = score()
+    mask = np.abs(scores) >= ANOMALY_Z_THRESHOLD
+    if mask.any():
+        # A spike drags its neighbours' baseline with it; rescore without the first-pass anomalies
+        scores = score(mask)
+        mask = np.abs(scores) >= ANOMALY_Z_THRESHOLD
+    return {"method": method, "season": season, "scores": scores, "mask": mask}
+
+
+def _chart_points(scores: np.ndarray, max_points: int) -> np.ndarray:
+    """
+    Indexes of at most `max_points` points to draw: the series is cut into equal
+    buckets and each keeps its highest-|score| point, so anomalies survive the
+    downsampling.
+    """
+    n = len(scores)
+    if n <= max_points:
+        return np.arange(n)
+    bucket = np.arange(n) * max_points // n
+    order = np.lexsort((-np.abs(scores), bucket))
+    firsts = np.concatenate([[0], np.flatnonzero(np.diff(bucket[order])) + 1])
+    return np.sort(order[firsts])
+
+
+def build_anomaly_chart_config(columns, values_by_column, chart_type=None, title=None, method=None, max_points=CHART_MAX_LINE_POINTS):
+    """
+    Runs anomaly detection on a columnar SQL result (e.g. ColumnarResult.values)
+    and returns a chart config with the anomalies flagged.
+
+    The label column and metric are picked like build_chart_config_from_columns
+    (first non-numeric column, first numeric series). Anomalous points get
+    ANOMALY_COLOR in the per-point color arrays; the strongest ANOMALY_MAX_LISTED
+    are also listed under "anomalies".
+
+    Args:
+        chart_type (str): 'line' or 'bar'; defaults to line for time series, bar otherwise.
+        method (str): Detection method override, see choose_method.
+        max_points (int): Points drawn at most; longer series are downsampled by _chart_points.
+
+    Returns:
+        dict or None: Chart config, or None when the result has no numeric column.
+    """
+    if not columns or not values_by_column or not len(values_by_column[0]):
+        return None
+    label_index, series_indexes = infer_chart_columns(columns, values_by_column)
+    if not series_indexes:
+        return None
+
+    labels = values_by_column[label_index]
+    metric = columns[series_indexes[0]]
+    # Missing or non-numeric values are NaN: drawn as gaps, never scored, reported as skipped
+    values = _to_float_array(values_by_column[series_indexes[0]])
+    time_like = _is_time_like(labels)
+    detection = detect_anomalies(values, time_like, method)
+    scores, mask = detection["scores"], detection["mask"]
+
+    # Only the drawn / listed points are converted back to Python values
+    drawn = _chart_points(scores, max_points)
+    flagged = np.flatnonzero(mask)
+    listed = np.sort(flagged[np.argsort(-np.abs(scores[flagged]), kind="stable")[:ANOMALY_MAX_LISTED]])
+
+    chart_type = chart_type if chart_type in ("line", "bar") else ("line" if time_like else "bar")
+    colors = np.where(mask[drawn], ANOMALY_COLOR, NORMAL_COLOR).tolist()
+    return {
+        "title": title or f"Anomalies in {metric}",
+        "xAxisData": [_label(labels[i]) for i in drawn.tolist()],
+        "seriesData": [
+            {
+                "name": metric,
+                "type": chart_type,
+                "data": _to_json_numbers(values[drawn]),
+                "backgroundColor": colors,
+                "pointBackgroundColor": colors,
+                "pointRadius": np.where(mask[drawn], 5, 2).tolist(),
+            }
+        ],
+        "anomalies": [
+            {"label": _label(labels[i]), "value": value, "score": round(float(scores[i]), 2)}
+            for i, value in zip(listed.tolist(), _to_json_numbers(values[listed]))
+        ],
+        "anomalyCount": int(mask.sum()),
+        "pointCount": len(values),
+        "skippedRows": int(np.isnan(values).sum()),
+        "method": detection["method"],
+        "season": detection["season"],
+    }
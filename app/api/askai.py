@@ -12,5 +12,5 @@ class AIRequest(BaseModel):
 
 @router.post("/ask-ai")
 async def handle_ask_ai(req: AIRequest):
-    response_text = askai(req.message)
+    response_text = await askai(req.message)
     return JSONResponse(content={"response": response_text})
\ No newline at end of file
@@ -4,7 +4,7 @@ from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from starlette.status import HTTP_302_FOUND
 from app.dependencies import get_current_user, get_db
-from app.models.user import User
+from app.identity_cache import UserIdentity
 from app.models.dashboards import Dashboard
 
 router = APIRouter()
@@ -12,7 +12,7 @@ templates = Jinja2Templates(directory="templates")
 
 
 @router.get("/dashboard/bihome", response_class=HTMLResponse)
-async def bihome_tab(request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def bihome_tab(request: Request, db: Session = Depends(get_db), current_user: UserIdentity = Depends(get_current_user)):
 
     # Fetch recent 4 dashboards for the current user
     recent_dashboards = db.query(Dashboard).filter(
@@ -2,11 +2,11 @@ from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 from app.dependencies import get_current_user
-from app.models.user import User
+from app.identity_cache import UserIdentity
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
 
 @router.get("/dashboard", response_class=HTMLResponse)
-async def dashboard(request: Request, user: User = Depends(get_current_user)):
+async def dashboard(request: Request, user: UserIdentity = Depends(get_current_user)):
     return RedirectResponse(url="/dashboard/bihome")
@@ -5,9 +5,10 @@ from app.session_connection import session_conn_manager
 from app.models.user_connection import UserConnection
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.models.user import User
+from app.identity_cache import UserIdentity
 from app.dependencies import establish_connection, fetch_schema_description
 from fastapi.templating import Jinja2Templates
+from fastapi.concurrency import run_in_threadpool
 from app.dependencies import init_user_connections
 from app.models.dashboards import Dashboard
 
@@ -20,13 +21,13 @@ router = APIRouter()
 async def dashboard_editor(
     request: Request,
     dashboard_id: int = None,
-    current_user: User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     session_id = request.cookies.get("session_id")
 
-    # Initialize all connections
-    init_user_connections(session_id, current_user.id, db)
+    # Initialize all connections (concurrently, off the event loop)
+    connection_status = await run_in_threadpool(init_user_connections, session_id, current_user.id, db)
 
     # Fetch user connections for dropdown
     connections = db.query(UserConnection).filter(UserConnection.user_id == current_user.id).all()
@@ -53,11 +54,12 @@ async def dashboard_editor(
         "db_list": db_list,
         "dashboard_data": dashboard_data,
         "dashboard_name": dashboard_name,
-        "dashboard_id": dashboard_id
+        "dashboard_id": dashboard_id,
+        "connection_status": connection_status
     })
 
 @router.put("/dashboard/update/{dashboard_id}")
-async def update_dashboard(dashboard_id: int, request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def update_dashboard(dashboard_id: int, request: Request, db: Session = Depends(get_db), current_user: UserIdentity = Depends(get_current_user)):
     try:
         data = await request.json()
        
@@ -1,19 +1,20 @@
 from fastapi import APIRouter, Request, Form, Depends
 from fastapi.responses import HTMLResponse
 from fastapi.templating import Jinja2Templates
+from fastapi import Query
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import create_engine, inspect
-import pandas as pd
-import psycopg
-from psycopg import OperationalError
-from fastapi.responses import JSONResponse
+from typing import List
+import asyncio
+import json
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.dependencies import get_current_user, encrypt_password
 from app.models.user_connection import UserConnection
-from app.models.user import User
+from app.identity_cache import UserIdentity
 from app.database import get_db
 from fastapi.responses import RedirectResponse
 from urllib.parse import urlencode
-from urllib.parse import quote_plus
+from app.preview_service import iter_previews, list_tables, paginate, preview_to_json, render_preview_html
 
 router = APIRouter()
 templates = Jinja2Templates(directory="templates")
@@ -24,7 +25,7 @@ async def data_tab(
     request: Request,
     message: str = None,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserIdentity = Depends(get_current_user)
 ):
     if not current_user:
         return RedirectResponse("/login?msg=session-expired")
@@ -47,9 +48,12 @@ async def handle_postgres_connection(
     password: str = Form(...),
     sslmode: str = Form(...),
     db_type: str = Form(...),
-    current_user: User = Depends(get_current_user),
+    current_user: UserIdentity = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
+    import psycopg
+    from psycopg import OperationalError
+
     try:
         # Try to connect to PostgreSQL
         conn = psycopg.connect(
@@ -98,57 +102,92 @@ async def handle_postgres_connection(
     return RedirectResponse(f"/dashboard/data?{params}", status_code=303)
 
 
-from fastapi.responses import HTMLResponse
+def _list_page(conn: UserConnection, page: int) -> dict:
+    """One page of a connection's table names for the Data tab; previews load separately."""
+    try:
+        listing = paginate(list_tables(conn), page)
+        listing["error"] = None
+    except Exception as e:
+        listing = {"tables": [], "page": page, "next_page": None, "total": 0, "error": str(e)}
+    listing["conn_id"] = conn.id
+    listing["db_name"] = conn.database
+    return listing
+
+
+def _get_user_connection(db: Session, current_user: UserIdentity, conn_id: int):
+    return db.query(UserConnection).filter_by(id=conn_id, user_id=current_user.id).first()
+
 
 @router.get("/dashboard/data/previews", response_class=HTMLResponse)
 async def get_data_previews(
     request: Request,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: UserIdentity = Depends(get_current_user)
 ):
+    """
+    Renders every connected database with the first page of its table names.
+    The rows themselves are fetched lazily through /dashboard/data/previews/{conn_id}/rows.
+    """
     if not current_user:
         return RedirectResponse("/login?msg=session-expired", status_code=303)
 
-    previews_by_db = []
     connections = db.query(UserConnection).filter_by(user_id=current_user.id).all()
-
-    for conn in connections:
-        try:
-            username = quote_plus(conn.username)
-            password = quote_plus(conn.get_decrypted_password())
-            engine_url = f"postgresql://{username}:{password}@{conn.host}:{conn.port}/{conn.database}?sslmode={conn.sslmode}"
-            engine = create_engine(engine_url)
-
-            inspector = inspect(engine)
-            tables = inspector.get_table_names()
-            table_previews = []
-
-            for table in tables:
-                try:
-                    df = pd.read_sql(f"SELECT * FROM {table} LIMIT 5", engine)
-                    table_previews.append({
-                        "name": table,
-                        "html": df.to_html(classes="table table-sm table-bordered", index=False)
-                    })
-                except Exception as e:
-                    table_previews.append({
-                        "name": table,
-                        "html": f"<p>Error previewing table {table}: {e}</p>"
-                    })
-
-            previews_by_db.append({
-                "db_name": conn.database,
-                "tables": table_previews
-            })
-
-        except Exception as e:
-            previews_by_db.append({
-                "db_name": conn.database,
-                "tables": [{"name": "Error", "html": f"<p>Connection failed: {e}</p>"}]
-            })
+    # List all databases at once, off the event loop
+    previews_by_db = await asyncio.gather(*(run_in_threadpool(_list_page, conn, 1) for conn in connections))
 
     return templates.TemplateResponse("dashboard/_data_preview_partial.html", {
         "request": request,
         "previews_by_db": previews_by_db
     })
 
+
+@router.get("/dashboard/data/previews/{conn_id}/tables")
+async def get_data_preview_tables(
+    conn_id: int,
+    page: int = 1,
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_user)
+):
+    """Next page of table cards for one database: { html, next_page }."""
+    conn = _get_user_connection(db, current_user, conn_id)
+    if not conn:
+        return JSONResponse({"error": "Connection not found"}, status_code=404)
+
+    listing = await run_in_threadpool(_list_page, conn, page)
+    if listing["error"]:
+        return JSONResponse({"error": listing["error"]}, status_code=500)
+
+    html = templates.get_template("dashboard/_data_preview_tables.html").render(db=listing)
+    return JSONResponse({"html": html, "next_page": listing["next_page"]})
+
+
+@router.get("/dashboard/data/previews/{conn_id}/rows")
+async def get_data_preview_rows(
+    conn_id: int,
+    table: List[str] = Query(...),
+    format: str = "json",
+    db: Session = Depends(get_db),
+    current_user: UserIdentity = Depends(get_current_user)
+):
+    """
+    Streams previews of the requested tables as NDJSON, one line per chunk as
+    soon as it is fetched; chunks of different tables interleave. format=json
+    sends {"table", "columns"}, then {"table", "rows"} per fetched batch, then
+    {"table", "done": true} - or {"table", "error"} instead. format=html sends
+    {"table", "html"} per chunk; a table's html strings concatenate to its
+    preview table (or an error message).
+    """
+    conn = _get_user_connection(db, current_user, conn_id)
+    if not conn:
+        return JSONResponse({"error": "Connection not found"}, status_code=404)
+
+    def preview_lines():
+        for name, chunk in iter_previews(conn, table):
+            if format == "html":
+                payload = {"table": name, "html": render_preview_html(chunk, name)}
+            else:
+                payload = {"table": name, **preview_to_json(chunk)}
+            yield json.dumps(payload) + "\n"
+
+    # Sync generator: Starlette iterates it in the threadpool
+    return StreamingResponse(preview_lines(), media_type="application/x-ndjson")
@@ -1,113 +1,396 @@
 from fastapi import APIRouter, Request, Depends
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from app.dependencies import get_current_user, get_db
-from app.generatefuncs import generate_sql_from_prompt, generate_echarts_config, classify_intent_with_llm, generate_sql_from_prompt_for_prophet, generate_forecast_config,get_period
-from app.generate_helper import detect_chart_type, detect_output_format, save_query_history, transform_sql_result_to_llm_json
-from app.techniques import run_forecasting
+from app.dependencies import get_current_user, get_db, _bootstrap_connection
+from app.database import SessionLocal
+from app.generatefuncs import generate_sql_from_prompt, generate_echarts_config, generate_chart_labels, CHART_LLM_LABELS, classify_intent_with_llm, generate_sql_from_prompt_for_prophet, generate_sql_from_prompt_for_anomalies, generate_sql_from_prompt_for_clustering, generate_sql_from_prompt_for_prediction, generate_forecast_config,get_period, plan_analysis, PLANNER_ENABLED, DecimalEncoder
+from app.generate_helper import detect_chart_type, detect_output_format, save_query_history
+from app.forecast_executor import forecast_executor
+from app.chart_builder import build_chart_config_from_columns
+from app.anomaly_detection import build_anomaly_chart_config
+from app.clustering import cluster_query
+from app.prediction import predict_query
+from app.result_cache import fetch_cached
+from app.sql_cache import prompt_sql_cache
 from app.session_connection import session_conn_manager
-from app.models.user import User
+from app.identity_cache import UserIdentity
+import json
 
 router = APIRouter()
 
 # --- Main Route ---
 from app.models import QueryHistory
 
-@router.post("/dashboard/generate")
-async def generate_dashboard(
-    request: Request,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    data = await request.json()
-    prompt = data.get("prompt", "")
-    db_id = data.get("db_id", "")
+PREVIEW_ROWS = 10
 
-    session_id = request.cookies.get("session_id")
-    if not session_id:
-        return JSONResponse(status_code=401, content={"error": "Not authenticated"})
 
-    cached = session_conn_manager.get_connection(session_id, db_id)
-    if not cached:
-        return JSONResponse(status_code=400, content={"error": "Connection not found in cache"})
+async def record_failure(db, current_user, prompt, sql_query):
+    """Saves the failed query and evicts the SQL (or plan) behind it from the prompt cache."""
+    save_query_history(db, current_user, prompt, sql_query, "failed", None)
+    await prompt_sql_cache.discard(sql_query)
 
-    conn = cached["connection"]
-    schema = cached["schema"]
-    
-    db_type = db_id.split(" - ")[0].strip().lower()
+
+async def run_generate_pipeline(prompt, chart_type_hint, pool, schema, db_type, db, current_user, identity=None, use_cache=True, forecast_engine=None, anomaly_method=None):
+    """
+    Runs the generate pipeline stage by stage, yielding (event, payload) as each
+    stage finishes: intent, sql, rows, chart and finally done (or error).
+    Connections are checked out of `pool` only while a query runs, always in the
+    threadpool so a checkout waiting on an exhausted pool never blocks the event
+    loop; results are served from the per-connection result cache unless
+    use_cache is False.
+    `forecast_engine` ('prophet' / 'holt_winters') and `anomaly_method`
+    ('zscore' / 'iqr' / 'seasonal') override the automatic choices.
+    """
+    # One structured call for intent + SQL + chart/period; per-step calls are the fallback
+    plan = await plan_analysis(prompt, schema, db_type) if PLANNER_ENABLED else None
 
     # 🔥 NEW STEP: Let LLM classify the user's intent
-    intent = classify_intent_with_llm(prompt)  # e.g., "visualization", "anomaly_detection", etc.
+    if plan:
+        intent = plan["intent"]
+    else:
+        intent = await classify_intent_with_llm(prompt)  # e.g., "visualization", "anomaly_detection", etc.
+    yield "intent", {"intent": intent}
 
-    cursor = conn.cursor()
-    
     # For most intents, SQL is still needed
     if intent=="visualization":
-        sql_query = generate_sql_from_prompt(prompt, schema, db_type)
+        sql_query = plan["sql"] if plan else await generate_sql_from_prompt(prompt, schema, db_type)
+        yield "sql", {"sql": sql_query}
        
         try:
-            cursor.execute(sql_query)
-            rows = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            transformed_data = transform_sql_result_to_llm_json(columns, rows)
+            result = await run_in_threadpool(fetch_cached, pool, identity, sql_query, use_cache)
+            columns = result.columns
            
         except Exception as e:
            
-            save_query_history(db, current_user, prompt, sql_query, "failed", None)
-            return JSONResponse(status_code=500, content={"error": "SQL execution failed"})
-        chart_type = data.get("chart_type") or detect_chart_type(prompt)
-        echarts_config = generate_echarts_config(prompt, transformed_data, chart_type)
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": "SQL execution failed"}
+            return
+        yield "rows", {
+            "row_count": result.row_count,
+            "truncated": result.truncated,
+            "columns": columns,
+            "preview": result.records(PREVIEW_ROWS)
+        }
+
+        chart_type = chart_type_hint or (plan and plan["chart_type"]) or detect_chart_type(prompt)
+        # Map the rows locally; the LLM only (optionally) names the chart from column names
+        labels = await generate_chart_labels(prompt, columns, chart_type) if CHART_LLM_LABELS else {}
+        default_title = f"{prompt[:50]}..." if len(prompt) > 50 else prompt
+        echarts_config = build_chart_config_from_columns(
+            columns,
+            result.values,
+            chart_type,
+            title=labels.get("title") or default_title,
+            series_labels=labels.get("series")
+        )
+        if echarts_config is None:
+            # No numeric column to plot - let the LLM shape the result instead
+            echarts_config = await generate_echarts_config(prompt, result.to_llm_json(), chart_type)
         result_payload = {
             "chart_type": chart_type,
-            "echarts_config": echarts_config
+            "echarts_config": echarts_config,
+            # Also set when the chart itself dropped points (capped line, top-N without an "Other" total)
+            "truncated": result.truncated or (isinstance(echarts_config, dict) and bool(echarts_config.get("truncated")))
         }
         
     elif intent == "forecasting":
-        sql_query_forcast = generate_sql_from_prompt_for_prophet(prompt, schema, db_type)
+        if plan:
+            sql_query = plan["sql"]
+        else:
+            sql_query = await generate_sql_from_prompt_for_prophet(prompt, schema, db_type)
+        yield "sql", {"sql": sql_query}
         
         try:
-            cursor.execute(sql_query_forcast)
-            rows = cursor.fetchall()
-            columns = [desc[0] for desc in cursor.description]
-            
-            # Convert rows to list of dicts for easy processing
-            data = [dict(zip(columns, row)) for row in rows]
+            result = await run_in_threadpool(fetch_cached, pool, identity, sql_query, use_cache)
 
             # Prophet expects two columns: 'ds' for datetime and 'y' for target value
             # Assuming your SQL query already returns columns with these names
-            prophet_data = [{"ds": row["ds"], "y": row["y"]} for row in data]
+            prophet_data = {"ds": result.column("ds"), "y": result.column("y")}
 
+        except Exception as e:
            
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": "SQL execution for forecasting failed"}
+            return
+        yield "rows", {
+            "row_count": result.row_count,
+            "truncated": result.truncated,
+            "columns": result.columns,
+            "preview": result.records(PREVIEW_ROWS)
+        }
 
+        period = (plan and plan["forecast_period"]) or await get_period(prompt)
+        try:
+            # The fit runs in a worker process; other requests keep being served meanwhile
+            forecast_result = await forecast_executor.run(prophet_data, prompt, period, engine=forecast_engine)
         except Exception as e:
-           
-            save_query_history(db, current_user, prompt, sql_query_forcast, "failed", None)
-            return JSONResponse(status_code=500, content={"error": "SQL execution for forecasting failed"})
-        period=get_period(prompt)
-        forecast_result = run_forecasting(prophet_data, prompt, period)
-        output_format = detect_output_format(prompt)
+            # Queue full, timed out or a worker crash - not the SQL's fault, so it stays cached
+            save_query_history(db, current_user, prompt, sql_query, "failed", None)
+            yield "error", {"error": str(e)}
+            return
+        if isinstance(forecast_result, dict) and "error" in forecast_result:
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": f"{forecast_result['error']}: {forecast_result.get('details')}"}
+            return
+        output_format = (plan and plan["output_format"]) or detect_output_format(prompt)
        
         chart_type = "line"  # Forecasts are typically shown as line charts
         echarts_config = generate_forecast_config(prompt, forecast_result, period, chart_type)
       
         result_payload = {
             "chart_type": chart_type,
-            "echarts_config": echarts_config
+            "echarts_config": echarts_config,
+            "truncated": result.truncated
+        }
+
+    elif intent == "anomaly_detection":
+        sql_query = plan["sql"] if plan else await generate_sql_from_prompt_for_anomalies(prompt, schema, db_type)
+        yield "sql", {"sql": sql_query}
+
+        try:
+            result = await run_in_threadpool(fetch_cached, pool, identity, sql_query, use_cache)
+        except Exception as e:
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": "SQL execution for anomaly detection failed"}
+            return
+        yield "rows", {
+            "row_count": result.row_count,
+            "truncated": result.truncated,
+            "columns": result.columns,
+            "preview": result.records(PREVIEW_ROWS)
+        }
+
+        default_title = f"{prompt[:50]}..." if len(prompt) > 50 else prompt
+        # Vectorized, but large results still take a moment; keep the event loop free
+        echarts_config = await run_in_threadpool(
+            build_anomaly_chart_config,
+            result.columns,
+            result.values,
+            chart_type_hint,
+            default_title,
+            anomaly_method
+        )
+        if echarts_config is None:
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": "Anomaly detection needs a numeric column in the result"}
+            return
+
+        result_payload = {
+            "chart_type": echarts_config["seriesData"][0]["type"],
+            "echarts_config": echarts_config,
+            "truncated": result.truncated
+        }
+
+    elif intent == "clustering":
+        sql_query = plan["sql"] if plan else await generate_sql_from_prompt_for_clustering(prompt, schema, db_type)
+        yield "sql", {"sql": sql_query}
+
+        default_title = f"{prompt[:50]}..." if len(prompt) > 50 else prompt
+        try:
+            # Streams the whole result in batches instead of going through the result cache
+            echarts_config, result_info = await run_in_threadpool(cluster_query, pool, sql_query, default_title)
+        except Exception as e:
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": "SQL execution for clustering failed"}
+            return
+        yield "rows", {
+            "row_count": result_info["row_count"],
+            "truncated": result_info["truncated"],
+            "columns": result_info["columns"],
+            "preview": result_info["preview"]
+        }
+        if echarts_config is None:
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": "Clustering needs at least two rows with a numeric column"}
+            return
+
+        result_payload = {
+            "chart_type": echarts_config["seriesData"][0]["type"],
+            "echarts_config": echarts_config,
+            "truncated": result_info["truncated"]
+        }
+
+    elif intent == "prediction":
+        sql_query = plan["sql"] if plan else await generate_sql_from_prompt_for_prediction(prompt, schema, db_type)
+        yield "sql", {"sql": sql_query}
+
+        default_title = f"{prompt[:50]}..." if len(prompt) > 50 else prompt
+        try:
+            # Fits from the cursor batch by batch instead of going through the result cache
+            echarts_config, result_info = await run_in_threadpool(predict_query, pool, sql_query, default_title)
+        except Exception as e:
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": "SQL execution for prediction failed"}
+            return
+        yield "rows", {
+            "row_count": result_info["row_count"],
+            "truncated": result_info["truncated"],
+            "columns": result_info["columns"],
+            "preview": result_info["preview"]
+        }
+        if echarts_config is None:
+            await record_failure(db, current_user, prompt, sql_query)
+            yield "error", {"error": "Prediction needs a numeric target and at least one numeric feature column"}
+            return
+
+        result_payload = {
+            "chart_type": "line",
+            "echarts_config": echarts_config,
+            "truncated": result_info["truncated"]
         }
-        #else raise ValueError(f"Unsupported intent: {intent}")
 
+    else:
+        yield "error", {"error": f"Unsupported intent: {intent}"}
+        return
+
+    yield "chart", result_payload
 
     # 🔥 NEW STEP: Based on intent, apply respective logic
     status = "success"
-    
-    sql_query = sql_query if intent == "visualization" else sql_query_forcast
 
-    # Save successful query
+    # Save successful query; the SQL (or plan) is only cached once it ran
+    await prompt_sql_cache.commit(sql_query)
     save_query_history(db, current_user, prompt, sql_query, status, result_payload)
 
-    
-    return {
+    yield "done", {
         "status": status,
         "intent": intent,
         **result_payload
-    }
\ No newline at end of file
+    }
+
+
+def format_sse(event, payload):
+    return f"event: {event}\ndata: {json.dumps(payload, cls=DecimalEncoder)}\n\n"
+
+
+def bootstrap_session_connection(session_id: str, user_id: int, db_id: str) -> bool:
+    """
+    Connects `db_id` for the session when this worker hasn't yet - sessions are
+    shared across workers, but each worker's connection cache is filled only by
+    the page loads it served.
+
+    Returns:
+        bool: False when the user has no saved connection named `db_id`.
+    """
+    from app.models.user_connection import UserConnection
+
+    db = SessionLocal()
+    try:
+        conn = next(
+            (conn for conn in db.query(UserConnection).filter(UserConnection.user_id == user_id).all()
+             if f"{conn.db_type} - {conn.database}" == db_id),
+            None
+        )
+    finally:
+        db.close()
+    if conn is None:
+        return False
+
+    _bootstrap_connection(session_id, db_id, conn)
+    return True
+
+
+async def resolve_generate_request(request: Request, current_user: UserIdentity):
+    """
+    Reads the generate payload and the session's cached connection, connecting
+    it first when this worker hasn't cached it yet.
+
+    Returns:
+        tuple: (data, cached, error_response) - error_response is set when the request can't proceed.
+    """
+    data = await request.json()
+    db_id = data.get("db_id", "")
+
+    session_id = request.cookies.get("session_id")
+    if not session_id:
+        return data, None, JSONResponse(status_code=401, content={"error": "Not authenticated"})
+
+    cached = session_conn_manager.get_connection(session_id, db_id)
+    if not cached:
+        try:
+            found = await run_in_threadpool(bootstrap_session_connection, session_id, current_user.id, db_id)
+        except Exception as e:
+            return data, None, JSONResponse(status_code=502, content={"error": f"Could not connect to {db_id}: {e}"})
+        if not found:
+            return data, None, JSONResponse(status_code=400, content={"error": "Connection not found"})
+        cached = session_conn_manager.get_connection(session_id, db_id)
+
+    return data, cached, None
+
+
+@router.post("/dashboard/generate")
+async def generate_dashboard(
+    request: Request,
+    current_user: UserIdentity = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Runs the whole pipeline and returns the chart. Body: prompt, db_id and the
+    optional chart_type, forecast_engine, anomaly_method and use_cache.
+
+    Query results are cached per connection for RESULT_CACHE_TTL_SECONDS (60 s by
+    default), so a repeated question may not yet see rows written since it last
+    ran. Send "use_cache": false to always query the database (the fresh result
+    then replaces the cached one).
+    """
+    data, cached, error_response = await resolve_generate_request(request, current_user)
+    if error_response:
+        return error_response
+
+    prompt = data.get("prompt", "")
+    db_type = data.get("db_id", "").split(" - ")[0].strip().lower()
+
+    result = None
+    async for event, payload in run_generate_pipeline(
+        prompt, data.get("chart_type"), cached["pool"], cached["schema"], db_type, db, current_user,
+        identity=cached.get("identity"), use_cache=data.get("use_cache", True),
+        forecast_engine=data.get("forecast_engine"),
+        anomaly_method=data.get("anomaly_method")
+    ):
+        if event == "error":
+            return JSONResponse(status_code=500, content=payload)
+        if event == "done":
+            result = payload
+
+    return result
+
+
+@router.post("/dashboard/generate/stream")
+async def generate_dashboard_stream(
+    request: Request,
+    current_user: UserIdentity = Depends(get_current_user)
+):
+    """
+    Server-Sent-Events variant of /dashboard/generate: emits intent, sql, rows
+    (count + preview), chart and done events as each stage finishes. Takes the
+    same body, including "use_cache": false to bypass possibly stale cached results.
+    """
+    data, cached, error_response = await resolve_generate_request(request, current_user)
+    if error_response:
+        return error_response
+
+    prompt = data.get("prompt", "")
+    db_type = data.get("db_id", "").split(" - ")[0].strip().lower()
+
+    async def event_stream():
+        # The request-scoped session is closed before streaming starts, so use our own
+        db = SessionLocal()
+        try:
+            async for event, payload in run_generate_pipeline(
+                prompt, data.get("chart_type"), cached["pool"], cached["schema"], db_type, db, current_user,
+                identity=cached.get("identity"), use_cache=data.get("use_cache", True),
+                forecast_engine=data.get("forecast_engine"),
+                anomaly_method=data.get("anomaly_method")
+            ):
+                yield format_sse(event, payload)
+        except Exception as e:
+            yield format_sse("error", {"error": f"Generation failed: {e}"})
+        finally:
+            db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
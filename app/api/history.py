@@ -4,7 +4,7 @@ from fastapi.templating import Jinja2Templates
 from fastapi import Depends
 from sqlalchemy.orm import Session
 from app.dependencies import get_current_user, get_db
-from app.models.user import User
+from app.identity_cache import UserIdentity
 import sqlalchemy as sa
 
 router = APIRouter()
@@ -13,7 +13,7 @@ templates = Jinja2Templates(directory="templates")
 
 
 @router.get("/dashboard/history", response_class=HTMLResponse)
-async def history_tab(request: Request, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def history_tab(request: Request, db: Session = Depends(get_db), current_user: UserIdentity = Depends(get_current_user)):
     history = db.execute(
         sa.text("""
             SELECT id, prompt, generated_query, status, llm_config::text, created_at
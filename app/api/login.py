@@ -5,7 +5,7 @@ from sqlalchemy.orm import Session
 from app.models.user import User
 from app.database import get_db
 from passlib.context import CryptContext
-from app.session_manager import create_session
+from app.session_manager import SESSION_TTL_SECONDS, create_session
 from app.session_connection import session_conn_manager  # import manager
 
 router = APIRouter()
@@ -54,6 +54,6 @@ def login_user(
         httponly=True,
         secure=False,
         samesite="lax",
-        max_age=60 * 60 * 24,
+        max_age=SESSION_TTL_SECONDS,
     )
     return response
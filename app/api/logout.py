@@ -1,4 +1,5 @@
 from app.session_manager import delete_session
+from app.identity_cache import identity_cache
 from fastapi import Request, HTTPException
 from fastapi import APIRouter
 from fastapi.responses import RedirectResponse
@@ -10,6 +11,7 @@ def logout(request: Request):
     session_id = request.cookies.get("session_id")
     if session_id:
         delete_session(session_id)
+        identity_cache.invalidate_session(session_id)
 
     response = RedirectResponse(url="/login", status_code=302)
     response.delete_cookie("session_id")
@@ -3,6 +3,7 @@ from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.models.user import User
+from app.identity_cache import UserIdentity, identity_cache
 from app.dependencies import get_current_user
 from app.database import get_db
 from passlib.context import CryptContext
@@ -21,7 +22,7 @@ def hash_password(password: str):
 @router.get("/dashboard/settings", response_class=HTMLResponse)
 def settings_page(
     request: Request,
-    user: User = Depends(get_current_user)
+    user: UserIdentity = Depends(get_current_user)
 ):
     return templates.TemplateResponse("dashboard/settings_tab.html", {
         "request": request,
@@ -44,7 +45,7 @@ async def update_settings(
     password: str = Form(None),
     confirm_password: str = Form(None),
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user)
+    user: UserIdentity = Depends(get_current_user)
 ):
     try:
         # Validate password match if provided
@@ -54,6 +55,9 @@ async def update_settings(
                 "message": "Passwords do not match"
             }, status_code=400)
 
+        # get_current_user returns a read-only snapshot; edit the row itself
+        user = db.query(User).filter(User.id == user.id).first()
+
         # Update fields only if changed
         updated = False
         if user.first_name != first_name:
@@ -70,6 +74,7 @@ async def update_settings(
             db.add(user)
             db.commit()
             db.refresh(user)
+            identity_cache.invalidate_user(user.id)
 
         return JSONResponse({
             "status": "success",
@@ -1,4 +1,4 @@
-import app.models.user as User
+from app.identity_cache import UserIdentity
 from fastapi import APIRouter, Request, Depends, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
@@ -12,7 +12,7 @@ templates = Jinja2Templates(directory="templates")
 
 
 @router.post("/dashboard/thumbnail")
-async def save_dashboard_thumbnail(payload: dict, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
+async def save_dashboard_thumbnail(payload: dict, db: Session = Depends(get_db), current_user: UserIdentity = Depends(get_current_user)):
     
 
     dashboard_id = payload.get("dashboard_id")
@@ -0,0 +1,174 @@
+import os
+import re
+from datetime import date, datetime
+from decimal import Decimal
+
+import numpy as np
+
+CHART_TOP_N = int(os.getenv("CHART_TOP_N", "20"))
+CHART_MAX_LINE_POINTS = int(os.getenv("CHART_MAX_LINE_POINTS", "1000"))
+
+NUMERIC_TYPES = (int, float, Decimal, np.integer, np.floating)
+# Labels like 2024, 2024-03, 2024-03-31 or 2024-03-31T10:00 read as points in time
+ISO_DATE_LABEL = re.compile(r"^\d{4}(-\d{2}){0,2}([ T]\d{2}:\d{2}.*)?$")
+
+
+def _to_columnar(columns, rows):
+    """Transposes row dicts/tuples into one tuple of values per column."""
+    if not rows:
+        return [() for _ in columns]
+    if isinstance(rows[0], dict):
+        rows = [tuple(row.get(col) for col in columns) for row in rows]
+    return list(zip(*rows))
+
+
+def _is_numeric_column(values):
+    sample = next((v for v in values if v is not None), None)
+    return isinstance(sample, NUMERIC_TYPES) and not isinstance(sample, bool)
+
+
+def _is_ordered_column(values):
+    """True for date/time (or numeric) labels, whose SQL order is the chart's order."""
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, (datetime, date)) or _is_numeric_column(values):
+        return True
+    return isinstance(sample, str) and bool(ISO_DATE_LABEL.match(sample.strip()))
+
+
+def _as_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_float_array(values) -> np.ndarray:
+    """
+    Column -> float array. None, and values float() can't read (a stray 'n/a' in
+    a column sniffed as numeric from its first value), become NaN instead of
+    failing the whole column; callers count them as skipped.
+    """
+    try:
+        return np.array(values, dtype=float)
+    except (TypeError, ValueError):
+        return np.array([_as_float(value) for value in values], dtype=float)
+
+
+def _label(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+
+def _to_json_numbers(array):
+    """Float array -> list with NaN as None and integral columns kept as ints."""
+    finite = np.isfinite(array)
+    if finite.any() and np.all(np.mod(array[finite], 1) == 0):
+        values = array.astype(object)
+        values[finite] = array[finite].astype(np.int64)
+    else:
+        values = np.round(array, 4).astype(object)
+    values[~finite] = None
+    return values.tolist()
+
+
+def infer_chart_columns(columns, values_by_column):
+    """
+    Picks the label column and the numeric series columns.
+
+    The label is the first non-numeric column (falling back to the first column
+    when every column is numeric); every other numeric column becomes a series.
+    """
+    numeric = [_is_numeric_column(values) for values in values_by_column]
+    label_index = next((i for i, is_num in enumerate(numeric) if not is_num), 0)
+    series_indexes = [i for i, is_num in enumerate(numeric) if is_num and i != label_index]
+    return label_index, series_indexes
+
+
+def build_chart_config(data, chart_type, title=None, series_labels=None, top_n=CHART_TOP_N):
+    """
+    Builds the same chart JSON generate_echarts_config asks the LLM for, directly
+    from the SQL result.
+
+    Args:
+        data (dict): {'columns': [...], 'rows': [...]} from transform_sql_result_to_llm_json
+            (rows may be dicts or tuples).
+        chart_type (str): 'bar', 'line' or 'pie'.
+        title (str): Chart title.
+        series_labels (dict): Optional {column_name: display label}.
+        top_n (int): Bar/pie charts over categorical labels keep the top_n labels by
+            the first series and sum the rest into "Other".
+
+    Returns:
+        dict or None: Chart config (with "truncated": True when points were dropped),
+        or None when the result has no numeric column.
+    """
+    columns = list(data.get("columns") or [])
+    values_by_column = _to_columnar(columns, data.get("rows") or [])
+    return build_chart_config_from_columns(columns, values_by_column, chart_type, title, series_labels, top_n)
+
+
+def build_chart_config_from_columns(columns, values_by_column, chart_type, title=None, series_labels=None, top_n=CHART_TOP_N):
+    """
+    Same as build_chart_config for a result that is already columnar
+    (one sequence of values per column, e.g. ColumnarResult.values).
+    """
+    chart_type = chart_type or "bar"
+    series_labels = series_labels or {}
+    if not columns or not values_by_column or not len(values_by_column[0]):
+        return None
+
+    label_index, series_indexes = infer_chart_columns(columns, values_by_column)
+    if not series_indexes:
+        return None
+
+    try:
+        # One 2-D float matrix for all series; None becomes NaN
+        matrix = np.array([values_by_column[i] for i in series_indexes], dtype=float)
+    except (TypeError, ValueError):
+        # Numeric detection only samples the first value; a mixed column goes to the LLM path
+        return None
+    labels = np.array([_label(v) for v in values_by_column[label_index]], dtype=object)
+    ordered = _is_ordered_column(values_by_column[label_index])
+    truncated = False
+
+    if chart_type == "pie" or (chart_type == "bar" and not ordered):
+        if top_n and len(labels) > top_n:
+            primary = np.nan_to_num(matrix[0], nan=-np.inf)
+            order = np.argsort(-primary, kind="stable")
+            keep, rest = order[:top_n], order[top_n:]
+            other_totals = np.nansum(matrix[:, rest], axis=1)
+            labels, matrix = labels[keep], matrix[:, keep]
+            if np.any(other_totals):
+                labels = np.append(labels, "Other")
+                matrix = np.column_stack([matrix, other_totals])
+            else:
+                truncated = True
+    elif len(labels) > CHART_MAX_LINE_POINTS:
+        # Lines and bars over time keep the SQL order and the latest points
+        labels, matrix = labels[-CHART_MAX_LINE_POINTS:], matrix[:, -CHART_MAX_LINE_POINTS:]
+        truncated = True
+
+    series_names = [series_labels.get(columns[i], columns[i]) for i in series_indexes]
+    title = title or columns[series_indexes[0]]
+
+    if chart_type == "pie":
+        values = _to_json_numbers(matrix[0])
+        return {
+            "title": title,
+            "seriesData": [
+                {"name": name, "value": value}
+                for name, value in zip(labels.tolist(), values)
+            ],
+            "truncated": truncated
+        }
+
+    return {
+        "title": title,
+        "xAxisData": labels.tolist(),
+        "seriesData": [
+            {"name": name, "type": chart_type, "data": _to_json_numbers(series)}
+            for name, series in zip(series_names, matrix)
+        ],
+        "truncated": truncated
+    }
@@ -0,0 +1,407 @@
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.chart_builder import _is_numeric_column, _to_float_array
+from app.result_fetch import RESULT_FETCH_BATCH, iter_batches
+
+CLUSTER_K_MIN = int(os.getenv("CLUSTER_K_MIN", "2"))
+CLUSTER_K_MAX = int(os.getenv("CLUSTER_K_MAX", "8"))
+# Rows streamed from the cursor at most; the rest of the result is ignored
+CLUSTER_MAX_ROWS = int(os.getenv("CLUSTER_MAX_ROWS", "5000000"))
+CLUSTER_FETCH_BATCH = int(os.getenv("CLUSTER_FETCH_BATCH", str(max(RESULT_FETCH_BATCH, 10000))))
+# Uniform reservoir sample used to pick k, seed the centers and draw the chart
+CLUSTER_SAMPLE_ROWS = int(os.getenv("CLUSTER_SAMPLE_ROWS", "20000"))
+# Silhouette is O(n^2); it is computed on this many sample rows
+CLUSTER_SILHOUETTE_ROWS = int(os.getenv("CLUSTER_SILHOUETTE_ROWS", "2000"))
+CLUSTER_CHART_POINTS = int(os.getenv("CLUSTER_CHART_POINTS", "1000"))
+# First rows kept for the pipeline's rows event
+PREVIEW_ROWS = 10
+
+MINIBATCH_SIZE = 1024
+MINIBATCH_ITERATIONS = 100
+MINIBATCH_INITS = 3
+SILHOUETTE_BLOCK = 256
+CLUSTER_COLORS = [
+    "rgba(54, 162, 235, 0.7)",
+    "rgba(255, 99, 132, 0.7)",
+    "rgba(75, 192, 192, 0.7)",
+    "rgba(255, 159, 64, 0.7)",
+    "rgba(153, 102, 255, 0.7)",
+    "rgba(255, 205, 86, 0.7)",
+    "rgba(201, 203, 207, 0.7)",
+    "rgba(0, 128, 96, 0.7)",
+]
+# Identifier columns would dominate the distances without meaning anything
+ID_COLUMN = re.compile(r"(^|_)id$", re.IGNORECASE)
+
+
+class StreamStats:
+    """Per-column count / mean / variance merged batch by batch (Chan et al.'s parallel update)."""
+
+    def __init__(self, dims: int):
+        self.count = 0
+        self.mean = np.zeros(dims)
+        self.m2 = np.zeros(dims)
+
+    def add(self, batch: np.ndarray):
+        n = len(batch)
+        if not n:
+            return
+        batch_mean = batch.mean(axis=0)
+        batch_m2 = ((batch - batch_mean) ** 2).sum(axis=0)
+        total = self.count + n
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * n / total
+        self.m2 = self.m2 + batch_m2 + delta ** 2 * self.count * n / total
+        self.count = total
+
+    @property
+    def std(self) -> np.ndarray:
+        std = np.sqrt(self.m2 / max(self.count - 1, 1))
+        # Constant columns are left unscaled instead of divided by zero
+        return np.where(std > 0, std, 1.0)
+
+
+class Reservoir:
+    """Uniform sample of at most `size` rows of a stream (Algorithm R, one batch at a time)."""
+
+    def __init__(self, size: int, dims: int, rng: np.random.Generator):
+        self.size = size
+        self.rows = np.empty((size, dims))
+        self.seen = 0
+        self.rng = rng
+
+    def add(self, batch: np.ndarray):
+        filling = min(max(self.size - self.seen, 0), len(batch))
+        if filling:
+            self.rows[self.seen:self.seen + filling] = batch[:filling]
+        rest = batch[filling:]
+        if len(rest):
+            # Row i of the stream replaces a random slot with probability size / (i + 1)
+            positions = self.seen + filling + np.arange(len(rest))
+            slots = (self.rng.random(len(rest)) * (positions + 1)).astype(np.int64)
+            keep = slots < self.size
+            self.rows[slots[keep]] = rest[keep]
+        self.seen += len(batch)
+
+    @property
+    def sample(self) -> np.ndarray:
+        return self.rows[:min(self.seen, self.size)]
+
+
+def _squared_distances(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    distances = (points * points).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers * centers).sum(axis=1)
+    return np.maximum(distances, 0)
+
+
+def assign(points: np.ndarray, centers: np.ndarray) -> np.ndarray:
+    return np.argmin(_squared_distances(points, centers), axis=1)
+
+
+def kmeans_plus_plus(points: np.ndarray, k: int, rng: np.random.Generator) -> np.ndarray:
+    centers = [points[rng.integers(len(points))]]
+    closest = _squared_distances(points, np.array(centers))[:, 0]
+    for _ in range(1, k):
+        total = closest.sum()
+        index = rng.choice(len(points), p=closest / total) if total > 0 else rng.integers(len(points))
+        centers.append(points[index])
+        closest = np.minimum(closest, _squared_distances(points, points[index:index + 1])[:, 0])
+    return np.array(centers)
+
+
+def minibatch_update(centers: np.ndarray, counts: np.ndarray, batch: np.ndarray) -> np.ndarray:
+    """
+    One mini-batch k-means step (Sculley, 2010) in place: every center moves
+    toward the mean of its batch points with learning rate 1 / points seen.
+
+    Returns:
+        np.ndarray: The batch's cluster labels (against the centers before the step).
+    """
+    k = len(centers)
+    labels = assign(batch, centers)
+    batch_counts = np.bincount(labels, minlength=k)
+    sums = np.stack([np.bincount(labels, weights=batch[:, j], minlength=k) for j in range(batch.shape[1])], axis=1)
+    hit = batch_counts > 0
+    counts[hit] += batch_counts[hit]
+    centers[hit] += (sums[hit] - batch_counts[hit, None] * centers[hit]) / counts[hit, None]
+    return labels
+
+
+def fit_minibatch_kmeans(points: np.ndarray, k: int, rng: np.random.Generator, iterations: int = MINIBATCH_ITERATIONS, inits: int = MINIBATCH_INITS) -> np.ndarray:
+    """
+    Mini-batch k-means on an in-memory array, seeded with k-means++. The best
+    (lowest inertia) of `inits` runs wins, since a poor seed can merge two clusters.
+
+    Returns:
+        np.ndarray: The centers.
+    """
+    batch_size = min(MINIBATCH_SIZE, len(points))
+    best, best_inertia = None, np.inf
+    for _ in range(inits):
+        centers = kmeans_plus_plus(points, k, rng)
+        counts = np.zeros(k)
+        for _ in range(iterations):
+            minibatch_update(centers, counts, points[rng.choice(len(points), batch_size, replace=False)])
+        inertia = _squared_distances(points, centers).min(axis=1).sum()
+        if inertia < best_inertia:
+            best, best_inertia = centers, inertia
+    return best
+
+
+def silhouette_score(points: np.ndarray, labels: np.ndarray) -> float:
+    """Mean silhouette coefficient; O(n^2) time, pairwise distances built SILHOUETTE_BLOCK rows at a time."""
+    k = labels.max() + 1
+    members = np.eye(k)[labels]
+    sizes = members.sum(axis=0)
+    if (sizes > 0).sum() < 2:
+        return 0.0
+
+    # Total distance from every point to every cluster
+    totals = np.vstack([
+        np.sqrt(_squared_distances(points[start:start + SILHOUETTE_BLOCK], points)) @ members
+        for start in range(0, len(points), SILHOUETTE_BLOCK)
+    ])
+    own_size = sizes[labels]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        intra = totals[np.arange(len(points)), labels] / (own_size - 1)
+        mean_to = totals / sizes
+    mean_to[np.arange(len(points)), labels] = np.inf
+    mean_to[:, sizes == 0] = np.inf
+    nearest = mean_to.min(axis=1)
+    scores = (nearest - intra) / np.maximum(intra, nearest)
+    # Singleton clusters score 0 by convention
+    return float(np.mean(np.where(own_size > 1, np.nan_to_num(scores), 0.0)))
+
+
+def _silhouette_sample(points: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    return points[rng.choice(len(points), min(CLUSTER_SILHOUETTE_ROWS, len(points)), replace=False)]
+
+
+def choose_k(points: np.ndarray, rng: np.random.Generator, k_min: int = CLUSTER_K_MIN, k_max: int = CLUSTER_K_MAX) -> Tuple[int, np.ndarray, float]:
+    """
+    Fits every k in [k_min, k_max] on `points` and keeps the one with the best
+    silhouette (scored on at most CLUSTER_SILHOUETTE_ROWS points).
+
+    Returns:
+        tuple: (k, centers, silhouette)
+    """
+    scored = _silhouette_sample(points, rng)
+    best = None
+    for k in range(k_min, min(k_max, len(points) - 1) + 1):
+        centers = fit_minibatch_kmeans(points, k, rng)
+        score = silhouette_score(scored, assign(scored, centers))
+        if best is None or score > best[2]:
+            best = (k, centers, score)
+    if best is None:
+        # Fewer points than clusters; every point is its own cluster
+        return len(points), points.copy(), 0.0
+    return best
+
+
+def feature_columns(columns: List[str], rows: List[tuple]) -> List[int]:
+    """Indexes of the numeric, non-identifier columns of a batch."""
+    values_by_column = list(zip(*rows)) if rows else [() for _ in columns]
+    return [
+        i for i, (name, values) in enumerate(zip(columns, values_by_column))
+        if _is_numeric_column(values) and not ID_COLUMN.search(name)
+    ]
+
+
+def _to_matrix(rows: List[tuple], features: List[int]) -> Tuple[np.ndarray, int]:
+    """Feature matrix of a batch without rows that have missing or non-numeric values; also returns the dropped count."""
+    values_by_column = list(zip(*rows))
+    matrix = np.column_stack([_to_float_array(values_by_column[i]) for i in features])
+    complete = ~np.isnan(matrix).any(axis=1)
+    return matrix[complete], int(len(matrix) - complete.sum())
+
+
+def cluster_batches(open_batches, k: Optional[int] = None, seed: int = 0) -> Optional[Dict[str, Any]]:
+    """
+    Standardized mini-batch k-means over a stream of result batches, in bounded memory.
+
+    The first pass merges per-column mean/std and keeps a reservoir sample;
+    k is chosen and the centers seeded on the standardized sample. The second
+    pass (skipped when the sample already holds every row) streams the result
+    again and feeds each batch to minibatch_update.
+
+    Args:
+        open_batches: Callable returning a fresh iterable of (columns, rows), e.g. iter_batches.
+        k (int): Number of clusters; chosen by silhouette when omitted.
+
+    Returns:
+        dict or None: { "columns", "features", "k", "silhouette", "centers" (standardized),
+        "mean", "std", "sizes", "sample", "sample_labels", "row_count", "skipped_rows", "preview" },
+        or None when the result has no numeric column.
+    """
+    rng = np.random.default_rng(seed)
+    columns, features, stats, reservoir = None, None, None, None
+    row_count = skipped = 0
+    preview: List[tuple] = []
+
+    for batch_columns, rows in open_batches():
+        if features is None:
+            columns, features = batch_columns, feature_columns(batch_columns, rows)
+            if not features:
+                return None
+            stats = StreamStats(len(features))
+            reservoir = Reservoir(CLUSTER_SAMPLE_ROWS, len(features), rng)
+            preview = rows[:PREVIEW_ROWS]
+        matrix, dropped = _to_matrix(rows, features)
+        row_count += len(rows)
+        skipped += dropped
+        stats.add(matrix)
+        reservoir.add(matrix)
+
+    if features is None or stats.count < 2:
+        return None
+
+    mean, std = stats.mean, stats.std
+    sample = (reservoir.sample - mean) / std
+    if k:
+        k = min(k, len(sample))
+        centers = fit_minibatch_kmeans(sample, k, rng)
+        scored = _silhouette_sample(sample, rng)
+        silhouette = silhouette_score(scored, assign(scored, centers))
+    else:
+        k, centers, silhouette = choose_k(sample, rng)
+
+    if reservoir.seen <= reservoir.size:
+        # Every row is in the sample, so the centers were fitted on all of them
+        sizes = np.bincount(assign(sample, centers), minlength=k)
+    else:
+        counts = np.zeros(k)
+        for _, rows in open_batches():
+            matrix, _ = _to_matrix(rows, features)
+            if len(matrix):
+                minibatch_update(centers, counts, (matrix - mean) / std)
+        sizes = counts.astype(np.int64)
+
+    return {
+        "columns": columns,
+        "features": [columns[i] for i in features],
+        "k": k,
+        "silhouette": silhouette,
+        "centers": centers,
+        "mean": mean,
+        "std": std,
+        "sizes": sizes,
+        "sample": reservoir.sample,
+        "sample_labels": assign(sample, centers),
+        "row_count": row_count,
+        "skipped_rows": skipped,
+        "preview": preview,
+    }
+
+
+def _round(value: float) -> float:
+    return round(float(value), 4)
+
+
+def build_cluster_chart_config(clustering: Dict[str, Any], title: Optional[str] = None, max_points: int = CLUSTER_CHART_POINTS) -> Dict[str, Any]:
+    """
+    Chart config for a cluster_batches result.
+
+    One feature: a bar chart of cluster sizes. Two: a scatter of sample points
+    in the original units. More: a scatter of the sample on its first two
+    principal components. Either way clusters are numbered by size and
+    colored per point, and "clusters" lists every cluster's size and centroid.
+    """
+    features, k = clustering["features"], clustering["k"]
+    order = np.argsort(-clustering["sizes"], kind="stable")
+    # Cluster number (1 = largest) of every fitted cluster
+    rank = np.empty(k, dtype=np.int64)
+    rank[order] = np.arange(k)
+    centroids = clustering["centers"] * clustering["std"] + clustering["mean"]
+    total = max(int(clustering["sizes"].sum()), 1)
+
+    clusters = [
+        {
+            "cluster": position + 1,
+            "size": int(clustering["sizes"][index]),
+            "share": _round(clustering["sizes"][index] / total),
+            "centroid": {name: _round(value) for name, value in zip(features, centroids[index])},
+        }
+        for position, index in enumerate(order.tolist())
+    ]
+    summary = {
+        "clusters": clusters,
+        "k": k,
+        "silhouette": _round(clustering["silhouette"]),
+        "rowCount": clustering["row_count"],
+        "skippedRows": clustering["skipped_rows"],
+        "features": features,
+    }
+    title = title or f"{k} clusters by {', '.join(features)}"
+
+    if len(features) == 1:
+        colors = [CLUSTER_COLORS[i % len(CLUSTER_COLORS)] for i in range(k)]
+        return {
+            "title": title,
+            "xAxisData": [f"Cluster {c['cluster']} (~{c['centroid'][features[0]]})" for c in clusters],
+            "seriesData": [{"name": "Rows", "type": "bar", "data": [c["size"] for c in clusters], "backgroundColor": colors}],
+            **summary,
+        }
+
+    # An even stride over the sample, which is in stream order until the reservoir fills
+    drawn = np.unique(np.linspace(0, len(clustering["sample"]) - 1, max_points).astype(np.int64))
+    sample, labels = clustering["sample"][drawn], rank[clustering["sample_labels"][drawn]]
+    if len(features) == 2:
+        coordinates = sample
+        axis_labels = features
+    else:
+        # Project the standardized sample onto its two main directions of variance
+        standardized = (clustering["sample"] - clustering["mean"]) / clustering["std"]
+        centered_mean = standardized.mean(axis=0)
+        _, singular, directions = np.linalg.svd(standardized - centered_mean, full_matrices=False)
+        explained = singular ** 2 / max((singular ** 2).sum(), 1e-12)
+        coordinates = ((sample - clustering["mean"]) / clustering["std"] - centered_mean) @ directions[:2].T
+        axis_labels = [f"Component {i + 1} ({explained[i]:.0%} of variance)" for i in range(2)]
+
+    colors = [CLUSTER_COLORS[label % len(CLUSTER_COLORS)] for label in labels.tolist()]
+    return {
+        "title": title,
+        "xAxisLabel": axis_labels[0],
+        "yAxisLabel": axis_labels[1],
+        "xAxisData": [],
+        "seriesData": [
+            {
+                "name": "Clusters",
+                "type": "scatter",
+                "data": [{"x": _round(x), "y": _round(y)} for x, y in coordinates[:, :2].tolist()],
+                "backgroundColor": colors,
+                "pointBackgroundColor": colors,
+                "clusterIndex": (labels + 1).tolist(),
+            }
+        ],
+        **summary,
+    }
+
+
+def cluster_query(pool, sql: str, title: Optional[str] = None, k: Optional[int] = None) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Runs the clustering for `sql` on one pooled connection, streaming the result
+    in CLUSTER_FETCH_BATCH-row batches (the query runs twice when the result is
+    larger than CLUSTER_SAMPLE_ROWS, see cluster_batches).
+
+    Returns:
+        tuple: (chart config or None without a numeric column, {"columns", "row_count", "truncated", "preview"})
+    """
+    with pool.connection() as connection:
+        clustering = cluster_batches(
+            lambda: iter_batches(connection, sql, CLUSTER_FETCH_BATCH, CLUSTER_MAX_ROWS),
+            k=k,
+        )
+    if clustering is None:
+        return None, {"columns": [], "row_count": 0, "truncated": False, "preview": []}
+
+    info = {
+        "columns": clustering["columns"],
+        "row_count": clustering["row_count"],
+        # Stopped at the cap; the query may have had more rows
+        "truncated": clustering["row_count"] >= CLUSTER_MAX_ROWS,
+        "preview": [dict(zip(clustering["columns"], row)) for row in clustering["preview"]],
+    }
+    return build_cluster_chart_config(clustering, title), info
@@ -0,0 +1,284 @@
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Optional, Tuple
+
+POOL_MIN_SIZE = int(os.getenv("POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("POOL_MAX_SIZE", "5"))
+POOL_IDLE_TIMEOUT_SECONDS = int(os.getenv("POOL_IDLE_TIMEOUT_SECONDS", "300"))
+POOL_MAX_LIFETIME_SECONDS = int(os.getenv("POOL_MAX_LIFETIME_SECONDS", "1800"))
+POOL_CHECKOUT_TIMEOUT_SECONDS = float(os.getenv("POOL_CHECKOUT_TIMEOUT_SECONDS", "30"))
+# How often idle connections of pools nobody is using get closed (and min_size restored)
+POOL_REAP_INTERVAL_SECONDS = int(os.getenv("POOL_REAP_INTERVAL_SECONDS", "60"))
+
+
+class PoolTimeoutError(Exception):
+    """Raised when no connection could be checked out within the checkout timeout."""
+
+
+def _is_closed(connection) -> bool:
+    # psycopg2 exposes `closed` (non-zero once closed), pymysql `open`
+    return bool(getattr(connection, "closed", False)) or getattr(connection, "open", True) is False
+
+
+def _close_quietly(connection):
+    if _is_closed(connection):
+        return
+    try:
+        connection.close()
+    except Exception as e:
+        print(f"[WARN] Could not close pooled connection: {e}")
+
+
+def _ping(connection) -> bool:
+    try:
+        cursor = connection.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+        cursor.close()
+        connection.rollback()
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """
+    Thread-safe pool of DB-API connections to one customer database.
+
+    `fill()` opens `min_size` connections up front; more are opened on demand,
+    up to `max_size` at a time, and pre-pinged on checkout, which waits up to
+    `checkout_timeout`. Connections are closed once idle longer than
+    `idle_timeout` (down to `min_size`) or older than `max_lifetime`, on every
+    checkout and release and by `reap()` for pools nobody uses. Connects, pings
+    and closes happen outside the lock, so a slow or dead server only stalls the
+    thread talking to it.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], Any],
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        idle_timeout: int = POOL_IDLE_TIMEOUT_SECONDS,
+        max_lifetime: int = POOL_MAX_LIFETIME_SECONDS,
+        checkout_timeout: float = POOL_CHECKOUT_TIMEOUT_SECONDS,
+    ):
+        self.connect = connect
+        self.min_size = min_size
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+        self.max_lifetime = max_lifetime
+        self.checkout_timeout = checkout_timeout
+        self.lock = threading.Condition()
+        self._idle = deque()
+        # Structure: deque of (connection, created_at, last_used)
+        self._created_at: Dict[int, float] = {}
+        # Structure: { id(connection): created_at } for checked-out connections
+        self._size = 0
+        self._closed = False
+        self._to_close = []
+        # Connections evicted under the lock, closed once it's released (_close_pending)
+
+    def acquire(self):
+        deadline = time.time() + self.checkout_timeout
+        try:
+            while True:
+                connection = None
+                with self.lock:
+                    while True:
+                        if self._closed:
+                            raise PoolTimeoutError("Pool is closed")
+                        self._evict_expired()
+
+                        if self._idle:
+                            connection, created_at, _ = self._idle.pop()
+                            break
+
+                        if self._size < self.max_size:
+                            self._size += 1
+                            break
+
+                        remaining = deadline - time.time()
+                        if remaining <= 0:
+                            raise PoolTimeoutError(f"No connection available within {self.checkout_timeout}s")
+                        self.lock.wait(remaining)
+
+                if connection is None:
+                    # A slot was reserved for a new connection
+                    break
+                # Pre-ping so callers never get a connection the server already dropped
+                if _ping(connection):
+                    with self.lock:
+                        self._created_at[id(connection)] = created_at
+                    return connection
+                _close_quietly(connection)
+                with self.lock:
+                    self._size -= 1
+                    self.lock.notify()
+        finally:
+            self._close_pending()
+
+        # Open the new connection without holding the lock
+        try:
+            connection = self.connect()
+        except Exception:
+            with self.lock:
+                self._size -= 1
+                self.lock.notify()
+            raise
+        with self.lock:
+            self._created_at[id(connection)] = time.time()
+        return connection
+
+    def release(self, connection, discard: bool = False):
+        try:
+            connection.rollback()
+        except Exception:
+            discard = True
+
+        with self.lock:
+            created_at = self._created_at.pop(id(connection), time.time())
+            if discard or self._closed or time.time() - created_at > self.max_lifetime:
+                self._to_close.append(connection)
+                self._size -= 1
+            else:
+                self._idle.append((connection, created_at, time.time()))
+            self._evict_expired()
+            self.lock.notify()
+        self._close_pending()
+
+    @contextmanager
+    def connection(self):
+        """Checks a connection out for the duration of the block."""
+        connection = self.acquire()
+        try:
+            yield connection
+        finally:
+            self.release(connection)
+
+    def fill(self):
+        """Opens connections until `min_size` exist. Connect errors are reported, not raised - checkout retries."""
+        while True:
+            with self.lock:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+
+            try:
+                connection = self.connect()
+            except Exception as e:
+                with self.lock:
+                    self._size -= 1
+                    self.lock.notify()
+                print(f"[WARN] Could not pre-open pooled connection: {e}")
+                return
+
+            with self.lock:
+                if self._closed:
+                    self._to_close.append(connection)
+                    self._size -= 1
+                else:
+                    now = time.time()
+                    self._idle.append((connection, now, now))
+                    self.lock.notify()
+            self._close_pending()
+
+    def reap(self):
+        """Closes expired idle connections and tops the pool back up to `min_size`."""
+        with self.lock:
+            self._evict_expired()
+        self._close_pending()
+        self.fill()
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"size": self._size, "idle": len(self._idle), "in_use": self._size - len(self._idle)}
+
+    def close(self):
+        """Closes the idle connections now; checked-out ones are closed when released."""
+        with self.lock:
+            self._closed = True
+            while self._idle:
+                connection, _, _ = self._idle.pop()
+                self._to_close.append(connection)
+                self._size -= 1
+            self.lock.notify_all()
+        self._close_pending()
+
+    def _evict_expired(self):
+        """Evicts idle connections past max lifetime, or idle too long while above min_size. Caller holds the lock."""
+        now = time.time()
+        kept = deque()
+        for connection, created_at, last_used in self._idle:
+            too_old = now - created_at > self.max_lifetime
+            too_idle = now - last_used > self.idle_timeout and self._size > self.min_size
+            if too_old or too_idle:
+                self._to_close.append(connection)
+                self._size -= 1
+            else:
+                kept.append((connection, created_at, last_used))
+        self._idle = kept
+
+    def _close_pending(self):
+        with self.lock:
+            pending, self._to_close = self._to_close, []
+        for connection in pending:
+            _close_quietly(connection)
+
+
+class PoolRegistry:
+    """
+    One ConnectionPool per UserConnection.id, shared by every session and tab.
+    A pool is replaced when the connection's settings (`signature`) change, so
+    edited credentials never keep being used. A background thread reaps every
+    pool each `reap_interval` seconds.
+    """
+
+    def __init__(self, reap_interval: int = POOL_REAP_INTERVAL_SECONDS):
+        self.lock = threading.Lock()
+        self.reap_interval = reap_interval
+        self._pools: Dict[int, Tuple[ConnectionPool, Optional[str]]] = {}
+        # Structure: { conn_id: (pool, signature) }
+        self._reaper: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def get_pool(self, conn_id: int, connect: Callable[[], Any], signature: Optional[str] = None) -> ConnectionPool:
+        with self.lock:
+            entry = self._pools.get(conn_id)
+            if entry and entry[1] == signature:
+                return entry[0]
+            pool = ConnectionPool(connect)
+            self._pools[conn_id] = (pool, signature)
+            if self._reaper is None and self.reap_interval > 0:
+                self._reaper = threading.Thread(target=self._reap_forever, name="pool-reaper", daemon=True)
+                self._reaper.start()
+        if entry:
+            # Settings changed; in-flight queries finish on the old pool, which then closes
+            entry[0].close()
+        pool.fill()
+        return pool
+
+    def close_all(self):
+        self._stopped.set()
+        with self.lock:
+            pools = [pool for pool, _ in self._pools.values()]
+            self._pools.clear()
+        for pool in pools:
+            pool.close()
+
+    def _reap_forever(self):
+        while not self._stopped.wait(self.reap_interval):
+            with self.lock:
+                pools = [pool for pool, _ in self._pools.values()]
+            for pool in pools:
+                try:
+                    pool.reap()
+                except Exception as e:
+                    print(f"[WARN] Pool reaping failed: {e}")
+
+
+# Singleton instance
+pool_registry = PoolRegistry()
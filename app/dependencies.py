@@ -1,13 +1,19 @@
 from fastapi import Request, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.session_manager import get_user_id
+from app.identity_cache import UserIdentity, identity_cache
 from app.database import get_db
 from app.models.user import User
 from cryptography.fernet import Fernet
 import os
 from dotenv import load_dotenv
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
+def get_current_user(request: Request, db: Session = Depends(get_db)) -> UserIdentity:
+    """
+    Resolves the session cookie to a read-only UserIdentity. The session is
+    checked on every call; the user's columns are cached per session so most
+    requests never query the users table. Load the User row (by `.id`) to change it.
+    """
     session_id = request.cookies.get("session_id")
     if not session_id:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -16,11 +22,17 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     if not user_id:
         raise HTTPException(status_code=401, detail="Session expired or invalid")
 
+    identity = identity_cache.get(session_id)
+    if identity and identity.id == user_id:
+        return identity
+
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
 
-    return user
+    identity = UserIdentity.from_user(user)
+    identity_cache.set(session_id, identity)
+    return identity
 
 
 # Ideally, store this securely (env variable or config file)
@@ -37,11 +49,19 @@ def decrypt_password(encrypted_text: str) -> str:
 
 import psycopg2
 import pymysql
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait as wait_futures
+from types import SimpleNamespace
 from app.dependencies import decrypt_password
 from app.models.user_connection import UserConnection
 
-def establish_connection(conn: UserConnection):
-   
+def connection_identity(conn: UserConnection) -> str:
+    """Stable identity of a customer database, shared by every session that connects to it."""
+    return f"{conn.db_type.lower()}://{conn.username}@{conn.host}:{conn.port}/{conn.database}"
+
+
+def open_connection(conn: UserConnection):
+    """Opens a raw psycopg2/pymysql connection; use establish_connection to get the shared pool."""
 
     password = decrypt_password(conn.encrypted_password)
 
@@ -52,7 +72,8 @@ def establish_connection(conn: UserConnection):
             dbname=conn.database,
             user=conn.username,
             password=password,
-            sslmode=conn.sslmode or "prefer"
+            sslmode=conn.sslmode or "prefer",
+            connect_timeout=int(BOOTSTRAP_TIMEOUT_SECONDS)
         )
     elif conn.db_type.lower() == "mysql":
         connection = pymysql.connect(
@@ -61,7 +82,8 @@ def establish_connection(conn: UserConnection):
             db=conn.database,
             user=conn.username,
             password=password,
-            ssl={"ssl": {}} if conn.sslmode and conn.sslmode.lower() != "disable" else None
+            ssl={"ssl": {}} if conn.sslmode and conn.sslmode.lower() != "disable" else None,
+            connect_timeout=int(BOOTSTRAP_TIMEOUT_SECONDS)
         )
     else:
         raise ValueError(f"Unsupported database type: {conn.db_type}")
@@ -70,11 +92,32 @@ def establish_connection(conn: UserConnection):
     return connection
 
 
-def fetch_schema_description(connection, db_type: str, db_name: str) -> str:
-    
-    cursor = connection.cursor()
-
-    # Step 1: Get full schema with columns
+def establish_connection(conn: UserConnection):
+    """
+    Returns the ConnectionPool for this UserConnection, shared by every session.
+    Check connections out with `with pool.connection() as connection:`.
+    """
+    from app.connection_pool import pool_registry
+
+    # Snapshot the fields - the pool outlives the DB session `conn` was loaded in
+    params = SimpleNamespace(
+        db_type=conn.db_type,
+        host=conn.host,
+        port=conn.port,
+        database=conn.database,
+        username=conn.username,
+        encrypted_password=conn.encrypted_password,
+        sslmode=conn.sslmode
+    )
+    # A changed host, user, password, ... gets a fresh pool instead of the old credentials
+    signature = f"{connection_identity(conn)}?sslmode={conn.sslmode}#{conn.encrypted_password}"
+    return pool_registry.get_pool(conn.id, lambda: open_connection(params), signature)
+
+
+def fetch_table_columns(cursor, db_type: str, db_name: str) -> dict:
+    """
+    Returns { table: [(column, data_type), ...] } from information_schema, in ordinal order.
+    """
     if db_type.lower() == "postgresql":
         cursor.execute("""
             SELECT table_name, column_name, data_type
@@ -94,36 +137,105 @@ def fetch_schema_description(connection, db_type: str, db_name: str) -> str:
 
     rows = cursor.fetchall()
 
-    # Step 2: Organize columns by table
+    # Organize columns by table
     table_columns = {}
     for table, column, dtype in rows:
         table_columns.setdefault(table, []).append((column, dtype))
+    return table_columns
+
+
+def fetch_foreign_keys(connection, cursor, db_type: str, db_name: str) -> dict:
+    """
+    Returns { table: [(column, referenced_table, referenced_column), ...] }.
+    Empty when the catalog can't be read - foreign keys are only a hint.
+    """
+    try:
+        if db_type.lower() == "postgresql":
+            cursor.execute("""
+                SELECT tc.table_name, kcu.column_name, ccu.table_name, ccu.column_name
+                FROM information_schema.table_constraints tc
+                JOIN information_schema.key_column_usage kcu
+                  ON tc.constraint_name = kcu.constraint_name AND tc.table_schema = kcu.table_schema
+                JOIN information_schema.constraint_column_usage ccu
+                  ON ccu.constraint_name = tc.constraint_name AND ccu.table_schema = tc.table_schema
+                WHERE tc.constraint_type = 'FOREIGN KEY' AND tc.table_schema = 'public'
+                ORDER BY tc.table_name, kcu.ordinal_position
+            """)
+        elif db_type.lower() == "mysql":
+            cursor.execute("""
+                SELECT table_name, column_name, referenced_table_name, referenced_column_name
+                FROM information_schema.key_column_usage
+                WHERE table_schema = %s AND referenced_table_name IS NOT NULL
+                ORDER BY table_name, ordinal_position
+            """, (db_name,))
+        else:
+            return {}
+        rows = cursor.fetchall()
+    except Exception as e:
+        connection.rollback()
+        print(f"[WARN] Could not read foreign keys: {e}")
+        return {}
+
+    foreign_keys = {}
+    for table, column, ref_table, ref_column in rows:
+        foreign_keys.setdefault(table, []).append((column, ref_table, ref_column))
+    return foreign_keys
+
+
+def describe_table(connection, cursor, table: str, columns: list, sample: dict = None, foreign_keys: list = None, schema_format: str = None) -> str:
+    """
+    Renders one table's block of the schema description: columns, foreign keys
+    and example rows, in SCHEMA_FORMAT unless `schema_format` is given.
+
+    `sample` is this table's entry from fetch_table_samples; without it the
+    example rows are queried for this table alone.
+    """
+    from app.schema_format import format_table
+
+    if sample is None:
+        sample = _fetch_single_table_sample(connection, cursor, table)
+    return format_table(table, columns, sample, foreign_keys, schema_format)
+
+
+def _fetch_single_table_sample(connection, cursor, table: str) -> dict:
+    try:
+        cursor.execute(f"SELECT * FROM {table} LIMIT 3")
+        example_rows = cursor.fetchall()
+        col_names = [desc[0] for desc in cursor.description]
+        return {"rows": [dict(zip(col_names, row)) for row in example_rows]}
+    except Exception as e:
+        # A failed statement aborts the transaction on PostgreSQL; reset it for the next table
+        connection.rollback()
+        return {"error": str(e)}
+
+
+def fetch_samples(connection, cursor, db_type: str, table_columns: dict) -> dict:
+    """
+    Example rows for every table in `table_columns`: batched UNION ALL round trips
+    by default, or None per table (queried one by one) when SCHEMA_SAMPLE_MODE=per_table.
+    """
+    from app.schema_sampling import SCHEMA_SAMPLE_MODE, fetch_table_samples
+
+    if SCHEMA_SAMPLE_MODE == "per_table" or not table_columns:
+        return {}
+    return fetch_table_samples(connection, cursor, db_type, table_columns)
 
-    schema_description = []
-    total_columns = 0
-
-    for table, columns in table_columns.items():
-        schema_description.append(f"\n### Table: {table}")
-        schema_description.append("Columns:")
-        for column, dtype in columns:
-            schema_description.append(f"- {column} ({dtype})")
-            total_columns += 1
-
-        # Step 3: Fetch example rows
-        try:
-            cursor.execute(f"SELECT * FROM {table} LIMIT 3")
-            example_rows = cursor.fetchall()
-            col_names = [desc[0] for desc in cursor.description]
-
-            if example_rows:
-                schema_description.append("Example rows:")
-                for row in example_rows:
-                    row_dict = dict(zip(col_names, row))
-                    schema_description.append(f"- {row_dict}")
-            else:
-                schema_description.append("Example rows: [No data present]")
-        except Exception as e:
-            schema_description.append(f"Example rows: [Error fetching rows - {e}]")
+
+def fetch_schema_description(connection, db_type: str, db_name: str) -> str:
+    
+    cursor = connection.cursor()
+
+    # Step 1: Get full schema with columns
+    table_columns = fetch_table_columns(cursor, db_type, db_name)
+
+    foreign_keys = fetch_foreign_keys(connection, cursor, db_type, db_name)
+
+    # Step 2: Sample many tables per round trip, then describe each one
+    samples = fetch_samples(connection, cursor, db_type, table_columns)
+    schema_description = [
+        describe_table(connection, cursor, table, columns, samples.get(table), foreign_keys.get(table))
+        for table, columns in table_columns.items()
+    ]
 
     cursor.close()
 
@@ -133,30 +245,108 @@ def fetch_schema_description(connection, db_type: str, db_name: str) -> str:
 
 
 
-def init_user_connections(session_id: str, user_id: int, db: Session):
+BOOTSTRAP_MAX_WORKERS = int(os.getenv("BOOTSTRAP_MAX_WORKERS", "8"))
+# Per connection, counted from when a worker starts on it
+BOOTSTRAP_TIMEOUT_SECONDS = float(os.getenv("BOOTSTRAP_TIMEOUT_SECONDS", "20"))
+# How long a connection may wait for a free worker before the page load gives up on it
+BOOTSTRAP_QUEUE_TIMEOUT_SECONDS = float(os.getenv("BOOTSTRAP_QUEUE_TIMEOUT_SECONDS", "60"))
+
+# Shared by every page load, so concurrent loads can't multiply the connect threads
+bootstrap_executor = ThreadPoolExecutor(max_workers=BOOTSTRAP_MAX_WORKERS, thread_name_prefix="conn-bootstrap")
+
+
+def _bootstrap_connection(session_id: str, db_id: str, conn: UserConnection):
+    from app.session_connection import session_conn_manager
+    from app.sql_cache import prompt_sql_cache
+    from app.result_cache import query_result_cache
+    from app.schema_catalog import schema_catalog
+    from app.schema_index import schema_index_cache
+
+    pool = establish_connection(conn)
+    identity = connection_identity(conn)
+    with pool.connection() as connection:
+        # Shared across sessions; only tables whose columns changed get re-described
+        schema = schema_catalog.get_schema(identity, connection, conn.db_type, conn.database)
+    if prompt_sql_cache.track_schema(identity, schema):
+        # Schema changed under us - cached results may no longer match it
+        query_result_cache.invalidate(identity)
+    # Build the table index now so the first question doesn't pay for it
+    schema_index_cache.get_index(schema)
+    session_conn_manager.set_connection(session_id, db_id, pool, schema, identity)
+
+
+def _bootstrap_when_started(started: dict, session_id: str, db_id: str, conn: UserConnection):
+    # Runs on a bootstrap worker; the waiting page load times the connection from here
+    started[db_id] = time.monotonic()
+    _bootstrap_connection(session_id, db_id, conn)
+
+
+def init_user_connections(session_id: str, user_id: int, db: Session) -> dict:
+    """
+    Connects and describes every saved connection of the user concurrently on the
+    shared bootstrap executor, so the page waits for the slowest connection rather
+    than the sum of all of them.
+
+    Each connection gets BOOTSTRAP_TIMEOUT_SECONDS from when a worker starts on it,
+    so connections queued behind busy workers (this page's or another's) aren't
+    charged for the wait. One still queued after BOOTSTRAP_QUEUE_TIMEOUT_SECONDS
+    is cancelled. A timeout only stops the wait: a connect already running keeps
+    going - and holding its worker - until the driver gives up, and a late success
+    still lands in the session cache.
+
+    Returns:
+        dict: { db_id: {"status": "cached" | "ok" | "failed" | "timeout", "error": str | None} }
+    """
     from app.models.user_connection import UserConnection
     from app.session_connection import session_conn_manager
   
     user_connections = db.query(UserConnection).filter(UserConnection.user_id == user_id).all()
+    report = {}
 
-    if not user_connections:
-       
-        return
-
+    pending = {}
     for conn in user_connections:
         db_id = f"{conn.db_type} - {conn.database}"
-        
 
         if session_conn_manager.get_connection(session_id, db_id):
-            
+            report[db_id] = {"status": "cached", "error": None}
             continue
-
-        try:
-           
-            connection = establish_connection(conn)
-            schema = fetch_schema_description(connection, conn.db_type, conn.database)
-            session_conn_manager.set_connection(session_id, db_id, connection, schema)
-           
-        except Exception as e:
-            print(f"[ERROR] Failed to connect to {db_id}: {e}")
-
+        pending[db_id] = conn
+
+    if not pending:
+        return report
+
+    started = {}
+    # Structure: { db_id: monotonic time a worker picked it up }
+    futures = {
+        db_id: bootstrap_executor.submit(_bootstrap_when_started, started, session_id, db_id, conn)
+        for db_id, conn in pending.items()
+    }
+    queue_deadline = time.monotonic() + BOOTSTRAP_QUEUE_TIMEOUT_SECONDS
+    results = {}
+
+    while futures:
+        now = time.monotonic()
+        for db_id, future in list(futures.items()):
+            if future.done():
+                error = future.exception()
+                results[db_id] = {"status": "failed", "error": str(error)} if error else {"status": "ok", "error": None}
+            elif db_id in started:
+                if now < started[db_id] + BOOTSTRAP_TIMEOUT_SECONDS:
+                    continue
+                results[db_id] = {"status": "timeout", "error": f"No response within {BOOTSTRAP_TIMEOUT_SECONDS:g}s"}
+            elif now >= queue_deadline and future.cancel():
+                results[db_id] = {"status": "timeout", "error": f"Not started within {BOOTSTRAP_QUEUE_TIMEOUT_SECONDS:g}s"}
+            else:
+                # Queued, or picked up just now and not yet in `started`
+                continue
+            del futures[db_id]
+
+        if futures:
+            deadlines = [
+                started[db_id] + BOOTSTRAP_TIMEOUT_SECONDS if db_id in started else queue_deadline
+                for db_id in futures
+            ]
+            wait_futures(futures.values(), timeout=max(min(deadlines) - time.monotonic(), 0.01), return_when=FIRST_COMPLETED)
+
+    report.update((db_id, results[db_id]) for db_id in pending)
+    return report
@@ -0,0 +1,135 @@
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.forecast_result import ForecastSeries
+
+# Seasonal periods tried by detect_seasonality (in observations, whatever the spacing)
+SEASONAL_CANDIDATES = (4, 7, 12, 24, 52, 168, 365)
+SEASONALITY_MIN_ACF = float(os.getenv("FORECAST_SEASONALITY_MIN_ACF", "0.3"))
+# Trend damping, so long horizons flatten out instead of extrapolating a line forever
+DAMPING = 0.98
+
+ALPHAS = np.array([0.05, 0.1, 0.2, 0.35, 0.5, 0.7, 0.9])
+BETAS = np.array([0.0, 0.01, 0.05, 0.1, 0.2])
+GAMMAS = np.array([0.0, 0.05, 0.1, 0.2, 0.4])
+
+
+def _to_arrays(ds, y) -> Tuple[np.ndarray, np.ndarray]:
+    """datetime64[s] dates and float values, sorted by date, without missing values."""
+    dates = np.array(list(ds), dtype="datetime64[s]")
+    values = np.array([np.nan if v is None else v for v in y], dtype=float)
+    keep = ~np.isnan(values) & ~np.isnat(dates)
+    dates, values = dates[keep], values[keep]
+    order = np.argsort(dates, kind="stable")
+    return dates[order], values[order]
+
+
+def detect_seasonality(values: np.ndarray, candidates=SEASONAL_CANDIDATES, min_acf: float = SEASONALITY_MIN_ACF) -> Optional[int]:
+    """
+    Seasonal period with the strongest autocorrelation of the differenced series,
+    or None when no candidate reaches `min_acf` (or the series is too short).
+    """
+    diffs = np.diff(values)
+    candidates = [m for m in candidates if 2 * m <= len(values)]
+    if not candidates or len(diffs) < 4:
+        return None
+
+    centered = diffs - diffs.mean()
+    variance = np.dot(centered, centered)
+    if variance == 0:
+        return None
+    # Autocorrelation at every lag in one FFT
+    size = 1 << (2 * len(centered) - 1).bit_length()
+    spectrum = np.fft.rfft(centered, size)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), size)[:len(centered)] / variance
+
+    best = max(candidates, key=lambda m: acf[m] if m < len(acf) else -1)
+    return best if best < len(acf) and acf[best] >= min_acf else None
+
+
+def fit_holt_winters(values: np.ndarray, season: Optional[int]) -> Dict:
+    """
+    Additive damped Holt-Winters fitted by grid search: every (alpha, beta, gamma)
+    combination is run at once as a vector, and the one with the lowest in-sample
+    one-step-ahead squared error wins.
+
+    Returns:
+        dict: { "level", "trend", "seasonal" (array or None), "season", "params", "sse", "n" }
+    """
+    n = len(values)
+    m = season or 0
+    if m:
+        alpha, beta, gamma = (g.ravel() for g in np.meshgrid(ALPHAS, BETAS, GAMMAS, indexing="ij"))
+        level = np.full(alpha.shape, values[:m].mean())
+        trend = np.full(alpha.shape, (values[m:2 * m].mean() - values[:m].mean()) / m)
+        seasonal = np.tile(values[:m] - values[:m].mean(), (len(alpha), 1))
+    else:
+        alpha, beta = (g.ravel() for g in np.meshgrid(ALPHAS, BETAS, indexing="ij"))
+        gamma = np.zeros_like(alpha)
+        level = np.full(alpha.shape, values[0])
+        trend = np.full(alpha.shape, values[1] - values[0] if n > 1 else 0.0)
+        seasonal = None
+
+    sse = np.zeros_like(alpha)
+    for t in range(n):
+        s = seasonal[:, t % m] if m else 0.0
+        error = values[t] - (level + DAMPING * trend + s)
+        sse += error * error
+        new_level = alpha * (values[t] - s) + (1 - alpha) * (level + DAMPING * trend)
+        trend = beta * (new_level - level) + (1 - beta) * DAMPING * trend
+        if m:
+            seasonal[:, t % m] = gamma * (values[t] - new_level) + (1 - gamma) * s
+        level = new_level
+
+    best = int(np.argmin(sse))
+    return {
+        "level": level[best],
+        "trend": trend[best],
+        "seasonal": seasonal[best] if m else None,
+        "season": m or None,
+        "params": {"alpha": alpha[best], "beta": beta[best], "gamma": gamma[best]},
+        "sse": sse[best],
+        "n": n,
+    }
+
+
+def predict_holt_winters(model: Dict, horizon: int) -> np.ndarray:
+    steps = np.arange(1, horizon + 1)
+    # Sum of DAMPING^1..DAMPING^h for every step h
+    damped = np.cumsum(DAMPING ** steps)
+    forecast = model["level"] + damped * model["trend"]
+    if model["season"]:
+        forecast = forecast + model["seasonal"][(model["n"] + steps - 1) % model["season"]]
+    return forecast
+
+
+def forecast_steps(step: np.timedelta64, period_days: int) -> int:
+    """Observations needed to cover `period_days` days at a spacing of `step` (at least one)."""
+    step_days = step / np.timedelta64(1, "D")
+    return max(int(np.ceil(period_days / step_days - 1e-9)), 1)
+
+
+def holt_winters_forecast(ds, y, period: int) -> ForecastSeries:
+    """
+    Fast alternative to the Prophet path of run_forecasting.
+
+    `period` is in days, as get_period returns it. Future dates step by the
+    series' median spacing, so a monthly series forecast 30 days ahead gets
+    one point and a weekly one five.
+
+    Returns:
+        ForecastSeries: The history (sorted, without missing values) followed by the forecast points.
+    """
+    dates, values = _to_arrays(ds, y)
+    if len(values) < 2:
+        raise ValueError("At least two observations are needed to forecast")
+
+    model = fit_holt_winters(values, detect_seasonality(values))
+    step = np.median(np.diff(dates))
+    if step <= np.timedelta64(0, "s"):
+        step = np.timedelta64(1, "D")
+    steps = forecast_steps(step, period)
+    future_dates = dates[-1] + step * np.arange(1, steps + 1)
+    return ForecastSeries.from_parts(dates, values, future_dates, predict_holt_winters(model, steps))
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+FORECAST_MODEL_CACHE_ENABLED = os.getenv("FORECAST_MODEL_CACHE_ENABLED", "true").lower() == "true"
+FORECAST_MODEL_CACHE_TTL_SECONDS = int(os.getenv("FORECAST_MODEL_CACHE_TTL_SECONDS", "3600"))
+FORECAST_MODEL_CACHE_MAX_BYTES = int(os.getenv("FORECAST_MODEL_CACHE_MAX_BYTES", str(128 * 1024 * 1024)))
+
+
+def series_fingerprint(data, settings: Dict) -> str:
+    """
+    Hash of the (ds, y) series plus the model settings - the horizon is left out
+    so a forecast with a different period reuses the same fitted model.
+    """
+    if isinstance(data, dict):
+        ds, y = data["ds"], data["y"]
+    else:
+        ds, y = [row["ds"] for row in data], [row["y"] for row in data]
+
+    digest = hashlib.sha256(json.dumps(settings, sort_keys=True).encode("utf-8"))
+    if isinstance(ds, np.ndarray) and isinstance(y, np.ndarray):
+        digest.update(ds.astype("datetime64[s]").astype("int64").tobytes())
+        digest.update(y.astype("float64").tobytes())
+    else:
+        # One join per column instead of an encode and update per point
+        digest.update("\n".join(map(str, ds)).encode("utf-8"))
+        digest.update(b"\x1f")
+        digest.update("\n".join(map(str, y)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class ForecastModelCache:
+    """
+    LRU of serialized fitted forecast models keyed by series_fingerprint.
+
+    Entries expire after `ttl_seconds` and the least recently used ones are
+    evicted once the serialized models exceed `max_bytes`. Each entry remembers
+    how long its fit took, so hits can report the fit time they saved.
+    """
+
+    def __init__(self, ttl_seconds: int, max_bytes: int, enabled: bool = True):
+        self.lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        # Structure: { fingerprint: { "model": str, "size": int, "fit_seconds": float, "expires_at": float } }
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "fit_seconds_saved": 0.0}
+
+    def get(self, key: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry and entry["expires_at"] > time.time():
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                self._stats["fit_seconds_saved"] += entry["fit_seconds"]
+                return entry["model"]
+            if entry:
+                self._drop(key)
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, model: str, fit_seconds: float):
+        size = len(model)
+        if not self.enabled or size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = {
+                "model": model,
+                "size": size,
+                "fit_seconds": fit_seconds,
+                "expires_at": time.time() + self.ttl_seconds,
+            }
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self.lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self._stats)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key)
+        self._bytes -= entry["size"]
+
+
+# Singleton instance
+forecast_model_cache = ForecastModelCache(
+    ttl_seconds=FORECAST_MODEL_CACHE_TTL_SECONDS,
+    max_bytes=FORECAST_MODEL_CACHE_MAX_BYTES,
+    enabled=FORECAST_MODEL_CACHE_ENABLED,
+)
@@ -0,0 +1,223 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional
+
+from app.forecast_cache import forecast_model_cache, series_fingerprint
+from app.techniques import select_forecast_engine
+
+FORECAST_WORKERS = int(os.getenv("FORECAST_WORKERS", str(max(1, min(4, (os.cpu_count() or 2) - 1)))))
+# Jobs queued or running at once; submit() beyond this fails fast instead of piling up
+FORECAST_MAX_QUEUE = int(os.getenv("FORECAST_MAX_QUEUE", "16"))
+FORECAST_TIMEOUT_SECONDS = float(os.getenv("FORECAST_TIMEOUT_SECONDS", "120"))
+FORECAST_JOB_TTL_SECONDS = int(os.getenv("FORECAST_JOB_TTL_SECONDS", "600"))
+FORECAST_PREWARM = os.getenv("FORECAST_PREWARM", "true").lower() == "true"
+# "spawn" keeps workers independent of the server's threads and open sockets
+FORECAST_START_METHOD = os.getenv("FORECAST_START_METHOD", "spawn")
+# Part of the fitted-model cache key; change it when the Prophet configuration changes
+FORECAST_MODEL_SETTINGS = {"engine": "prophet"}
+
+
+class ForecastQueueFullError(Exception):
+    """Raised when FORECAST_MAX_QUEUE forecast jobs are already queued or running."""
+
+
+class ForecastTimeoutError(Exception):
+    """Raised when a forecast job does not finish within its timeout."""
+
+
+def _warm_worker():
+    """Process initializer: pay the Prophet / cmdstan import once per worker, not per job."""
+    import pandas  # noqa: F401
+    from prophet import Prophet  # noqa: F401
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _run_job(data, user_prompt, period, model_json, engine):
+    from app.techniques import run_forecasting_with_model
+    return run_forecasting_with_model(data, user_prompt, period, model_json, engine)
+
+
+class ForecastExecutor:
+    """
+    Runs forecast fits in a pool of worker processes so they never block the event loop.
+
+    Jobs are tracked by id: submit() returns one, poll() reports its status and
+    wait() awaits its result; run() does both for request handlers. A job that
+    times out is cancelled if it has not started yet - a fit that is already
+    running keeps its worker until it finishes.
+
+    Fitted models are kept in forecast_model_cache, so re-running a forecast on
+    the same series (e.g. only with another horizon) skips the fit.
+    """
+
+    def __init__(self, workers: int, max_queue: int, timeout: float, job_ttl: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.job_ttl = job_ttl
+        self.lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        # Structure: { job_id: {"future", "submitted_at", "finished_at"} }
+
+    def start(self, prewarm: bool = FORECAST_PREWARM):
+        """Creates the worker pool; with prewarm, every worker is spawned and imports Prophet now."""
+        with self.lock:
+            if self._pool is None:
+                self._pool = self._new_pool()
+            pool = self._pool
+        if prewarm:
+            # Workers are spawned on demand; one trivial job each brings them all up in the background
+            for _ in range(self.workers):
+                pool.submit(_ready)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context(FORECAST_START_METHOD),
+            initializer=_warm_worker,
+        )
+
+    def shutdown(self):
+        with self.lock:
+            pool, self._pool = self._pool, None
+            self._jobs.clear()
+        if pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, data, user_prompt, period, engine=None) -> str:
+        """
+        Queues a run_forecasting job, reusing a cached fitted Prophet model of the same series.
+
+        Args:
+            engine (str): Forecast engine override, see select_forecast_engine.
+
+        Returns:
+            str: Job id for poll() / wait().
+
+        Raises:
+            ForecastQueueFullError: FORECAST_MAX_QUEUE jobs are already pending.
+        """
+        if self._pool is None:
+            self.start(prewarm=False)
+
+        n_points = len(data["y"]) if isinstance(data, dict) else len(data)
+        engine = select_forecast_engine(n_points, engine)
+        # Only Prophet fits are worth caching
+        cache_key = series_fingerprint(data, FORECAST_MODEL_SETTINGS) if engine == "prophet" else None
+        model_json = forecast_model_cache.get(cache_key) if cache_key else None
+
+        with self.lock:
+            self._prune_finished()
+            pending = sum(1 for job in self._jobs.values() if not job["future"].done())
+            if pending >= self.max_queue:
+                raise ForecastQueueFullError(f"{pending} forecasts already queued; try again shortly")
+
+            job_id = uuid.uuid4().hex
+            try:
+                future = self._pool.submit(_run_job, data, user_prompt, period, model_json, engine)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); replace the whole pool
+                print("[WARN] Forecast worker pool broken; restarting it")
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+                future = self._pool.submit(_run_job, data, user_prompt, period, model_json, engine)
+            job = {"future": future, "submitted_at": time.time(), "finished_at": None}
+            self._jobs[job_id] = job
+
+        def on_done(done_future):
+            job["finished_at"] = time.time()
+            if done_future.cancelled() or done_future.exception():
+                return
+            _, new_model_json, fit_seconds = done_future.result()
+            if new_model_json:
+                forecast_model_cache.set(cache_key, new_model_json, fit_seconds)
+
+        future.add_done_callback(on_done)
+        return job_id
+
+    def poll(self, job_id: str) -> Dict[str, Any]:
+        """
+        Returns:
+            dict: {"status": "unknown" | "pending" | "running" | "done" | "failed" | "cancelled", "result", "error"}
+        """
+        with self.lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return {"status": "unknown", "result": None, "error": None}
+
+        future = job["future"]
+        if future.cancelled():
+            return {"status": "cancelled", "result": None, "error": None}
+        if not future.done():
+            return {"status": "running" if future.running() else "pending", "result": None, "error": None}
+        if future.exception():
+            return {"status": "failed", "result": None, "error": str(future.exception())}
+        return {"status": "done", "result": future.result()[0], "error": None}
+
+    async def wait(self, job_id: str, timeout: Optional[float] = None):
+        """
+        Awaits a job's result without blocking the event loop.
+
+        Raises:
+            KeyError: Unknown job id.
+            ForecastTimeoutError: Not finished within `timeout` (default FORECAST_TIMEOUT_SECONDS).
+        """
+        timeout = timeout or self.timeout
+        with self.lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            raise KeyError(job_id)
+
+        future = job["future"]
+        try:
+            chart_data, _, _ = await asyncio.wait_for(asyncio.wrap_future(future), timeout=timeout)
+            return chart_data
+        except asyncio.TimeoutError:
+            # Only takes effect while the job is still queued
+            future.cancel()
+            raise ForecastTimeoutError(f"Forecast did not finish within {timeout}s")
+
+    async def run(self, data, user_prompt, period, timeout: Optional[float] = None, engine=None):
+        """
+        Submits a job and awaits its result. Submitting hashes the whole series
+        for the model cache, so it runs in a thread to keep the event loop free.
+        """
+        job_id = await asyncio.to_thread(self.submit, data, user_prompt, period, engine)
+        try:
+            return await self.wait(job_id, timeout)
+        finally:
+            with self.lock:
+                self._jobs.pop(job_id, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            pending = sum(1 for job in self._jobs.values() if not job["future"].done())
+            return {"workers": self.workers, "pending": pending, "tracked": len(self._jobs)}
+
+    def _prune_finished(self):
+        """Forgets jobs finished more than job_ttl ago. Caller holds the lock."""
+        cutoff = time.time() - self.job_ttl
+        for job_id in [
+            job_id for job_id, job in self._jobs.items()
+            if job["future"].done() and job["finished_at"] and job["finished_at"] < cutoff
+        ]:
+            del self._jobs[job_id]
+
+
+# Singleton instance
+forecast_executor = ForecastExecutor(
+    workers=FORECAST_WORKERS,
+    max_queue=FORECAST_MAX_QUEUE,
+    timeout=FORECAST_TIMEOUT_SECONDS,
+    job_ttl=FORECAST_JOB_TTL_SECONDS,
+)
@@ -0,0 +1,66 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class ForecastSeries:
+    """
+    Forecast output kept as arrays instead of one dict per point: dates
+    (datetime64[s]), values (float64) and a mask that is True for forecast
+    points and False for historical ones.
+
+    It pickles as three buffers, so it crosses the forecast worker process
+    boundary cheaply, and window() trims it for charting without a Python loop.
+    """
+
+    def __init__(self, dates: np.ndarray, values: np.ndarray, is_forecast: np.ndarray):
+        self.dates = np.asarray(dates, dtype="datetime64[s]")
+        self.values = np.asarray(values, dtype=float)
+        self.is_forecast = np.asarray(is_forecast, dtype=bool)
+
+    @classmethod
+    def from_parts(cls, history_dates, history_values, forecast_dates, forecast_values) -> "ForecastSeries":
+        """Historical points followed by forecast points."""
+        history_dates = np.asarray(history_dates, dtype="datetime64[s]")
+        forecast_dates = np.asarray(forecast_dates, dtype="datetime64[s]")
+        return cls(
+            np.concatenate([history_dates, forecast_dates]),
+            np.concatenate([np.asarray(history_values, dtype=float), np.asarray(forecast_values, dtype=float)]),
+            np.concatenate([np.zeros(len(history_dates), dtype=bool), np.ones(len(forecast_dates), dtype=bool)]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def window(self, period: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        The last `period` historical points followed by the first `period` forecast points.
+
+        Returns:
+            tuple: (dates, values) arrays
+        """
+        history = np.flatnonzero(~self.is_forecast)[-period:]
+        forecast = np.flatnonzero(self.is_forecast)[:period]
+        index = np.concatenate([history, forecast])
+        return self.dates[index], self.values[index]
+
+    def chart_axes(self, period: Optional[int] = None) -> Tuple[List[str], List[Any]]:
+        """
+        Dates as 'YYYY-MM-DD' strings and values as floats (missing values as None),
+        windowed by `period` when given.
+        """
+        dates, values = self.window(period) if period is not None else (self.dates, self.values)
+        labels = np.datetime_as_string(dates, unit="D").tolist()
+        missing = np.isnan(values)
+        if missing.any():
+            values = values.astype(object)
+            values[missing] = None
+        return labels, values.tolist()
+
+    def records(self) -> List[Dict[str, Any]]:
+        """The row-wise form: [{ "date": datetime, "value": float, "type": "historical" | "forecast" }]."""
+        types = np.where(self.is_forecast, "forecast", "historical").tolist()
+        return [
+            {"date": date, "value": value, "type": kind}
+            for date, value, kind in zip(self.dates.tolist(), self.values.tolist(), types)
+        ]
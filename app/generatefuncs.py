@@ -1,23 +1,18 @@
 import re
 from app.models.user_connection import UserConnection
 from sqlalchemy.orm import Session
-from openai import OpenAI
-from dotenv import load_dotenv
-import os
 from app.generate_helper import clean_sql
+from app.llm_gateway import llm_gateway
+from app.sql_cache import prompt_sql_cache
+from app.schema_index import prune_schema
 import json
+import os
 from decimal import Decimal
 from datetime import date, datetime
 import json
 import re
 
 
-load_dotenv()  # Load from .env
-api_key = os.getenv("DEEPSEEK_API_KEY")
-
-
-client = OpenAI(api_key=api_key)
-
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
         if isinstance(obj, Decimal):
@@ -27,7 +22,7 @@ class DecimalEncoder(json.JSONEncoder):
         return super().default(obj)
 
 
-def generate_sql_from_prompt(user_prompt, schema_description, database_type):
+async def generate_sql_from_prompt(user_prompt, schema_description, database_type, question=None):
     
     """
     Converts natural language questions to raw SQL queries using LLM via RunPod.
@@ -35,10 +30,21 @@ def generate_sql_from_prompt(user_prompt, schema_description, database_type):
     Args:
         user_prompt (str): User's question in plain English.
         schema_description (str): Database table/column schema.
+        question (str): The user's own words when `user_prompt` wraps them in an
+            intent template; tables are picked from it so template words don't count.
 
     Returns:
         str: Cleaned raw SQL query string (no explanation, no formatting).
     """
+    # Same question against the same schema -> reuse the SQL we already generated
+    cached_sql = await prompt_sql_cache.get("sql", user_prompt, database_type, schema_description)
+    if cached_sql:
+        prompt_sql_cache.hold("sql", user_prompt, database_type, schema_description, cached_sql, cached_sql, stored=True)
+        return cached_sql
+
+    # Only the tables relevant to the question (cache key stays on the full schema)
+    relevant_schema = prune_schema(schema_description, question or user_prompt)
+
     # Construct a strict prompt
     prompt = f"""
 You are a professional AI SQL assistant.
@@ -47,7 +53,7 @@ Your job is to generate a syntactically correct SQL query for a {database_type}
 given the schema and user question.
 
 ### SCHEMA ###
-{schema_description}
+{relevant_schema}
 
 ### INSTRUCTIONS ###
 - Generate ONLY the SQL query.
@@ -64,22 +70,16 @@ given the schema and user question.
 """
 
     # Call the model (DeepSeek/Llama etc.)
-    sqlquery = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ]
-    )
+    sqlquery = await llm_gateway.complete(prompt)
 
     # Extract only SQL from response
-    sqlquery = clean_sql(sqlquery.choices[0].message.content.strip())
+    sqlquery = clean_sql(sqlquery)
+    # Cached once the pipeline has run it (prompt_sql_cache.commit)
+    prompt_sql_cache.hold("sql", user_prompt, database_type, schema_description, sqlquery, sqlquery, stored=False)
     return sqlquery
 
 
-def generate_echarts_config(user_prompt, results, chart_type):
+async def generate_echarts_config(user_prompt, results, chart_type):
     """
     Generates visualization specifications using predefined JSON templates
     
@@ -144,15 +144,7 @@ Instructions:
 Please use chart labels in the language of the user prompt.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[{
-            "role": "user",
-            "content": prompt
-        }]
-    )
-
-    content = response.choices[0].message.content.strip()
+    content = await llm_gateway.complete(prompt)
 
     # Clean triple backtick-wrapped JSON
     cleaned = re.sub(r"^```json\s*|\s*```$", "", content.strip(), flags=re.IGNORECASE)
@@ -164,6 +156,47 @@ Please use chart labels in the language of the user prompt.
         return {}
     
 
+CHART_LLM_LABELS = os.getenv("CHART_LLM_LABELS", "true").lower() == "true"
+
+
+async def generate_chart_labels(user_prompt, columns, chart_type):
+    """
+    Asks the LLM for a chart title and series labels from the column names only.
+    The data itself is mapped locally by app.chart_builder.build_chart_config.
+
+    Args:
+        user_prompt (str): The visualization request
+        columns (list): Column names of the SQL result
+        chart_type (str): Chart type ('pie', 'bar', 'line')
+
+    Returns:
+        dict: {'title': str, 'series': {column: label}}, empty on failure
+    """
+    prompt = f"""
+You are a chart labelling assistant.
+Question: {user_prompt}
+Chart type: {chart_type}
+Result columns: {columns}
+
+Return ONLY valid JSON of the form:
+{{"title": "...", "series": {{"<column name>": "<descriptive label>"}}}}
+
+Please use the language of the user prompt.
+"""
+
+    try:
+        content = await llm_gateway.complete(prompt)
+        labels = json.loads(re.sub(r"^```json\s*|\s*```$", "", content, flags=re.IGNORECASE))
+    except Exception:
+        return {}
+
+    if not isinstance(labels, dict):
+        return {}
+    if not isinstance(labels.get("series"), dict):
+        labels["series"] = {}
+    return labels
+
+
 def generate_forecast_config(user_prompt, forecast_result, period, chart_type="line"):
     """
     Generates forecast visualization config in a simplified single-series format:
@@ -174,37 +207,11 @@ def generate_forecast_config(user_prompt, forecast_result, period, chart_type="l
             {"name": "Total Sales", "type": "line", "data": [...]}
         ]
     }
-    """
-   
-    x_axis_data = []
-    combined_data = []
-
-    historical_data = []
-    forecast_data = []
-
-    historical_dates = []
-    forecast_dates = []
-
-    for item in forecast_result:
-        date_str = item['date'].strftime('%Y-%m-%d')
-        value = float(item['value']) if isinstance(item['value'], Decimal) else item['value']
-
-        if item['type'] == 'historical':
-            historical_data.append(value)
-            historical_dates.append(date_str)
-        else:
-            forecast_data.append(value)
-            forecast_dates.append(date_str)
 
-    # Trim to ensure equal period entries
-    historical_data = historical_data[-period:]
-    forecast_data = forecast_data[:period]
-    historical_dates = historical_dates[-period:]
-    forecast_dates = forecast_dates[:period]
-
-    # Combine x-axis and data
-    x_axis_data = historical_dates + forecast_dates
-    combined_data = historical_data + forecast_data
+    forecast_result is the ForecastSeries from run_forecasting; the last `period`
+    historical and first `period` forecast points are kept.
+    """
+    x_axis_data, combined_data = forecast_result.chart_axes(period)
 
     return {
         "title": f"Forecast: {user_prompt[:50]}..." if len(user_prompt) > 50 else user_prompt,
@@ -220,7 +227,7 @@ def generate_forecast_config(user_prompt, forecast_result, period, chart_type="l
 
 
 
-def classify_intent_with_llm(user_prompt):
+async def classify_intent_with_llm(user_prompt):
     """
     Determines the type of analysis requested using LLM.
 
@@ -245,12 +252,7 @@ User's Request: {user_prompt}
 Respond with ONLY the intent name, no explanations.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    intent = response.choices[0].message.content.strip().lower()
+    intent = (await llm_gateway.complete(prompt)).lower()
 
     # Fallback validation
     allowed_intents = ["visualization", "anomaly_detection", "prediction", "forecasting", "clustering"]
@@ -264,7 +266,7 @@ Respond with ONLY the intent name, no explanations.
 
 
 
-def generate_sql_from_prompt_for_prophet(prompt, schema, db_type):
+async def generate_sql_from_prompt_for_prophet(prompt, schema, db_type):
     """
     Generates SQL queries specifically optimized for Prophet forecasting,
     preparing data in the required ds (date) and y (metric) format.
@@ -298,7 +300,7 @@ def generate_sql_from_prompt_for_prophet(prompt, schema, db_type):
     """
     
     # Use the existing function with our enhanced Prophet prompt
-    base_sql = generate_sql_from_prompt(prophet_prompt, schema, db_type)
+    base_sql = await generate_sql_from_prompt(prophet_prompt, schema, db_type, question=prompt)
     
     # Additional processing to ensure Prophet compatibility
     if "ds" not in base_sql.lower() or "y" not in base_sql.lower():
@@ -317,11 +319,94 @@ def generate_sql_from_prompt_for_prophet(prompt, schema, db_type):
     
     return base_sql
 
-def askai(user_message: str) -> str:
+async def generate_sql_from_prompt_for_anomalies(prompt, schema, db_type):
+    """
+    Generates SQL for anomaly detection: a label column (the date/time when the
+    question is about time) followed by the numeric metric to check.
+
+    Args:
+        prompt (str): User's anomaly question in plain English
+        schema (str): Database table/column schema
+        db_type (str): Type of database (e.g., 'postgresql', 'mysql')
+
+    Returns:
+        str: SQL query returning (label, metric) rows
+    """
+    anomaly_prompt = f"""
+    The following is a request to find anomalies or outliers in the data:
+    {prompt}
+
+    Generate a SQL query that:
+    1. Returns exactly two columns: first the label (a date/time aggregated to an appropriate
+       granularity when the question is about time, otherwise the entity being compared),
+       then the numeric metric to check for anomalies
+    2. Sorts time series chronologically by the label
+    3. Does not filter out unusual values - every point is needed to judge what is normal
+    """
+
+    return await generate_sql_from_prompt(anomaly_prompt, schema, db_type, question=prompt)
+
+
+async def generate_sql_from_prompt_for_clustering(prompt, schema, db_type):
+    """
+    Generates SQL for clustering: one row per entity to group, with the numeric
+    features to group by.
+
+    Args:
+        prompt (str): User's clustering question in plain English
+        schema (str): Database table/column schema
+        db_type (str): Type of database (e.g., 'postgresql', 'mysql')
+
+    Returns:
+        str: SQL query returning (label, feature, feature, ...) rows
+    """
+    clustering_prompt = f"""
+    The following is a request to group similar records into clusters:
+    {prompt}
+
+    Generate a SQL query that:
+    1. Returns one row per entity to group (e.g. per customer or per product), aggregating
+       if the entities span several rows
+    2. Returns a label column for the entity first, then the numeric features that
+       describe it (at least one, ideally two to six)
+    3. Does not include identifier columns as features and does not LIMIT the rows
+    """
+
+    return await generate_sql_from_prompt(clustering_prompt, schema, db_type, question=prompt)
+
+
+async def generate_sql_from_prompt_for_prediction(prompt, schema, db_type):
+    """
+    Generates SQL for prediction: a label column, the numeric features and the
+    value to predict as a column named 'target'.
+
+    Args:
+        prompt (str): User's prediction question in plain English
+        schema (str): Database table/column schema
+        db_type (str): Type of database (e.g., 'postgresql', 'mysql')
+
+    Returns:
+        str: SQL query returning (label, feature, ..., target) rows
+    """
+    prediction_prompt = f"""
+    The following is a request to predict a numeric value from other values:
+    {prompt}
+
+    Generate a SQL query that:
+    1. Returns a label column first (a date or the entity the row describes)
+    2. Then the numeric columns the value can be predicted from (no identifier columns)
+    3. Then the value to predict, aliased as target
+    4. Includes the rows whose target is unknown (NULL) when the user wants those predicted
+    5. Does not LIMIT the rows and sorts chronologically when the label is a date
+    """
+
+    return await generate_sql_from_prompt(prediction_prompt, schema, db_type, question=prompt)
+
+
+async def askai(user_message: str) -> str:
     try:
-        response = client.chat.completions.create(
-            model="gpt-4.1",  # or "gpt-3.5-turbo" if needed
-            messages=[
+        return await llm_gateway.chat(
+            [
                 {
                     "role": "system",
                     "content": "You are an AI assistant for data dashboard users. Answer queries clearly and helpfully."
@@ -334,14 +419,12 @@ def askai(user_message: str) -> str:
             temperature=0.7
         )
 
-        return response.choices[0].message.content.strip()
-
     except Exception as e:
         
         return "Sorry, I'm currently unable to respond."
     
 
-def get_period(user_prompt):
+async def get_period(user_prompt):
     """
     Determines the forecast period in days using LLM.
 
@@ -360,15 +443,122 @@ User's Request: {user_prompt}
 Respond with ONLY the period in days, no explanations and only number.
 """
 
-    response = client.chat.completions.create(
-        model="gpt-4.1",
-        messages=[{"role": "user", "content": prompt}]
-    )
-
-    period_str = response.choices[0].message.content.strip()
+    period_str = await llm_gateway.complete(prompt)
     
     try:
         period = int(period_str)
         return period
     except ValueError:
         raise ValueError(f"Invalid period received from LLM: '{period_str}'")
+
+
+PLANNER_ENABLED = os.getenv("LLM_PLANNER_ENABLED", "true").lower() == "true"
+
+ALLOWED_INTENTS = ["visualization", "anomaly_detection", "prediction", "forecasting", "clustering"]
+ALLOWED_CHART_TYPES = ["bar", "line", "pie"]
+ALLOWED_OUTPUT_FORMATS = ["visual", "text", "both"]
+
+ANALYSIS_PLAN_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": ALLOWED_INTENTS},
+        "sql": {"type": "string"},
+        "chart_type": {"type": "string", "enum": ALLOWED_CHART_TYPES},
+        "forecast_period": {"type": ["integer", "null"]},
+        "output_format": {"type": "string", "enum": ALLOWED_OUTPUT_FORMATS},
+    },
+    "required": ["intent", "sql", "chart_type", "forecast_period", "output_format"],
+    "additionalProperties": False,
+}
+
+
+async def plan_analysis(user_prompt, schema_description, database_type):
+    """
+    Builds the whole analysis plan with a single JSON-schema-constrained LLM call,
+    replacing the serial classify_intent_with_llm -> generate_sql_from_prompt(_for_prophet)
+    -> get_period round trips.
+
+    Args:
+        user_prompt (str): User's question in plain English.
+        schema_description (str): Database table/column schema.
+        database_type (str): Type of database (e.g., 'postgresql', 'mysql')
+
+    Returns:
+        dict or None: {'intent', 'sql', 'chart_type', 'forecast_period', 'output_format'},
+        or None when the plan is missing or incomplete so callers fall back to the
+        per-step functions.
+    """
+    cached_plan = await prompt_sql_cache.get("plan", user_prompt, database_type, schema_description)
+    if cached_plan:
+        plan = json.loads(cached_plan)
+        prompt_sql_cache.hold("plan", user_prompt, database_type, schema_description, cached_plan, plan["sql"], stored=True)
+        return plan
+
+    relevant_schema = prune_schema(schema_description, user_prompt)
+
+    prompt = f"""
+You are a professional AI SQL assistant for a no-code data analysis platform.
+
+Plan the analysis for the user's request against a {database_type} database and
+return it as JSON matching the provided schema.
+
+### SCHEMA ###
+{relevant_schema}
+
+### FIELDS ###
+- intent: one of visualization, anomaly_detection, prediction, forecasting, clustering.
+- sql: a syntactically correct {database_type} query answering the request.
+  - For **PostgreSQL**, always wrap table names and column names with double quotes (e.g., "ProductName").
+  - Respect case-sensitivity exactly as shown in the schema.
+  - Do not make up columns or tables not present in the schema.
+  - If intent is forecasting, return exactly two columns: 'ds' (date, aggregated to an appropriate
+    granularity, sorted chronologically, no NULLs) and 'y' (numeric value).
+  - If intent is anomaly_detection, return a label column (the date/time, sorted chronologically,
+    when the question is about time) followed by the numeric metric to check, without filtering
+    out unusual values.
+  - If intent is clustering, return one row per entity to group: a label column followed by
+    the numeric features to group by (no identifier columns, no LIMIT).
+  - If intent is prediction, return a label column, the numeric columns to predict from and the
+    value to predict aliased as target (NULL for rows to predict; no identifier columns, no LIMIT).
+- chart_type: bar, line or pie - whichever best fits the request.
+- forecast_period: for forecasting, the number of days to forecast; otherwise null.
+- output_format: visual, text or both.
+
+### QUESTION ###
+{user_prompt}
+"""
+
+    try:
+        content = await llm_gateway.complete(
+            prompt,
+            response_format={
+                "type": "json_schema",
+                "json_schema": {"name": "analysis_plan", "strict": True, "schema": ANALYSIS_PLAN_SCHEMA},
+            },
+        )
+        plan = json.loads(re.sub(r"^```json\s*|\s*```$", "", content, flags=re.IGNORECASE))
+    except Exception as e:
+        print(f"[WARN] Analysis plan failed, falling back to per-step calls: {e}")
+        return None
+
+    if not isinstance(plan, dict) or plan.get("intent") not in ALLOWED_INTENTS:
+        return None
+
+    plan["sql"] = clean_sql(plan.get("sql") or "")
+    if not plan["sql"]:
+        return None
+
+    if plan["intent"] == "forecasting":
+        if "ds" not in plan["sql"].lower() or "y" not in plan["sql"].lower():
+            return None
+        if not isinstance(plan.get("forecast_period"), int) or plan["forecast_period"] <= 0:
+            plan["forecast_period"] = None
+
+    if plan.get("chart_type") not in ALLOWED_CHART_TYPES:
+        plan["chart_type"] = None
+    if plan.get("output_format") not in ALLOWED_OUTPUT_FORMATS:
+        plan["output_format"] = None
+
+    # Cached once the pipeline has run its SQL (prompt_sql_cache.commit)
+    prompt_sql_cache.hold("plan", user_prompt, database_type, schema_description, json.dumps(plan), plan["sql"], stored=False)
+    return plan
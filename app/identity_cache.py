@@ -0,0 +1,70 @@
+import os
+import threading
+from typing import Dict, NamedTuple, Optional
+
+from app.session_manager import SESSION_CACHE_TTL_SECONDS
+from app.ttl_cache import TTLCache
+
+# How long a worker serves a user's profile without re-reading it. Settings updates
+# and logouts clear it at once in the worker that handles them; other workers
+# catch up within this window, as they do for sessions
+IDENTITY_CACHE_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", str(SESSION_CACHE_TTL_SECONDS)))
+IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", "4096"))
+
+
+class UserIdentity(NamedTuple):
+    """Read-only copy of the User columns routes use, safe to share between requests."""
+    id: int
+    username: str
+    email: str
+    first_name: str
+    last_name: str
+
+    @classmethod
+    def from_user(cls, user) -> "UserIdentity":
+        return cls(user.id, user.username, user.email, user.first_name, user.last_name)
+
+
+class IdentityCache:
+    """In-process LRU of session id -> UserIdentity with a TTL."""
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._cache = TTLCache(max_entries, ttl_seconds)
+        # Structure: { session_id: identity }
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, session_id: str) -> Optional[UserIdentity]:
+        identity = self._cache.get(session_id)
+        with self.lock:
+            self._stats["hits" if identity is not None else "misses"] += 1
+        return identity
+
+    def set(self, session_id: str, identity: UserIdentity):
+        if self.ttl_seconds <= 0:
+            return
+        self._cache.set(session_id, identity)
+
+    def invalidate_session(self, session_id: str):
+        self._cache.pop(session_id)
+
+    def invalidate_user(self, user_id: int):
+        """Drops every session's copy of the user, e.g. after their profile changed."""
+        self._cache.pop_where(lambda _, identity: identity.id == user_id)
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self._stats)
+        stats["entries"] = len(self._cache)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# Singleton instance
+identity_cache = IdentityCache(
+    ttl_seconds=IDENTITY_CACHE_TTL_SECONDS,
+    max_entries=IDENTITY_CACHE_MAX_ENTRIES,
+)
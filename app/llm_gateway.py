@@ -0,0 +1,122 @@
+import asyncio
+import os
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+load_dotenv()  # Load from .env
+
+LLM_API_KEY = os.getenv("DEEPSEEK_API_KEY")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-4.1")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+
+class LLMTimeoutError(Exception):
+    """Raised when an LLM call does not finish within its timeout."""
+
+
+class LLMGateway:
+    """
+    Async entry point for every LLM call made by the app.
+
+    All calls share one AsyncOpenAI client (and therefore one pooled
+    httpx.AsyncClient), are capped by a semaphore so a burst of generate
+    requests cannot open unbounded upstream connections, and are wrapped
+    in a per-call timeout so a stuck completion never holds a slot forever.
+    The client's retries share that budget: each attempt gets
+    timeout / (max_retries + 1), so a slow first attempt is retried instead
+    of using up the whole call.
+    """
+
+    def __init__(self, api_key: Optional[str], model: str, max_concurrency: int, timeout: float, max_retries: int):
+        self.api_key = api_key
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._client: Optional["AsyncOpenAI"] = None
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _get_client(self) -> "AsyncOpenAI":
+        if self._client is None:
+            # The openai package is slow to import; load it on the first call instead of at startup
+            from openai import AsyncOpenAI
+
+            http_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                timeout=httpx.Timeout(self.timeout),
+            )
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                http_client=http_client,
+                max_retries=self.max_retries,
+            )
+        return self._client
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        timeout: Optional[float] = None,
+        model: Optional[str] = None,
+        **kwargs: Any,
+    ) -> str:
+        """
+        Runs one chat completion and returns the stripped message content.
+
+        Args:
+            messages (list): Chat messages in OpenAI format.
+            timeout (float): Per-call timeout in seconds (all attempts together), defaults to LLM_TIMEOUT_SECONDS.
+            model (str): Model override, defaults to LLM_MODEL.
+            **kwargs: Extra arguments passed to chat.completions.create.
+
+        Returns:
+            str: The model's reply.
+        """
+        timeout = timeout or self.timeout
+        attempt_timeout = timeout / (self.max_retries + 1)
+        client = self._get_client()
+
+        async with self._semaphore:
+            try:
+                response = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        model=model or self.model,
+                        messages=messages,
+                        timeout=attempt_timeout,
+                        **kwargs
+                    ),
+                    # Hard cap on the whole call, retry backoff included
+                    timeout=timeout,
+                )
+            except asyncio.TimeoutError:
+                raise LLMTimeoutError(f"LLM call timed out after {timeout}s")
+
+        return response.choices[0].message.content.strip()
+
+    async def complete(self, prompt: str, timeout: Optional[float] = None, **kwargs: Any) -> str:
+        """Shortcut for a single user-message completion."""
+        return await self.chat([{"role": "user", "content": prompt}], timeout=timeout, **kwargs)
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.close()
+            self._client = None
+
+
+# Singleton instance
+llm_gateway = LLMGateway(
+    api_key=LLM_API_KEY,
+    model=LLM_MODEL,
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    timeout=LLM_TIMEOUT_SECONDS,
+    max_retries=LLM_MAX_RETRIES,
+)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP, UniqueConstraint
+from app.database import Base
+
+class SchemaCatalogTable(Base):
+    __tablename__ = "schema_catalog"
+    __table_args__ = (UniqueConstraint("identity", "table_name", name="uq_schema_catalog_identity_table"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    identity = Column(String, index=True, nullable=False)    # e.g., "postgresql://user@host:5432/db"
+    table_name = Column(String, nullable=False)
+    columns_hash = Column(String(64), nullable=False)        # sha256 of column names + types
+    description = Column(Text, nullable=False)               # rendered block for the LLM prompt
+    updated_at = Column(TIMESTAMP, default=datetime.utcnow)
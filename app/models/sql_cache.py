@@ -0,0 +1,16 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, Text, TIMESTAMP
+from app.database import Base
+
+class SqlCacheEntry(Base):
+    __tablename__ = "sql_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cache_key = Column(String(64), unique=True, index=True, nullable=False)  # sha256 of (kind, prompt, db_type, schema_hash)
+    kind = Column(String(20), nullable=False)         # e.g., "sql", "plan"
+    db_type = Column(String(50), nullable=False)
+    schema_hash = Column(String(64), index=True, nullable=False)
+    prompt = Column(Text, nullable=False)             # normalized prompt
+    value = Column(Text, nullable=False)
+    hits = Column(Integer, default=0)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
@@ -0,0 +1,12 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, TIMESTAMP
+from app.database import Base
+
+class UserSession(Base):
+    __tablename__ = "user_sessions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    session_id = Column(String(64), unique=True, index=True, nullable=False)  # cookie value
+    user_id = Column(Integer, index=True, nullable=False)
+    created_at = Column(TIMESTAMP, default=datetime.utcnow)
+    expires_at = Column(TIMESTAMP, index=True, nullable=False)
@@ -0,0 +1,244 @@
+import os
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.chart_builder import _label, _to_float_array, _to_json_numbers
+from app.clustering import feature_columns
+from app.result_fetch import RESULT_FETCH_BATCH, iter_batches
+
+PREDICTION_RIDGE_ALPHA = float(os.getenv("PREDICTION_RIDGE_ALPHA", "1.0"))
+# Rows streamed from the cursor at most; the rest of the result is ignored
+PREDICTION_MAX_ROWS = int(os.getenv("PREDICTION_MAX_ROWS", "5000000"))
+PREDICTION_FETCH_BATCH = int(os.getenv("PREDICTION_FETCH_BATCH", str(max(RESULT_FETCH_BATCH, 10000))))
+# Every Nth row with a known target is held out to score the fit
+PREDICTION_HOLDOUT_EVERY = int(os.getenv("PREDICTION_HOLDOUT_EVERY", "5"))
+# Last rows with a known target drawn in the chart, followed by up to as many rows to predict
+PREDICTION_CHART_POINTS = int(os.getenv("PREDICTION_CHART_POINTS", "500"))
+# Column holding the value to predict; otherwise the last numeric column is used
+TARGET_COLUMN = "target"
+# First rows kept for the pipeline's rows event
+PREVIEW_ROWS = 10
+# Below this many known rows nothing is held out
+MIN_HOLDOUT_ROWS = 20
+
+
+class CoMoments:
+    """
+    Count, means and centered cross-product matrix of [features..., target],
+    merged batch by batch (Chan et al.'s parallel update) - the normal
+    equations, kept centered so large means don't cost precision.
+    """
+
+    def __init__(self, dims: int):
+        self.count = 0
+        self.mean = np.zeros(dims)
+        self.comoment = np.zeros((dims, dims))
+
+    def add(self, batch: np.ndarray):
+        if not len(batch):
+            return
+        moments = CoMoments(batch.shape[1])
+        moments.count = len(batch)
+        moments.mean = batch.mean(axis=0)
+        centered = batch - moments.mean
+        moments.comoment = centered.T @ centered
+        self.merge(moments)
+
+    def merge(self, other: "CoMoments"):
+        if not other.count:
+            return
+        total = self.count + other.count
+        delta = other.mean - self.mean
+        self.comoment = self.comoment + other.comoment + np.outer(delta, delta) * self.count * other.count / total
+        self.mean = self.mean + delta * other.count / total
+        self.count = total
+
+
+def solve_ridge(moments: CoMoments, alpha: float = PREDICTION_RIDGE_ALPHA) -> Tuple[np.ndarray, float]:
+    """
+    Ridge regression of the last column on the others from their co-moments.
+    Features are standardized before the penalty so it treats them alike; as
+    in scikit-learn, `alpha` is weighed against sums over rows, so its effect
+    fades as rows are added.
+
+    Returns:
+        tuple: (coefficients in original units, intercept)
+    """
+    sxx, sxy = moments.comoment[:-1, :-1], moments.comoment[:-1, -1]
+    # Per-row std of every feature
+    scale = np.sqrt(np.diag(sxx) / max(moments.count, 1))
+    scale = np.where(scale > 0, scale, 1.0)
+    standardized = sxx / np.outer(scale, scale)
+    try:
+        coefficients = np.linalg.solve(standardized + alpha * np.eye(len(scale)), sxy / scale)
+    except np.linalg.LinAlgError:
+        coefficients = np.linalg.lstsq(standardized, sxy / scale, rcond=None)[0]
+    coefficients = coefficients / scale
+    intercept = moments.mean[-1] - moments.mean[:-1] @ coefficients
+    return coefficients, float(intercept)
+
+
+def holdout_scores(moments: CoMoments, coefficients: np.ndarray, intercept: float) -> Dict[str, Optional[float]]:
+    """
+    R^2 and RMSE of the fit on the held-out rows, from their co-moments alone:
+    sum((y - a - x.b)^2) = n * mean_residual^2 + Syy - 2 b.Sxy + b.Sxx.b
+    """
+    if moments.count < 2:
+        return {"r2": None, "rmse": None}
+    sxx, sxy, syy = moments.comoment[:-1, :-1], moments.comoment[:-1, -1], moments.comoment[-1, -1]
+    mean_residual = moments.mean[-1] - intercept - moments.mean[:-1] @ coefficients
+    sse = moments.count * mean_residual ** 2 + syy - 2 * coefficients @ sxy + coefficients @ sxx @ coefficients
+    sse = max(float(sse), 0.0)
+    return {
+        "r2": float(1 - sse / syy) if syy > 0 else None,
+        "rmse": float(np.sqrt(sse / moments.count)),
+    }
+
+
+def _target_index(columns: List[str], numeric: List[int]) -> int:
+    by_name = [i for i in numeric if columns[i].lower() == TARGET_COLUMN]
+    return by_name[0] if by_name else numeric[-1]
+
+
+def fit_regression_batches(batches, alpha: float = PREDICTION_RIDGE_ALPHA, chart_points: int = PREDICTION_CHART_POINTS) -> Optional[Dict[str, Any]]:
+    """
+    Fits ridge regression over a stream of result batches in one pass and
+    bounded memory: only the co-moment matrices of the training and held-out
+    rows, the last `chart_points` known rows and the first `chart_points` rows
+    without a target are kept.
+
+    Args:
+        batches: Iterable of (columns, rows), e.g. iter_batches.
+
+    Returns:
+        dict or None: { "columns", "target", "features", "coefficients", "intercept", "r2", "rmse",
+        "train_rows", "holdout_rows", "skipped_rows", "row_count", "known" / "unknown" (chart rows
+        as (label, features, target)), "preview" }, or None without a target and a feature column.
+    """
+    columns = features = target = label_index = None
+    train = holdout = None
+    known: deque = deque(maxlen=chart_points)
+    unknown: List[Tuple[Any, np.ndarray, None]] = []
+    row_count = skipped = 0
+    preview: List[tuple] = []
+
+    for batch_columns, rows in batches:
+        if columns is None:
+            columns = batch_columns
+            numeric = feature_columns(columns, rows)
+            if len(numeric) < 2:
+                return None
+            target = _target_index(columns, numeric)
+            features = [i for i in numeric if i != target]
+            label_index = next((i for i in range(len(columns)) if i not in numeric), None)
+            train, holdout = CoMoments(len(features) + 1), CoMoments(len(features) + 1)
+            preview = rows[:PREVIEW_ROWS]
+
+        values_by_column = list(zip(*rows))
+        # Unreadable values ('n/a') come back as NaN, like missing ones
+        matrix = np.column_stack([_to_float_array(values_by_column[i]) for i in features + [target]])
+        labels = values_by_column[label_index] if label_index is not None else range(row_count, row_count + len(rows))
+        usable = ~np.isnan(matrix[:, :-1]).any(axis=1)
+        # A missing target is predicted; one that is there but unreadable is skipped
+        for i in np.flatnonzero(usable & np.isnan(matrix[:, -1])).tolist():
+            usable[i] = values_by_column[target][i] is None
+        has_target = usable & ~np.isnan(matrix[:, -1])
+
+        # Held-out rows are picked by position in the whole stream, not per batch
+        positions = row_count + np.arange(len(rows))
+        held_out = has_target & (positions % PREDICTION_HOLDOUT_EVERY == 0)
+        train.add(matrix[has_target & ~held_out])
+        holdout.add(matrix[held_out])
+
+        for i in np.flatnonzero(has_target)[-chart_points:].tolist():
+            known.append((labels[i], matrix[i, :-1], matrix[i, -1]))
+        room = chart_points - len(unknown)
+        if room > 0:
+            for i in np.flatnonzero(usable & ~has_target)[:room].tolist():
+                unknown.append((labels[i], matrix[i, :-1], None))
+
+        skipped += int((~usable).sum())
+        row_count += len(rows)
+
+    if columns is None or train.count + holdout.count < 2:
+        return None
+
+    if train.count + holdout.count < MIN_HOLDOUT_ROWS:
+        # Too few rows to spare any; train on all of them and report no score
+        train.merge(holdout)
+        holdout = CoMoments(len(features) + 1)
+
+    coefficients, intercept = solve_ridge(train, alpha)
+    return {
+        "columns": columns,
+        "target": columns[target],
+        "features": [columns[i] for i in features],
+        "coefficients": coefficients,
+        "intercept": intercept,
+        **holdout_scores(holdout, coefficients, intercept),
+        "train_rows": train.count,
+        "holdout_rows": holdout.count,
+        "skipped_rows": skipped,
+        "row_count": row_count,
+        "known": list(known),
+        "unknown": unknown,
+        "preview": preview,
+    }
+
+
+def build_prediction_chart_config(fit: Dict[str, Any], title: Optional[str] = None, chart_type: str = "line") -> Dict[str, Any]:
+    """
+    Predicted vs. actual values in generate_forecast_config's format: the last
+    known rows (actual and predicted) followed by the rows without a target
+    (predicted only), plus the fitted coefficients and holdout scores.
+    """
+    rows = fit["known"] + fit["unknown"]
+    if rows:
+        predicted = np.array([row[1] for row in rows]) @ fit["coefficients"] + fit["intercept"]
+        actual = np.array([np.nan if row[2] is None else row[2] for row in rows], dtype=float)
+    else:
+        predicted = actual = np.array([])
+
+    return {
+        "title": title or f"Predicted {fit['target']}",
+        "xAxisData": [_label(row[0]) for row in rows],
+        "seriesData": [
+            {"name": f"Predicted {fit['target']}", "type": chart_type, "data": _to_json_numbers(predicted)},
+            {"name": f"Actual {fit['target']}", "type": chart_type, "data": _to_json_numbers(actual)},
+        ],
+        "target": fit["target"],
+        "features": fit["features"],
+        "coefficients": {name: round(float(value), 6) for name, value in zip(fit["features"], fit["coefficients"])},
+        "intercept": round(fit["intercept"], 6),
+        "r2": None if fit["r2"] is None else round(fit["r2"], 4),
+        "rmse": None if fit["rmse"] is None else round(fit["rmse"], 4),
+        "trainRows": fit["train_rows"],
+        "holdoutRows": fit["holdout_rows"],
+        "predictedRows": len(fit["unknown"]),
+        "skippedRows": fit["skipped_rows"],
+    }
+
+
+def predict_query(pool, sql: str, title: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    Fits the regression for `sql` on one pooled connection, streaming the result
+    in PREDICTION_FETCH_BATCH-row batches.
+
+    Returns:
+        tuple: (chart config or None without a target and a feature column, {"columns", "row_count", "truncated", "preview"})
+    """
+    with pool.connection() as connection:
+        fit = fit_regression_batches(iter_batches(connection, sql, PREDICTION_FETCH_BATCH, PREDICTION_MAX_ROWS))
+    if fit is None:
+        return None, {"columns": [], "row_count": 0, "truncated": False, "preview": []}
+
+    info = {
+        "columns": fit["columns"],
+        "row_count": fit["row_count"],
+        # Stopped at the cap; the query may have had more rows
+        "truncated": fit["row_count"] >= PREDICTION_MAX_ROWS,
+        "preview": [dict(zip(fit["columns"], row)) for row in fit["preview"]],
+    }
+    return build_prediction_chart_config(fit, title), info
@@ -0,0 +1,175 @@
+import math
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from decimal import Decimal
+from html import escape
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from app.dependencies import establish_connection
+from app.models.user_connection import UserConnection
+from app.schema_sampling import quote_identifier
+
+PREVIEW_ROWS = int(os.getenv("PREVIEW_ROWS", "5"))
+PREVIEW_PAGE_SIZE = int(os.getenv("PREVIEW_PAGE_SIZE", "24"))
+# Rows read per fetchmany round trip; each batch is streamed to the client as it arrives
+PREVIEW_FETCH_BATCH = int(os.getenv("PREVIEW_FETCH_BATCH", "50"))
+PREVIEW_MAX_WORKERS = int(os.getenv("PREVIEW_MAX_WORKERS", "8"))
+# Most previews one request may ask for, so a client can't queue up a whole database
+PREVIEW_MAX_TABLES_PER_REQUEST = int(os.getenv("PREVIEW_MAX_TABLES_PER_REQUEST", "24"))
+
+# Shared by every request; each database is further bounded by its ConnectionPool size
+preview_executor = ThreadPoolExecutor(max_workers=PREVIEW_MAX_WORKERS, thread_name_prefix="preview")
+
+
+def list_tables(conn: UserConnection) -> List[str]:
+    """Table names of a saved connection, sorted, read through its shared pool."""
+    pool = establish_connection(conn)
+    with pool.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            if conn.db_type.lower() == "mysql":
+                cursor.execute(
+                    "SELECT table_name FROM information_schema.tables "
+                    "WHERE table_schema = %s AND table_type = 'BASE TABLE' ORDER BY table_name",
+                    (conn.database,)
+                )
+            else:
+                cursor.execute(
+                    "SELECT table_name FROM information_schema.tables "
+                    "WHERE table_schema = 'public' AND table_type = 'BASE TABLE' ORDER BY table_name"
+                )
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+def paginate(tables: List[str], page: int, page_size: int = PREVIEW_PAGE_SIZE) -> Dict:
+    """
+    Returns:
+        dict: { "tables": [...], "page": int, "next_page": int | None, "total": int }
+    """
+    page = max(page, 1)
+    start = (page - 1) * page_size
+    return {
+        "tables": tables[start:start + page_size],
+        "page": page,
+        "next_page": page + 1 if start + page_size < len(tables) else None,
+        "total": len(tables),
+    }
+
+
+def iter_preview(pool, db_type: str, table: str) -> Iterator[Dict]:
+    """
+    First PREVIEW_ROWS rows of one table, read PREVIEW_FETCH_BATCH at a time and
+    yielded batch by batch, so no preview is ever held in memory whole.
+
+    Yields:
+        dict: { "columns": [...] }, then { "rows": [tuple, ...] } per batch, then
+        { "done": True } - or { "error": str } as the last chunk on failure.
+    """
+    try:
+        with pool.connection() as connection:
+            cursor = connection.cursor()
+            try:
+                cursor.execute(f"SELECT * FROM {quote_identifier(db_type.lower(), table)} LIMIT {PREVIEW_ROWS}")
+                yield {"columns": [desc[0] for desc in cursor.description]}
+                while True:
+                    rows = cursor.fetchmany(PREVIEW_FETCH_BATCH)
+                    if not rows:
+                        break
+                    yield {"rows": rows}
+            finally:
+                cursor.close()
+    except Exception as e:
+        yield {"error": str(e)}
+        return
+    yield {"done": True}
+
+
+def _stream_preview(chunks: queue.Queue, pool, db_type: str, table: str):
+    # Runs on a preview worker; None tells iter_previews this table is finished
+    try:
+        for chunk in iter_preview(pool, db_type, table):
+            chunks.put((table, chunk))
+    finally:
+        chunks.put((table, None))
+
+
+def iter_previews(conn: UserConnection, tables: List[str]) -> Iterator[Tuple[str, Dict]]:
+    """
+    Previews of several tables of one connection, read concurrently on the
+    shared preview executor. Chunks of different tables interleave in the
+    order they are fetched.
+
+    Yields:
+        tuple: (table, iter_preview chunk)
+    """
+    pool = establish_connection(conn)
+    tables = tables[:PREVIEW_MAX_TABLES_PER_REQUEST]
+    chunks: queue.Queue = queue.Queue()
+    for table in tables:
+        preview_executor.submit(_stream_preview, chunks, pool, conn.db_type, table)
+
+    remaining = len(tables)
+    while remaining:
+        table, chunk = chunks.get()
+        if chunk is None:
+            remaining -= 1
+        else:
+            yield table, chunk
+
+
+def _html_head(columns: List[str]) -> str:
+    header = "".join(f"<th>{escape(str(column))}</th>" for column in columns)
+    return f'<table class="table table-sm table-bordered">\n<thead><tr>{header}</tr></thead>\n<tbody>\n'
+
+
+def _html_row(row) -> str:
+    return "<tr>" + "".join(f"<td>{escape(str(value))}</td>" for value in row) + "</tr>\n"
+
+
+HTML_TAIL = "</tbody>\n</table>"
+
+
+def iter_preview_html(columns: List[str], rows: Iterable) -> Iterator[str]:
+    """
+    Writes a preview table as escaped HTML chunks, one per row, straight from
+    DB-API rows (a cursor works too) - no DataFrame in between.
+    """
+    yield _html_head(columns)
+    for row in rows:
+        yield _html_row(row)
+    yield HTML_TAIL
+
+
+def render_preview_html(chunk: Dict, table: str) -> str:
+    """HTML of one iter_preview chunk; a table's chunks concatenate to its preview table."""
+    if "error" in chunk:
+        return f"<p>Error previewing table {escape(table)}: {escape(chunk['error'])}</p>"
+    if "columns" in chunk:
+        return _html_head(chunk["columns"])
+    if "rows" in chunk:
+        return "".join(_html_row(row) for row in chunk["rows"])
+    return HTML_TAIL
+
+
+def _json_value(value: Any):
+    if isinstance(value, (float, Decimal)) and not math.isfinite(value):
+        # NaN / Infinity aren't valid JSON
+        return str(value)
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+def preview_to_json(preview: Dict) -> Dict:
+    """A preview (or iter_preview chunk) with its rows as JSON-safe lists; other keys pass through."""
+    if "rows" not in preview:
+        return dict(preview)
+    return {**preview, "rows": [[_json_value(value) for value in row] for row in preview["rows"]]}
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import threading
+from typing import Dict, Optional
+
+from app.result_fetch import ColumnarResult, fetch_bounded
+from app.ttl_cache import TTLCache
+
+RESULT_CACHE_ENABLED = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+# Results are served as they were when first fetched, so this is how stale a chart
+# may be: rows written to the customer's database since then don't show until the
+# entry expires (or the request passes use_cache=false). Keep it short
+RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "60"))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", "256"))
+RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def sql_hash(sql: str) -> str:
+    return hashlib.sha256(" ".join(sql.split()).encode("utf-8")).hexdigest()
+
+
+class QueryResultCache:
+    """
+    Size-bounded LRU of ColumnarResults keyed by (connection identity, SQL hash).
+
+    Entries expire after `ttl_seconds`; the least recently used ones are evicted
+    once either `max_entries` or the `max_bytes` memory budget is exceeded.
+    Cached results are shared between requests and must not be mutated.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, max_bytes: int, enabled: bool = True):
+        self.lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._cache = TTLCache(max_entries, ttl_seconds, max_size=max_bytes)
+        # Structure: { (identity, sql_hash): result }, sized by result.approx_bytes
+        self._stats = {"hits": 0, "misses": 0}
+
+    def get(self, identity: str, sql: str) -> Optional[ColumnarResult]:
+        result = self._cache.get((identity, sql_hash(sql)))
+        with self.lock:
+            self._stats["hits" if result is not None else "misses"] += 1
+        return result
+
+    def set(self, identity: str, sql: str, result: ColumnarResult):
+        size = result.approx_bytes
+        if size > self.max_bytes:
+            return
+
+        self._cache.set((identity, sql_hash(sql)), result, size=size)
+
+    def invalidate(self, identity: Optional[str] = None):
+        """Drops every entry for `identity`, or everything when no identity is given."""
+        self._cache.pop_where(lambda key, _: identity is None or key[0] == identity)
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self._stats)
+        cache = self._cache.stats()
+        stats.update(entries=cache["entries"], bytes=cache["size"], evictions=cache["evictions"])
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+
+# Singleton instance
+query_result_cache = QueryResultCache(
+    ttl_seconds=RESULT_CACHE_TTL_SECONDS,
+    max_entries=RESULT_CACHE_MAX_ENTRIES,
+    max_bytes=RESULT_CACHE_MAX_BYTES,
+    enabled=RESULT_CACHE_ENABLED,
+)
+
+
+def fetch_cached(pool, identity: str, sql: str, use_cache: bool = True) -> ColumnarResult:
+    """
+    fetch_bounded with the per-connection result cache in front. A connection is
+    only checked out of `pool` on a miss; use_cache=False skips the lookup but
+    still refreshes the cached entry.
+
+    A hit can be up to RESULT_CACHE_TTL_SECONDS old: nothing tells the cache that
+    the customer's data changed; only a schema change seen at connection bootstrap clears it.
+    """
+    if query_result_cache.enabled and identity and use_cache:
+        cached = query_result_cache.get(identity, sql)
+        if cached is not None:
+            return cached
+
+    with pool.connection() as connection:
+        result = fetch_bounded(connection, sql)
+
+    if query_result_cache.enabled and identity:
+        query_result_cache.set(identity, sql, result)
+    return result
@@ -0,0 +1,184 @@
+import os
+import sys
+import uuid
+from typing import Any, Dict, List, Optional
+
+import psycopg2
+import psycopg2.extensions
+import pymysql
+import pymysql.cursors
+
+RESULT_MAX_ROWS = int(os.getenv("RESULT_MAX_ROWS", "100000"))
+RESULT_MAX_BYTES = int(os.getenv("RESULT_MAX_BYTES", str(64 * 1024 * 1024)))
+RESULT_FETCH_BATCH = int(os.getenv("RESULT_FETCH_BATCH", "5000"))
+
+# Rows sampled per batch to estimate its in-memory size
+SIZE_SAMPLE_ROWS = 50
+
+
+class ColumnarResult:
+    """
+    SQL result kept as one list per column.
+
+    `truncated` is set (with `truncated_reason` 'max_rows' or 'max_bytes') when
+    the fetch stopped at a cap instead of exhausting the cursor.
+    """
+
+    def __init__(self, columns: List[str]):
+        self.columns = columns
+        self.values: List[List[Any]] = [[] for _ in columns]
+        self.row_count = 0
+        self.approx_bytes = 0
+        self.truncated = False
+        self.truncated_reason: Optional[str] = None
+
+    def column(self, name: str) -> List[Any]:
+        return self.values[self.columns.index(name)]
+
+    def rows(self, limit: Optional[int] = None) -> List[tuple]:
+        values = self.values if limit is None else [col[:limit] for col in self.values]
+        return list(zip(*values))
+
+    def records(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        return [dict(zip(self.columns, row)) for row in self.rows(limit)]
+
+    def to_llm_json(self, limit: Optional[int] = None) -> Dict[str, Any]:
+        """Same shape as transform_sql_result_to_llm_json."""
+        return {"columns": self.columns, "rows": self.records(limit)}
+
+    def _append(self, batch):
+        for column_values, new_values in zip(self.values, zip(*batch)):
+            column_values.extend(new_values)
+        self.row_count += len(batch)
+
+
+def _estimate_batch_bytes(batch) -> int:
+    sample = batch[:SIZE_SAMPLE_ROWS]
+    sample_bytes = sum(sys.getsizeof(value) for row in sample for value in row)
+    return sample_bytes * len(batch) // max(len(sample), 1)
+
+
+def _open_cursor(connection, sql: str):
+    """
+    Server-side cursors so rows stay on the database until fetched: a named
+    cursor on psycopg2 (only valid for SELECT/WITH) and SSCursor on pymysql.
+    """
+    is_select = sql.lstrip().upper().startswith(("SELECT", "WITH"))
+
+    if isinstance(connection, psycopg2.extensions.connection) and is_select:
+        cursor = connection.cursor(name=f"dashboard_fetch_{uuid.uuid4().hex}")
+        cursor.itersize = RESULT_FETCH_BATCH
+        return cursor
+    if isinstance(connection, pymysql.connections.Connection):
+        return connection.cursor(pymysql.cursors.SSCursor)
+    return connection.cursor()
+
+
+def fetch_bounded(
+    connection,
+    sql: str,
+    max_rows: int = RESULT_MAX_ROWS,
+    max_bytes: int = RESULT_MAX_BYTES,
+    batch_size: int = RESULT_FETCH_BATCH,
+) -> ColumnarResult:
+    """
+    Executes `sql` and reads at most `max_rows` rows / ~`max_bytes` bytes with
+    fetchmany, keeping the result columnar.
+
+    Args:
+        connection: psycopg2 / pymysql (or any DB-API) connection.
+        sql (str): Query to run.
+        max_rows (int): Row cap.
+        max_bytes (int): Approximate in-memory size cap.
+        batch_size (int): Rows per fetchmany round trip.
+
+    Returns:
+        ColumnarResult
+    """
+    cursor = _open_cursor(connection, sql)
+    exhausted = False
+    try:
+        cursor.execute(sql)
+        first_batch = cursor.fetchmany(min(batch_size, max_rows + 1))
+        columns = [desc[0] for desc in cursor.description] if cursor.description else []
+        result = ColumnarResult(columns)
+
+        batch = first_batch
+        while True:
+            if not batch:
+                exhausted = True
+                break
+            remaining = max_rows - result.row_count
+            if len(batch) > remaining:
+                result._append(batch[:remaining])
+                result.truncated, result.truncated_reason = True, "max_rows"
+                break
+
+            result._append(batch)
+            result.approx_bytes += _estimate_batch_bytes(batch)
+            if result.approx_bytes > max_bytes:
+                result.truncated, result.truncated_reason = True, "max_bytes"
+                break
+
+            batch = cursor.fetchmany(min(batch_size, max_rows - result.row_count + 1))
+
+        return result
+    finally:
+        _close_cursor(connection, cursor, exhausted)
+
+
+def iter_batches(connection, sql: str, batch_size: int = RESULT_FETCH_BATCH, max_rows: Optional[int] = None):
+    """
+    Executes `sql` and yields its rows one fetchmany batch at a time, for callers
+    that fold over results too large to keep (fetch_bounded keeps them, capped).
+
+    Args:
+        connection: psycopg2 / pymysql (or any DB-API) connection.
+        sql (str): Query to run.
+        batch_size (int): Rows per fetchmany round trip.
+        max_rows (int): Stop after this many rows; None reads the whole result.
+
+    Yields:
+        tuple: (columns, rows) - the same column names with every batch.
+    """
+    cursor = _open_cursor(connection, sql)
+    exhausted = False
+    try:
+        cursor.execute(sql)
+        fetched = 0
+        while max_rows is None or fetched < max_rows:
+            size = batch_size if max_rows is None else min(batch_size, max_rows - fetched)
+            batch = cursor.fetchmany(size)
+            if not batch:
+                exhausted = True
+                break
+            fetched += len(batch)
+            # Named (server-side) cursors only describe the result after the first fetch
+            yield [desc[0] for desc in cursor.description], batch
+    finally:
+        # Also reached when the caller stops iterating early
+        _close_cursor(connection, cursor, exhausted)
+
+
+def _close_cursor(connection, cursor, exhausted: bool = True):
+    """
+    Closes `cursor`. pymysql's SSCursor.close() reads every row still on the
+    wire, so a capped or abandoned unbuffered fetch closes the connection
+    instead; the pool discards closed connections when they're released.
+    """
+    if not exhausted and isinstance(cursor, pymysql.cursors.SSCursor):
+        try:
+            connection.close()
+        except Exception as e:
+            print(f"[WARN] Could not close unbuffered MySQL connection: {e}")
+        # SSCursor.__del__ calls close(), which returns at once without a connection
+        cursor.connection = None
+        return
+
+    try:
+        cursor.close()
+    except Exception as e:
+        print(f"[WARN] Could not close result cursor: {e}")
+    if isinstance(connection, psycopg2.extensions.connection):
+        # End the read transaction so the connection isn't left idle-in-transaction (or aborted)
+        connection.rollback()
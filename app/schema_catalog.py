@@ -0,0 +1,164 @@
+import hashlib
+import os
+import threading
+from datetime import datetime, timedelta
+from typing import Dict
+
+from app.database import SessionLocal
+from app.dependencies import describe_table, fetch_foreign_keys, fetch_samples, fetch_table_columns
+from app.models.schema_catalog import SchemaCatalogTable
+from app.schema_format import SCHEMA_FORMAT
+from app.ttl_cache import TTLCache
+
+# Re-describe a table whose structure did not change once its example rows are this old
+SCHEMA_CATALOG_MAX_AGE_SECONDS = int(os.getenv("SCHEMA_CATALOG_MAX_AGE_SECONDS", str(7 * 24 * 60 * 60)))
+# Connections whose assembled schema this process keeps; others are rebuilt from the table
+SCHEMA_CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("SCHEMA_CATALOG_CACHE_MAX_ENTRIES", "256"))
+
+
+def table_fingerprint(columns, foreign_keys=None) -> str:
+    raw = "\n".join(f"{column}:{dtype}" for column, dtype in columns)
+    raw += "\n" + "\n".join(f"{col}->{ref_table}.{ref_col}" for col, ref_table, ref_col in foreign_keys or [])
+    # Stored descriptions are rendered text, so switching SCHEMA_FORMAT re-describes every table
+    raw += f"\nformat:{SCHEMA_FORMAT}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def catalog_fingerprint(table_fingerprints: Dict[str, str]) -> str:
+    raw = "\n".join(f"{table}:{fp}" for table, fp in sorted(table_fingerprints.items()))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SchemaCatalog:
+    """
+    Schema descriptions shared by every session and worker, keyed by connection
+    identity (db_type://user@host:port/database).
+
+    Each refresh runs one cheap information_schema query and fingerprints every
+    table's column names/types. Only tables whose fingerprint changed (or whose
+    stored description is older than SCHEMA_CATALOG_MAX_AGE_SECONDS) are
+    re-described; the rest come from the `schema_catalog` table in the app DB.
+    """
+
+    def __init__(self, max_age_seconds: int, max_entries: int):
+        self.lock = threading.Lock()
+        self.max_age_seconds = max_age_seconds
+        self._cache = TTLCache(max_entries)
+        # Structure: { identity: { "fingerprint": ..., "schema": ... } } - checked against the live fingerprint on every use
+        self._identity_locks: Dict[str, threading.Lock] = {}
+
+    def get_schema(self, identity: str, connection, db_type: str, db_name: str) -> str:
+        with self.lock:
+            identity_lock = self._identity_locks.setdefault(identity, threading.Lock())
+
+        # One refresh per identity at a time; concurrent sessions wait and reuse it
+        with identity_lock:
+            cursor = connection.cursor()
+            try:
+                table_columns = fetch_table_columns(cursor, db_type, db_name)
+                foreign_keys = fetch_foreign_keys(connection, cursor, db_type, db_name)
+                fingerprints = {
+                    table: table_fingerprint(columns, foreign_keys.get(table))
+                    for table, columns in table_columns.items()
+                }
+                fingerprint = catalog_fingerprint(fingerprints)
+
+                cached = self._cache.get(identity)
+                if cached and cached["fingerprint"] == fingerprint:
+                    return cached["schema"]
+
+                descriptions, complete = self._refresh(
+                    identity, connection, cursor, db_type, table_columns, foreign_keys, fingerprints
+                )
+            finally:
+                cursor.close()
+
+        schema = "\n".join(descriptions[table] for table in table_columns)
+        if complete:
+            self._cache.set(identity, {"fingerprint": fingerprint, "schema": schema})
+        return schema
+
+    def fingerprint(self, identity: str):
+        cached = self._cache.get(identity)
+        return cached["fingerprint"] if cached else None
+
+    def invalidate(self, identity: str):
+        """Forces the next get_schema for `identity` to re-describe every table."""
+        self._cache.pop(identity)
+
+        db = SessionLocal()
+        try:
+            db.query(SchemaCatalogTable).filter(SchemaCatalogTable.identity == identity).delete()
+            db.commit()
+        finally:
+            db.close()
+
+    def _refresh(self, identity, connection, cursor, db_type, table_columns, foreign_keys, fingerprints):
+        """
+        Returns:
+            tuple: ({ table: description }, complete) - complete is False when some
+            tables were left unsampled because the sampling budget ran out.
+        """
+        db = SessionLocal()
+        try:
+            stored = {
+                entry.table_name: entry
+                for entry in db.query(SchemaCatalogTable).filter(SchemaCatalogTable.identity == identity).all()
+            }
+            stale_before = datetime.utcnow() - timedelta(seconds=self.max_age_seconds)
+            descriptions = {}
+            changed = {}
+            complete = True
+
+            for table, columns in table_columns.items():
+                entry = stored.get(table)
+                if entry and entry.columns_hash == fingerprints[table] and entry.updated_at and entry.updated_at > stale_before:
+                    descriptions[table] = entry.description
+                else:
+                    changed[table] = columns
+
+            # Sample only the changed tables, many per round trip
+            samples = fetch_samples(connection, cursor, db_type, changed)
+
+            for table, columns in changed.items():
+                entry = stored.get(table)
+                sample = samples.get(table)
+                descriptions[table] = describe_table(connection, cursor, table, columns, sample, foreign_keys.get(table))
+                if sample and sample.get("skipped"):
+                    # Out of sampling budget - don't persist, so the next refresh samples it
+                    complete = False
+                    continue
+                if entry:
+                    entry.columns_hash = fingerprints[table]
+                    entry.description = descriptions[table]
+                    entry.updated_at = datetime.utcnow()
+                else:
+                    db.add(SchemaCatalogTable(
+                        identity=identity,
+                        table_name=table,
+                        columns_hash=fingerprints[table],
+                        description=descriptions[table],
+                        updated_at=datetime.utcnow()
+                    ))
+
+            # Tables that were dropped upstream
+            for table, entry in stored.items():
+                if table not in table_columns:
+                    db.delete(entry)
+
+            try:
+                db.commit()
+            except Exception as e:
+                # Another worker may have written the same rows first; our descriptions are still valid
+                db.rollback()
+                print(f"[WARN] Could not persist schema catalog for '{identity}': {e}")
+            return descriptions, complete
+        finally:
+            db.close()
+
+
+# Singleton instance
+schema_catalog = SchemaCatalog(
+    max_age_seconds=SCHEMA_CATALOG_MAX_AGE_SECONDS,
+    max_entries=SCHEMA_CATALOG_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,105 @@
+import os
+from typing import Dict, List
+
+# "compact": one line per table; "markdown": the original ### Table / Columns / Example rows blocks
+SCHEMA_FORMAT = os.getenv("SCHEMA_FORMAT", "compact").lower()
+SCHEMA_COMPACT_VALUE_CHARS = int(os.getenv("SCHEMA_COMPACT_VALUE_CHARS", "24"))
+
+TYPE_ABBREVIATIONS = {
+    "character varying": "varchar",
+    "character": "char",
+    "timestamp without time zone": "timestamp",
+    "timestamp with time zone": "timestamptz",
+    "time without time zone": "time",
+    "time with time zone": "timetz",
+    "double precision": "double",
+    "integer": "int",
+    "boolean": "bool",
+}
+
+
+def abbreviate_type(data_type: str) -> str:
+    return TYPE_ABBREVIATIONS.get(data_type.lower(), data_type)
+
+
+def format_table(table: str, columns: list, sample: Dict, foreign_keys: list = None, schema_format: str = None) -> str:
+    """
+    Renders one table of the schema description in SCHEMA_FORMAT.
+
+    Args:
+        table (str): Table name.
+        columns (list): [(column, data_type), ...]
+        sample (dict): {"rows": [...]} | {"error": str} | {"skipped": True}
+        foreign_keys (list): [(column, referenced_table, referenced_column), ...]
+        schema_format (str): Overrides SCHEMA_FORMAT.
+
+    Returns:
+        str: The table's block; blocks are joined with newlines.
+    """
+    if (schema_format or SCHEMA_FORMAT) == "markdown":
+        return _format_markdown(table, columns, sample, foreign_keys)
+    return _format_compact(table, columns, sample, foreign_keys)
+
+
+def _format_markdown(table, columns, sample, foreign_keys):
+    schema_description = [f"\n### Table: {table}", "Columns:"]
+    for column, dtype in columns:
+        schema_description.append(f"- {column} ({dtype})")
+    if foreign_keys:
+        schema_description.append(
+            "Foreign keys: " + ", ".join(f"{col} -> {ref_table}.{ref_col}" for col, ref_table, ref_col in foreign_keys)
+        )
+
+    if sample.get("skipped"):
+        schema_description.append("Example rows: [Skipped - sampling time budget exhausted]")
+    elif "error" in sample:
+        schema_description.append(f"Example rows: [Error fetching rows - {sample['error']}]")
+    elif sample["rows"]:
+        schema_description.append("Example rows:")
+        for row_dict in sample["rows"]:
+            schema_description.append(f"- {row_dict}")
+    else:
+        schema_description.append("Example rows: [No data present]")
+
+    return "\n".join(schema_description)
+
+
+def _compact_value(value) -> str:
+    text = str(value).replace("\n", " ").replace("|", "/")
+    if len(text) > SCHEMA_COMPACT_VALUE_CHARS:
+        text = text[:SCHEMA_COMPACT_VALUE_CHARS] + "…"
+    return text
+
+
+def _compact_samples(rows: List[Dict]) -> str:
+    """Columnar example values: `col=a|b|c; col2=x|y`, distinct and non-null only."""
+    values_by_column: Dict[str, List[str]] = {}
+    for row in rows:
+        for column, value in row.items():
+            if value is None:
+                continue
+            values = values_by_column.setdefault(column, [])
+            text = _compact_value(value)
+            if text not in values:
+                values.append(text)
+    return "; ".join(f"{column}={'|'.join(values)}" for column, values in values_by_column.items() if values)
+
+
+def _format_compact(table, columns, sample, foreign_keys):
+    """
+    `table(col type, fk_col type->ref_table.ref_col, ...) eg: col=v1|v2; ...`
+    """
+    references = {col: f"{ref_table}.{ref_col}" for col, ref_table, ref_col in foreign_keys or []}
+    column_text = ", ".join(
+        f"{column} {abbreviate_type(dtype)}" + (f"->{references[column]}" if column in references else "")
+        for column, dtype in columns
+    )
+
+    if sample.get("skipped"):
+        examples = "(not sampled)"
+    elif "error" in sample:
+        examples = "(unreadable)"
+    else:
+        examples = _compact_samples(sample["rows"]) or "(empty)"
+
+    return f"{table}({column_text}) eg: {examples}"
@@ -0,0 +1,194 @@
+import hashlib
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Dict, List
+
+from app.ttl_cache import TTLCache
+
+SCHEMA_PRUNE_ENABLED = os.getenv("SCHEMA_PRUNE_ENABLED", "true").lower() == "true"
+SCHEMA_PRUNE_TOP_K = int(os.getenv("SCHEMA_PRUNE_TOP_K", "8"))
+# Schemas with at most this many tables are sent whole
+SCHEMA_PRUNE_MIN_TABLES = int(os.getenv("SCHEMA_PRUNE_MIN_TABLES", "12"))
+SCHEMA_INDEX_CACHE_SIZE = int(os.getenv("SCHEMA_INDEX_CACHE_SIZE", "64"))
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+# Name matches count more than matches in example values
+TABLE_NAME_WEIGHT = 3
+COLUMN_NAME_WEIGHT = 2
+
+TABLE_HEADER = "\n### Table: "
+FOREIGN_KEY_PATTERN = re.compile(r"->\s*([^\s.,]+)\.")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens, splitting snake_case and camelCase ('orderItems' -> 'order', 'items')."""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text)
+    tokens = re.findall(r"[A-Za-z0-9]+", text.lower())
+    # Crude singularization so 'orders' matches 'order'
+    return [t[:-1] if len(t) > 3 and t.endswith("s") and not t.endswith("ss") else t for t in tokens]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token count: words and punctuation marks."""
+    return len(re.findall(r"\w+|[^\w\s]", text))
+
+
+def parse_schema_blocks(schema_description: str) -> List[Dict]:
+    """
+    Splits a schema description (markdown or compact SCHEMA_FORMAT) into per-table blocks.
+
+    Returns:
+        list: [{ "table", "columns", "references", "text" }] in schema order.
+    """
+    if TABLE_HEADER not in schema_description:
+        return _parse_compact_blocks(schema_description)
+
+    blocks = []
+    for chunk in schema_description.split(TABLE_HEADER):
+        if not chunk.strip():
+            continue
+        lines = chunk.splitlines()
+        table = lines[0].strip()
+        columns = [
+            line[2:].rsplit(" (", 1)[0]
+            for line in lines[1:]
+            if line.startswith("- ") and line.endswith(")") and " (" in line
+        ]
+        references = set()
+        for line in lines:
+            if line.startswith("Foreign keys:"):
+                references.update(FOREIGN_KEY_PATTERN.findall(line))
+        blocks.append({"table": table, "columns": columns, "references": references, "text": TABLE_HEADER + chunk})
+    return blocks
+
+
+def _parse_compact_blocks(schema_description: str) -> List[Dict]:
+    """One `table(col type[->ref.col], ...) eg: ...` line per table."""
+    blocks = []
+    for line in schema_description.splitlines():
+        definition = line.partition(") eg: ")[0]
+        table, _, column_text = definition.partition("(")
+        if not column_text:
+            continue
+        columns = [column.split(" ", 1)[0] for column in column_text.split(", ")]
+        references = set(FOREIGN_KEY_PATTERN.findall(column_text))
+        blocks.append({"table": table.strip(), "columns": columns, "references": references, "text": "\n" + line})
+    return blocks
+
+
+class SchemaIndex:
+    """BM25 index with one document per table: its name, column names and example values."""
+
+    def __init__(self, schema_description: str):
+        self.blocks = parse_schema_blocks(schema_description)
+        self.tables = [block["table"] for block in self.blocks]
+
+        # Foreign keys are followed in both directions
+        self.neighbours: Dict[str, set] = {table: set() for table in self.tables}
+        for block in self.blocks:
+            for ref in block["references"]:
+                if ref in self.neighbours and ref != block["table"]:
+                    self.neighbours[block["table"]].add(ref)
+                    self.neighbours[ref].add(block["table"])
+
+        self.term_freqs: List[Counter] = []
+        for block in self.blocks:
+            terms = Counter(tokenize(block["text"]))
+            for token in tokenize(block["table"]):
+                terms[token] += TABLE_NAME_WEIGHT
+            for column in block["columns"]:
+                for token in tokenize(column):
+                    terms[token] += COLUMN_NAME_WEIGHT
+            self.term_freqs.append(terms)
+
+        self.doc_lengths = [sum(terms.values()) for terms in self.term_freqs]
+        self.avg_length = sum(self.doc_lengths) / len(self.doc_lengths) if self.doc_lengths else 0.0
+        doc_freq = Counter(token for terms in self.term_freqs for token in terms)
+        n = len(self.blocks)
+        self.idf = {token: math.log(1 + (n - df + 0.5) / (df + 0.5)) for token, df in doc_freq.items()}
+
+    def score(self, query: str) -> List[float]:
+        query_tokens = set(tokenize(query))
+        scores = []
+        for terms, length in zip(self.term_freqs, self.doc_lengths):
+            score = 0.0
+            for token in query_tokens:
+                tf = terms.get(token)
+                if not tf:
+                    continue
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * length / (self.avg_length or 1))
+                score += self.idf[token] * tf * (BM25_K1 + 1) / norm
+            scores.append(score)
+        return scores
+
+    def relevant_tables(self, query: str, top_k: int) -> List[str]:
+        """Top-k tables by BM25 score plus the tables they join to, in schema order."""
+        scores = self.score(query)
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)
+        selected = {self.tables[i] for i in ranked[:top_k] if scores[i] > 0}
+        for table in list(selected):
+            selected |= self.neighbours[table]
+        return [table for table in self.tables if table in selected]
+
+    def prune(self, query: str, top_k: int) -> str:
+        keep = set(self.relevant_tables(query, top_k))
+        if not keep:
+            # Nothing matched - better to send everything than an empty schema
+            return "".join(block["text"] for block in self.blocks)
+        return "".join(block["text"] for block in self.blocks if block["table"] in keep)
+
+
+class SchemaIndexCache:
+    """LRU of SchemaIndex objects keyed by schema fingerprint, plus token counters for pruning."""
+
+    def __init__(self, max_entries: int):
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self._indexes = TTLCache(max_entries)
+        # Structure: { schema fingerprint: SchemaIndex } - no TTL, a schema's index never changes
+        self._stats = {"prunes": 0, "tokens_before": 0, "tokens_after": 0}
+
+    def get_index(self, schema_description: str) -> SchemaIndex:
+        key = hashlib.sha256(schema_description.encode("utf-8")).hexdigest()
+        index = self._indexes.get(key)
+        if index is None:
+            index = SchemaIndex(schema_description)
+            self._indexes.set(key, index)
+        return index
+
+    def record(self, tokens_before: int, tokens_after: int):
+        with self.lock:
+            self._stats["prunes"] += 1
+            self._stats["tokens_before"] += tokens_before
+            self._stats["tokens_after"] += tokens_after
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self._stats)
+        stats["reduction"] = 1 - stats["tokens_after"] / stats["tokens_before"] if stats["tokens_before"] else 0.0
+        return stats
+
+
+# Singleton instance
+schema_index_cache = SchemaIndexCache(max_entries=SCHEMA_INDEX_CACHE_SIZE)
+
+
+def prune_schema(schema_description: str, user_prompt: str, top_k: int = SCHEMA_PRUNE_TOP_K) -> str:
+    """
+    Keeps only the tables relevant to `user_prompt` (plus their foreign-key
+    neighbours) so the SQL prompt doesn't carry the whole database.
+    """
+    if not SCHEMA_PRUNE_ENABLED or not schema_description:
+        return schema_description
+
+    index = schema_index_cache.get_index(schema_description)
+    if len(index.tables) <= SCHEMA_PRUNE_MIN_TABLES:
+        return schema_description
+
+    pruned = index.prune(user_prompt, top_k)
+    schema_index_cache.record(estimate_tokens(schema_description), estimate_tokens(pruned))
+    return pruned
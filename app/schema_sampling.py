@@ -0,0 +1,138 @@
+import json
+import os
+import time
+from typing import Dict, List
+
+SCHEMA_SAMPLE_MODE = os.getenv("SCHEMA_SAMPLE_MODE", "batched").lower()   # "batched" or "per_table"
+SCHEMA_SAMPLE_ROWS = int(os.getenv("SCHEMA_SAMPLE_ROWS", "3"))
+SCHEMA_SAMPLE_BATCH_TABLES = int(os.getenv("SCHEMA_SAMPLE_BATCH_TABLES", "50"))
+SCHEMA_SAMPLE_MAX_COLUMNS = int(os.getenv("SCHEMA_SAMPLE_MAX_COLUMNS", "12"))
+SCHEMA_SAMPLE_MAX_VALUE_CHARS = int(os.getenv("SCHEMA_SAMPLE_MAX_VALUE_CHARS", "60"))
+SCHEMA_SAMPLE_BUDGET_SECONDS = float(os.getenv("SCHEMA_SAMPLE_BUDGET_SECONDS", "10"))
+# PostgreSQL tables estimated above this many rows are read through TABLESAMPLE
+SCHEMA_TABLESAMPLE_MIN_ROWS = int(os.getenv("SCHEMA_TABLESAMPLE_MIN_ROWS", "100000"))
+SCHEMA_TABLESAMPLE_TARGET_ROWS = 1000
+
+
+def quote_identifier(db_type: str, identifier: str) -> str:
+    if db_type == "mysql":
+        return "`" + identifier.replace("`", "``") + "`"
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _table_estimates(cursor, db_type: str) -> Dict[str, float]:
+    """Planner row estimates so only big PostgreSQL tables get TABLESAMPLE."""
+    if db_type != "postgresql":
+        return {}
+    cursor.execute("""
+        SELECT c.relname, c.reltuples
+        FROM pg_class c
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE n.nspname = 'public' AND c.relkind = 'r'
+    """)
+    return {name: reltuples for name, reltuples in cursor.fetchall()}
+
+
+def _sample_select(db_type: str, table: str, columns: List[str], estimated_rows: float) -> str:
+    """
+    One table's sample as (table_name, json_text) rows: only the first columns,
+    each cast to text and cut to SCHEMA_SAMPLE_MAX_VALUE_CHARS.
+    """
+    quoted_table = quote_identifier(db_type, table)
+    if db_type == "mysql":
+        projection = ", ".join(
+            f"LEFT(CAST({quote_identifier(db_type, col)} AS CHAR), {SCHEMA_SAMPLE_MAX_VALUE_CHARS}) AS {quote_identifier(db_type, col)}"
+            for col in columns
+        )
+        json_pairs = ", ".join(f"{_literal(col)}, s.{quote_identifier(db_type, col)}" for col in columns)
+        return (
+            f"SELECT {_literal(table)} AS table_name, JSON_OBJECT({json_pairs}) AS sample "
+            f"FROM (SELECT {projection} FROM {quoted_table} LIMIT {SCHEMA_SAMPLE_ROWS}) s"
+        )
+
+    projection = ", ".join(
+        f"left({quote_identifier(db_type, col)}::text, {SCHEMA_SAMPLE_MAX_VALUE_CHARS}) AS {quote_identifier(db_type, col)}"
+        for col in columns
+    )
+    tablesample = ""
+    if estimated_rows and estimated_rows > SCHEMA_TABLESAMPLE_MIN_ROWS:
+        percent = max(min(100.0 * SCHEMA_TABLESAMPLE_TARGET_ROWS / estimated_rows, 100.0), 0.0001)
+        tablesample = f" TABLESAMPLE SYSTEM ({percent:.4f})"
+    return (
+        f"SELECT {_literal(table)} AS table_name, row_to_json(s)::text AS sample "
+        f"FROM (SELECT {projection} FROM {quoted_table}{tablesample} LIMIT {SCHEMA_SAMPLE_ROWS}) s"
+    )
+
+
+def _run_batch(cursor, selects: Dict[str, str], samples: Dict[str, Dict]):
+    sql = " UNION ALL ".join(f"({select})" for select in selects.values())
+    cursor.execute(sql)
+    for table in selects:
+        samples[table] = {"rows": []}
+    for table, sample in cursor.fetchall():
+        row = json.loads(sample) if isinstance(sample, str) else sample
+        samples[table]["rows"].append(row)
+
+
+def fetch_table_samples(connection, cursor, db_type: str, table_columns: Dict[str, list]) -> Dict[str, Dict]:
+    """
+    Samples many tables per round trip with UNION ALL batches of
+    SCHEMA_SAMPLE_BATCH_TABLES tables. Once SCHEMA_SAMPLE_BUDGET_SECONDS is spent,
+    the remaining tables are returned as skipped.
+
+    Args:
+        connection: DB-API connection (rolled back after a failed batch).
+        cursor: Cursor on that connection.
+        db_type (str): 'postgresql' or 'mysql'.
+        table_columns (dict): { table: [(column, data_type), ...] } to sample.
+
+    Returns:
+        dict: { table: {"rows": [dict, ...]} | {"error": str} | {"skipped": True} }
+    """
+    db_type = db_type.lower()
+    started = time.monotonic()
+    samples: Dict[str, Dict] = {}
+
+    try:
+        estimates = _table_estimates(cursor, db_type)
+    except Exception:
+        connection.rollback()
+        estimates = {}
+
+    tables = list(table_columns)
+    for start in range(0, len(tables), SCHEMA_SAMPLE_BATCH_TABLES):
+        batch = tables[start:start + SCHEMA_SAMPLE_BATCH_TABLES]
+        if time.monotonic() - started > SCHEMA_SAMPLE_BUDGET_SECONDS:
+            for table in tables[start:]:
+                samples[table] = {"skipped": True}
+            break
+
+        selects = {
+            table: _sample_select(
+                db_type,
+                table,
+                [col for col, _ in table_columns[table][:SCHEMA_SAMPLE_MAX_COLUMNS]],
+                estimates.get(table),
+            )
+            for table in batch
+        }
+        try:
+            _run_batch(cursor, selects, samples)
+        except Exception:
+            # One unreadable table fails the whole UNION; retry this batch table by table
+            connection.rollback()
+            for table, select in selects.items():
+                if time.monotonic() - started > SCHEMA_SAMPLE_BUDGET_SECONDS:
+                    samples[table] = {"skipped": True}
+                    continue
+                try:
+                    _run_batch(cursor, {table: select}, samples)
+                except Exception as e:
+                    connection.rollback()
+                    samples[table] = {"error": str(e)}
+
+    return samples
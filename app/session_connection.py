@@ -5,15 +5,18 @@ class SessionConnectionManager:
     def __init__(self):
         self.lock = threading.Lock()
         self._cache: Dict[str, Dict[str, Dict[str, Any]]] = {}
-        # Structure: { session_id: { db_id: { "connection": ..., "schema": ... } } }
+        # Structure: { session_id: { db_id: { "pool": ..., "schema": ..., "identity": ... } } }
+        # Pools are shared across sessions and owned by app.connection_pool.pool_registry,
+        # so dropping a session only drops its references.
 
-    def set_connection(self, session_id: str, db_id: str, connection: Any, schema: str):
+    def set_connection(self, session_id: str, db_id: str, pool: Any, schema: str, identity: Optional[str] = None):
         with self.lock:
             if session_id not in self._cache:
                 self._cache[session_id] = {}
             self._cache[session_id][db_id] = {
-                "connection": connection,
-                "schema": schema
+                "pool": pool,
+                "schema": schema,
+                "identity": identity
             }
           
 
@@ -26,25 +29,16 @@ class SessionConnectionManager:
     def remove_connection(self, session_id: str, db_id: str):
         with self.lock:
             if session_id in self._cache and db_id in self._cache[session_id]:
-                try:
-                    self._cache[session_id][db_id]["connection"].close()
-                except Exception as e:
-                    print(f"[WARN] Could not close connection for session_id='{session_id}', db_id='{db_id}': {e}")
                 del self._cache[session_id][db_id]
                
 
-            if not self._cache[session_id]:
+            if session_id in self._cache and not self._cache[session_id]:
                 del self._cache[session_id]
               
 
     def clear_session(self, session_id: str):
         with self.lock:
             if session_id in self._cache:
-                for db_id, data in self._cache[session_id].items():
-                    try:
-                        data["connection"].close()
-                    except Exception as e:
-                        print(f"[WARN] Failed to close connection for session_id='{session_id}', db_id='{db_id}': {e}")
                 del self._cache[session_id]
                 
 
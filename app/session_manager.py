@@ -1,16 +1,177 @@
+import os
 import secrets
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+from app.database import SessionLocal
+from app.models.user_session import UserSession
+from app.ttl_cache import TTLCache
+
+# Lifetime of a login; also the session cookie's max_age
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(24 * 60 * 60)))
+# "database" shares sessions across workers and restarts; "memory" keeps them in this process only
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "database").lower()
+# How long a worker trusts a lookup before asking the backend again - i.e. how long
+# a logout in another worker can go unnoticed here
+SESSION_CACHE_TTL_SECONDS = int(os.getenv("SESSION_CACHE_TTL_SECONDS", "30"))
+SESSION_CACHE_MAX_ENTRIES = int(os.getenv("SESSION_CACHE_MAX_ENTRIES", "4096"))
+
+# Expired rows are deleted on login, at most this often
+PURGE_INTERVAL_SECONDS = 60 * 60
+
+
+class MemorySessionBackend:
+    """Sessions in a dict: lost on restart and private to the worker."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._sessions: Dict[str, Tuple[int, datetime]] = {}
+        # Structure: { session_id: (user_id, expires_at) }
+
+    def create(self, session_id: str, user_id: int, expires_at: datetime):
+        with self.lock:
+            self._sessions[session_id] = (user_id, expires_at)
+            now = datetime.utcnow()
+            for key in [key for key, (_, expiry) in self._sessions.items() if expiry <= now]:
+                del self._sessions[key]
+
+    def get(self, session_id: str) -> Optional[Tuple[int, datetime]]:
+        with self.lock:
+            return self._sessions.get(session_id)
+
+    def delete(self, session_id: str):
+        with self.lock:
+            self._sessions.pop(session_id, None)
+
+
+class DatabaseSessionBackend:
+    """Sessions in the `user_sessions` table of the app database, shared by every worker."""
+
+    def __init__(self):
+        self._last_purge = 0.0
+
+    def create(self, session_id: str, user_id: int, expires_at: datetime):
+        db = SessionLocal()
+        try:
+            db.add(UserSession(session_id=session_id, user_id=user_id, expires_at=expires_at))
+            if time.time() - self._last_purge > PURGE_INTERVAL_SECONDS:
+                self._last_purge = time.time()
+                db.query(UserSession).filter(UserSession.expires_at <= datetime.utcnow()).delete()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def get(self, session_id: str) -> Optional[Tuple[int, datetime]]:
+        db = SessionLocal()
+        try:
+            row = db.query(UserSession.user_id, UserSession.expires_at).filter(UserSession.session_id == session_id).first()
+            return (row.user_id, row.expires_at) if row else None
+        except Exception as e:
+            print(f"[WARN] Session lookup failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def delete(self, session_id: str):
+        db = SessionLocal()
+        try:
+            db.query(UserSession).filter(UserSession.session_id == session_id).delete()
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[WARN] Could not delete session: {e}")
+        finally:
+            db.close()
+
+
+class SessionStore:
+    """
+    Session id -> user id, kept by a backend, with an in-process LRU in front.
+
+    Only valid sessions are cached, each until the earlier of its expiry and
+    `cache_ttl_seconds` from the lookup, so a login from another worker is seen
+    at once and a logout there within `cache_ttl_seconds`.
+    """
+
+    def __init__(self, backend, ttl_seconds: int, cache_ttl_seconds: int, max_entries: int):
+        self.lock = threading.Lock()
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.max_entries = max_entries
+        self._cache = TTLCache(max_entries, cache_ttl_seconds)
+        # Structure: { session_id: user_id }
+        self._stats = {"cache_hits": 0, "backend_hits": 0, "misses": 0}
+
+    def create(self, user_id: int) -> str:
+        session_id = secrets.token_urlsafe(32)
+        expires_at = datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+        self.backend.create(session_id, user_id, expires_at)
+        self._remember(session_id, user_id, expires_at)
+        return session_id
+
+    def get_user_id(self, session_id: str) -> Optional[int]:
+        user_id = self._cache.get(session_id)
+        if user_id is not None:
+            with self.lock:
+                self._stats["cache_hits"] += 1
+            return user_id
+
+        found = self.backend.get(session_id)
+        if found is None or found[1] <= datetime.utcnow():
+            with self.lock:
+                self._stats["misses"] += 1
+            return None
+
+        with self.lock:
+            self._stats["backend_hits"] += 1
+        self._remember(session_id, *found)
+        return found[0]
+
+    def delete(self, session_id: str):
+        self._cache.pop(session_id)
+        self.backend.delete(session_id)
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self._stats)
+        stats["entries"] = len(self._cache)
+        lookups = stats["cache_hits"] + stats["backend_hits"] + stats["misses"]
+        stats["cache_hit_rate"] = stats["cache_hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, session_id: str, user_id: int, expires_at: datetime):
+        remaining = (expires_at - datetime.utcnow()).total_seconds()
+        self._cache.set(session_id, user_id, ttl_seconds=min(self.cache_ttl_seconds, remaining))
+
+
+def _make_backend(name: str):
+    if name == "memory":
+        return MemorySessionBackend()
+    if name != "database":
+        print(f"[WARN] Unknown SESSION_BACKEND '{name}', using 'database'")
+    return DatabaseSessionBackend()
+
+
+# Singleton instance
+session_store = SessionStore(
+    backend=_make_backend(SESSION_BACKEND),
+    ttl_seconds=SESSION_TTL_SECONDS,
+    cache_ttl_seconds=SESSION_CACHE_TTL_SECONDS,
+    max_entries=SESSION_CACHE_MAX_ENTRIES,
+)
 
-# Dictionary to store active sessions in memory (not persistent)
-sessions = {}
 
 def create_session(user_id: int) -> str:
-    session_id = secrets.token_urlsafe(32)
-    sessions[session_id] = user_id
-    return session_id
+    return session_store.create(user_id)
 
 def get_user_id(session_id: str) -> int | None:
-    return sessions.get(session_id)
+    return session_store.get_user_id(session_id)
 
 def delete_session(session_id: str):
-    if session_id in sessions:
-        del sessions[session_id]
+    session_store.delete(session_id)
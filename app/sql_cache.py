@@ -0,0 +1,269 @@
+import asyncio
+import hashlib
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from app.database import SessionLocal
+from app.models.sql_cache import SqlCacheEntry
+from app.ttl_cache import TTLCache
+
+SQL_CACHE_ENABLED = os.getenv("SQL_CACHE_ENABLED", "true").lower() == "true"
+SQL_CACHE_TTL_SECONDS = int(os.getenv("SQL_CACHE_TTL_SECONDS", str(7 * 24 * 60 * 60)))
+SQL_CACHE_MAX_ENTRIES = int(os.getenv("SQL_CACHE_MAX_ENTRIES", "1024"))
+
+
+# Quoted literals ('New York', "ACME") end up in the SQL verbatim, so they keep their case and
+# spacing; quotes inside words (don't, customers') are apostrophes, not literal boundaries
+QUOTED_LITERAL = re.compile(r"""((?<!\w)'[^']*'(?!\w)|"[^"]*")""")
+
+
+def normalize_prompt(prompt: str) -> str:
+    """
+    Lowercases and collapses whitespace outside quoted literals, and drops trailing
+    punctuation, so trivially different prompts share a key while prompts that
+    differ inside a literal (e.g. 'Paris' vs 'paris') don't.
+    """
+    # split() with a capturing group puts the literals at the odd indexes
+    parts = QUOTED_LITERAL.split(prompt)
+    prompt = "".join(part if i % 2 else re.sub(r"\s+", " ", part.lower()) for i, part in enumerate(parts))
+    return re.sub(r"[\s?.!;]+$", "", prompt.strip())
+
+
+def schema_fingerprint(schema_description: str) -> str:
+    return hashlib.sha256((schema_description or "").encode("utf-8")).hexdigest()
+
+
+class PromptSQLCache:
+    """
+    Two-tier cache for LLM-generated SQL (and analysis plans).
+
+    Tier 1 is an in-process LRU with TTL; tier 2 is the `sql_cache` table in the
+    app database so entries survive restarts and are shared across workers.
+    Keys are (kind, normalized prompt, db_type, schema fingerprint), so a schema
+    change never serves SQL written for the old schema.
+
+    Freshly generated values are only held (`hold`) until the pipeline has run
+    their SQL: `commit(sql)` stores them once it ran, `discard(sql)` drops them
+    - and evicts a cached value whose SQL now fails - so a broken query is
+    never replayed.
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int, enabled: bool = True):
+        self.lock = threading.Lock()
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.enabled = enabled
+        self._cache = TTLCache(max_entries, ttl_seconds)
+        # Structure: { cache_key: { "value": ..., "schema_hash": ... } }
+        self._schemas: Dict[str, str] = {}
+        # Structure: { source: schema_hash } - last fingerprint seen per connection
+        self._held: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        # Structure: { sql: [ { "key", "kind", "prompt", "db_type", "schema_hash", "value", "stored" } ] }
+        # - values generated or served for a query that hasn't finished yet
+        self._stats = {"memory_hits": 0, "db_hits": 0, "misses": 0, "invalidations": 0, "discards": 0}
+
+    @staticmethod
+    def make_key(kind: str, prompt: str, db_type: str, schema_hash: str) -> str:
+        raw = "\x1f".join([kind, normalize_prompt(prompt), db_type.lower(), schema_hash])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def get(self, kind: str, prompt: str, db_type: str, schema_description: str) -> Optional[str]:
+        if not self.enabled:
+            return None
+
+        key = self.make_key(kind, prompt, db_type, schema_fingerprint(schema_description))
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            with self.lock:
+                self._stats["memory_hits"] += 1
+            return entry["value"]
+
+        value = await asyncio.to_thread(self._db_get, key)
+
+        with self.lock:
+            if value is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["db_hits"] += 1
+        self._remember(key, value, schema_fingerprint(schema_description))
+        return value
+
+    async def set(self, kind: str, prompt: str, db_type: str, schema_description: str, value: str):
+        if not self.enabled or not value:
+            return
+
+        schema_hash = schema_fingerprint(schema_description)
+        key = self.make_key(kind, prompt, db_type, schema_hash)
+        self._remember(key, value, schema_hash)
+        await asyncio.to_thread(self._db_set, key, kind, normalize_prompt(prompt), db_type.lower(), schema_hash, value)
+
+    def hold(self, kind: str, prompt: str, db_type: str, schema_description: str, value: str, sql: str, stored: bool):
+        """
+        Remembers a value handed to the pipeline until its SQL has run.
+
+        Args:
+            value (str): What get() returns for the key (the SQL, or the plan as JSON).
+            sql (str): The query the pipeline will run - what commit/discard are called with.
+            stored (bool): True when `value` came from the cache, False when just generated.
+        """
+        if not self.enabled or not value or not sql:
+            return
+
+        with self.lock:
+            self._held.setdefault(sql, []).append({
+                "key": self.make_key(kind, prompt, db_type, schema_fingerprint(schema_description)),
+                "kind": kind,
+                "prompt": normalize_prompt(prompt),
+                "db_type": db_type.lower(),
+                "schema_hash": schema_fingerprint(schema_description),
+                "value": value,
+                "stored": stored,
+            })
+            self._held.move_to_end(sql)
+            # Outcomes that never arrive (client gone, worker crash) just age out
+            while len(self._held) > self.max_entries:
+                self._held.popitem(last=False)
+
+    async def commit(self, sql: str):
+        """Stores the values held for `sql` now that it ran successfully."""
+        with self.lock:
+            held = self._held.pop(sql, [])
+        for entry in held:
+            if not entry["stored"]:
+                self._remember(entry["key"], entry["value"], entry["schema_hash"])
+                await asyncio.to_thread(
+                    self._db_set, entry["key"], entry["kind"], entry["prompt"],
+                    entry["db_type"], entry["schema_hash"], entry["value"]
+                )
+
+    async def discard(self, sql: str):
+        """Drops the values held for `sql` after it failed, evicting them if they were cached."""
+        with self.lock:
+            held = self._held.pop(sql, [])
+            stored = [entry["key"] for entry in held if entry["stored"]]
+            for key in stored:
+                self._cache.pop(key, None)
+            if held:
+                self._stats["discards"] += 1
+        if stored:
+            await asyncio.to_thread(self._db_delete, stored)
+
+    def track_schema(self, source: str, schema_description: str) -> bool:
+        """
+        Records the schema fingerprint for a connection and, when it changed,
+        drops what this process cached against the previous fingerprint unless
+        another connection still has that schema.
+
+        Returns:
+            bool: True when the fingerprint changed since the last call for `source`.
+        """
+        schema_hash = schema_fingerprint(schema_description)
+        with self.lock:
+            previous = self._schemas.get(source)
+            self._schemas[source] = schema_hash
+
+        if previous and previous != schema_hash:
+            self.invalidate_schema(previous)
+            return True
+        return False
+
+    def invalidate_schema(self, schema_hash: str):
+        """
+        Drops the in-process entries for `schema_hash` when no tracked connection
+        still uses it. Rows in `sql_cache` may belong to connections of other
+        workers with the same schema, so only expired ones are deleted; the rest
+        can't be served for the new fingerprint anyway.
+        """
+        with self.lock:
+            if schema_hash in self._schemas.values():
+                return
+            self._cache.pop_where(lambda _, entry: entry["schema_hash"] == schema_hash)
+            self._stats["invalidations"] += 1
+
+        db = SessionLocal()
+        try:
+            cutoff = datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+            db.query(SqlCacheEntry).filter(SqlCacheEntry.created_at < cutoff).delete()
+            db.commit()
+        except Exception as e:
+            print(f"[WARN] Could not purge expired sql_cache rows: {e}")
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            stats = dict(self._stats)
+        stats["entries"] = len(self._cache)
+        lookups = stats["memory_hits"] + stats["db_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["db_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key: str, value: str, schema_hash: str):
+        self._cache.set(key, {"value": value, "schema_hash": schema_hash})
+
+    def _db_get(self, key: str) -> Optional[str]:
+        db = SessionLocal()
+        try:
+            entry = db.query(SqlCacheEntry).filter(SqlCacheEntry.cache_key == key).first()
+            if not entry:
+                return None
+            if entry.created_at and entry.created_at < datetime.utcnow() - timedelta(seconds=self.ttl_seconds):
+                db.delete(entry)
+                db.commit()
+                return None
+            entry.hits = (entry.hits or 0) + 1
+            db.commit()
+            return entry.value
+        except Exception as e:
+            print(f"[WARN] sql_cache lookup failed: {e}")
+            return None
+        finally:
+            db.close()
+
+    def _db_set(self, key: str, kind: str, prompt: str, db_type: str, schema_hash: str, value: str):
+        db = SessionLocal()
+        try:
+            entry = db.query(SqlCacheEntry).filter(SqlCacheEntry.cache_key == key).first()
+            if entry:
+                entry.value = value
+                entry.created_at = datetime.utcnow()
+            else:
+                db.add(SqlCacheEntry(
+                    cache_key=key,
+                    kind=kind,
+                    db_type=db_type,
+                    schema_hash=schema_hash,
+                    prompt=prompt,
+                    value=value,
+                    hits=0
+                ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[WARN] sql_cache store failed: {e}")
+        finally:
+            db.close()
+
+    def _db_delete(self, keys: List[str]):
+        db = SessionLocal()
+        try:
+            db.query(SqlCacheEntry).filter(SqlCacheEntry.cache_key.in_(keys)).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"[WARN] sql_cache eviction failed: {e}")
+        finally:
+            db.close()
+
+
+# Singleton instance
+prompt_sql_cache = PromptSQLCache(
+    ttl_seconds=SQL_CACHE_TTL_SECONDS,
+    max_entries=SQL_CACHE_MAX_ENTRIES,
+    enabled=SQL_CACHE_ENABLED,
+)
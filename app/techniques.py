@@ -1,44 +1,98 @@
-from prophet import Prophet
-import pandas as pd
+import os
+import time
 
-def run_forecasting(data, user_prompt,period):
+# "auto" picks by series length; "prophet" or "holt_winters" forces an engine
+FORECAST_ENGINE = os.getenv("FORECAST_ENGINE", "auto").lower()
+# In auto mode, series up to this many points use the NumPy Holt-Winters engine
+FORECAST_FAST_ENGINE_MAX_POINTS = int(os.getenv("FORECAST_FAST_ENGINE_MAX_POINTS", "730"))
+FORECAST_ENGINES = ("prophet", "holt_winters")
+
+
+def select_forecast_engine(n_points, engine=None):
+    """Returns 'prophet' or 'holt_winters': the explicit `engine`, else FORECAST_ENGINE, else by length."""
+    engine = (engine or FORECAST_ENGINE).lower()
+    if engine in FORECAST_ENGINES:
+        return engine
+    return "holt_winters" if n_points <= FORECAST_FAST_ENGINE_MAX_POINTS else "prophet"
+
+
+def _series(data):
+    if isinstance(data, dict):
+        return data["ds"], data["y"]
+    return [row["ds"] for row in data], [row["y"] for row in data]
+
+
+def run_forecasting(data, user_prompt,period, engine=None):
     """
-    Runs Prophet forecasting on provided data.
+    Runs forecasting on provided data.
 
     Args:
-        data (list of dict): List with 'ds' and 'y' keys.
+        data (list of dict or dict of lists): 'ds' and 'y' values, row- or column-wise.
         user_prompt (str): Optional user prompt for logging/debugging.
+        engine (str): 'prophet' or 'holt_winters'; chosen by select_forecast_engine when omitted.
+
+    Returns:
+        ForecastSeries: Historical and forecasted points for the line chart, or an error dict.
+    """
+    chart_data, _, _ = run_forecasting_with_model(data, user_prompt, period, engine=engine)
+    return chart_data
+
+
+def run_forecasting_with_model(data, user_prompt, period, model_json=None, engine=None):
+    """
+    Same as run_forecasting, but can reuse an already fitted Prophet model.
+
+    Args:
+        model_json (str): A model serialized with prophet.serialize.model_to_json for
+            this same series; when given, only predict() runs.
 
     Returns:
-        dict: Contains historical and forecasted data for line chart.
+        tuple: (ForecastSeries or error dict, model_json of a newly fitted Prophet model or None, fit seconds)
     """
+    n_points = len(data["y"]) if isinstance(data, dict) else len(data)
+    if select_forecast_engine(n_points, engine) == "holt_winters":
+        from app.fast_forecast import holt_winters_forecast
+
+        try:
+            return holt_winters_forecast(*_series(data), period), None, 0.0
+        except Exception as e:
+            return {"error": "Forecasting failed", "details": str(e)}, None, 0.0
+
+    # Prophet/pandas take most of a second to import; only forecasts pay for it
+    from prophet import Prophet
+    from prophet.serialize import model_from_json, model_to_json
+    import pandas as pd
+
+    from app.forecast_result import ForecastSeries
+
     try:
         df = pd.DataFrame(data)
         df['ds'] = pd.to_datetime(df['ds'])
         
-        model = Prophet()
-        model.fit(df)
+        new_model_json, fit_seconds = None, 0.0
+        if model_json:
+            model = model_from_json(model_json)
+        else:
+            started = time.perf_counter()
+            model = Prophet()
+            model.fit(df)
+            fit_seconds = time.perf_counter() - started
+            new_model_json = model_to_json(model)
 
         # Forecast 30 future periods (you can customize this)
         future = model.make_future_dataframe(periods=period)
         forecast = model.predict(future)
 
-        # Prepare historical data
-        historical_data = df[['ds', 'y']].rename(columns={'ds': 'date', 'y': 'value'})
-        historical_data['type'] = 'historical'
-
-        # Prepare forecasted data
-        forecast_data = forecast[['ds', 'yhat']].rename(columns={'ds': 'date', 'yhat': 'value'})
-        forecast_data = forecast_data[forecast_data['date'] > df['ds'].max()]
-        forecast_data['type'] = 'forecast'
-
-        # Combine for chart
-        combined_data = pd.concat([historical_data, forecast_data])
+        # Historical points as given, then the predictions past the last observed date
+        future_rows = forecast['ds'] > df['ds'].max()
+        chart_data = ForecastSeries.from_parts(
+            df['ds'].to_numpy(dtype='datetime64[s]'),
+            pd.to_numeric(df['y'], errors='coerce').to_numpy(dtype=float),
+            forecast.loc[future_rows, 'ds'].to_numpy(dtype='datetime64[s]'),
+            forecast.loc[future_rows, 'yhat'].to_numpy(dtype=float),
+        )
 
-        chart_data = combined_data.to_dict(orient='records')
-
-        
-        return chart_data
+        return chart_data, new_model_json, fit_seconds
     
     
     except Exception as e:
@@ -46,4 +100,4 @@ def run_forecasting(data, user_prompt,period):
         return {
             "error": "Forecasting failed",
             "details": str(e)
-        }
\ No newline at end of file
+        }, None, 0.0
@@ -0,0 +1,77 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Thread-safe in-process LRU whose entries also expire `ttl_seconds` after they
+    were set (never when it is None).
+
+    The least recently used entries are evicted once there are more than
+    `max_entries`, or once the entries' sizes (given to `set`) add up to more
+    than `max_size`. Expired entries are dropped when looked up.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: Optional[float] = None, max_size: Optional[int] = None):
+        self.lock = threading.Lock()
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], int]]" = OrderedDict()
+        # Structure: { key: (value, expires_at or None, size) }
+        self._size = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            if entry[1] is not None and entry[1] <= time.time():
+                self._drop(key)
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None, size: int = 0):
+        """Stores `value` as the most recently used entry; `ttl_seconds` overrides the cache's TTL for it."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self.lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (value, expires_at, size)
+            self._size += size
+            while len(self._entries) > self.max_entries or (self.max_size is not None and self._size > self.max_size):
+                self._drop(next(iter(self._entries)))
+                self._evictions += 1
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self.lock:
+            if key not in self._entries:
+                return default
+            return self._drop(key)
+
+    def pop_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drops every entry for which predicate(key, value) is true; returns how many were dropped."""
+        with self.lock:
+            stale = [key for key, (value, _, _) in self._entries.items() if predicate(key, value)]
+            for key in stale:
+                self._drop(key)
+        return len(stale)
+
+    def stats(self) -> Dict[str, int]:
+        with self.lock:
+            return {"entries": len(self._entries), "size": self._size, "evictions": self._evictions}
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self._entries)
+
+    def _drop(self, key: Hashable) -> Any:
+        """Caller holds the lock."""
+        value, _, size = self._entries.pop(key)
+        self._size -= size
+        return value
@@ -0,0 +1,101 @@
+"""
+Accuracy and speed of the forecast engines on synthetic daily series: the NumPy
+Holt-Winters engine against Prophet, each fitted on the series minus its last
+--horizon points and scored on those held-out points.
+
+Reports fit+predict time and sMAPE / MAE per series; Prophet is skipped when
+it isn't installed.
+
+Usage:
+    python benchmarks/forecast_engines.py [--horizon 30] [--lengths 90,365,730] [--no-prophet]
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+from app.techniques import run_forecasting  # noqa: E402
+
+
+def synthetic_series(kind, n, rng):
+    t = np.arange(n, dtype=float)
+    noise = rng.normal(0, 1.0, n)
+    if kind == "trend":
+        y = 50 + 0.3 * t + noise
+    elif kind == "weekly":
+        y = 100 + 0.1 * t + 8 * np.sin(2 * np.pi * t / 7) + noise
+    elif kind == "weekly+yearly":
+        y = 200 + 6 * np.sin(2 * np.pi * t / 7) + 20 * np.sin(2 * np.pi * t / 365.25) + 2 * noise
+    elif kind == "random_walk":
+        y = 100 + np.cumsum(noise)
+    else:
+        raise ValueError(kind)
+    return y
+
+
+def smape(actual, predicted):
+    return float(np.mean(2 * np.abs(predicted - actual) / (np.abs(actual) + np.abs(predicted) + 1e-9)) * 100)
+
+
+def evaluate(engine, values, horizon):
+    start = date(2022, 1, 1)
+    train = values[:-horizon]
+    data = {"ds": [start + timedelta(days=i) for i in range(len(train))], "y": train.tolist()}
+
+    started = time.perf_counter()
+    result = run_forecasting(data, "", horizon, engine=engine)
+    elapsed = time.perf_counter() - started
+    if isinstance(result, dict):
+        raise RuntimeError(result.get("details"))
+
+    predicted = result.values[result.is_forecast][:horizon]
+    actual = values[-horizon:]
+    return elapsed, smape(actual, predicted), float(np.mean(np.abs(predicted - actual)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--horizon", type=int, default=30)
+    parser.add_argument("--lengths", default="90,365,730")
+    parser.add_argument("--no-prophet", action="store_true")
+    args = parser.parse_args()
+
+    engines = ["holt_winters"]
+    if not args.no_prophet:
+        try:
+            import prophet  # noqa: F401
+            logging.getLogger("cmdstanpy").setLevel(logging.WARNING)
+            logging.getLogger("prophet").setLevel(logging.WARNING)
+            engines.append("prophet")
+        except ImportError:
+            print("prophet not installed - Holt-Winters only\n")
+
+    rng = np.random.default_rng(42)
+    print(f"{'series':<15}{'n':>6}  {'engine':<13}{'seconds':>9}{'sMAPE %':>9}{'MAE':>9}")
+    totals = {engine: [0.0, 0.0, 0] for engine in engines}
+    for kind in ("trend", "weekly", "weekly+yearly", "random_walk"):
+        for n in (int(length) for length in args.lengths.split(",")):
+            values = synthetic_series(kind, n + args.horizon, rng)
+            for engine in engines:
+                elapsed, error, mae = evaluate(engine, values, args.horizon)
+                totals[engine][0] += elapsed
+                totals[engine][1] += error
+                totals[engine][2] += 1
+                print(f"{kind:<15}{n:>6}  {engine:<13}{elapsed:>9.3f}{error:>9.2f}{mae:>9.2f}")
+
+    print()
+    for engine, (seconds, error, runs) in totals.items():
+        print(f"{engine:<13} total {seconds:7.2f}s   mean sMAPE {error / runs:6.2f}%")
+
+
+if __name__ == "__main__":
+    main()
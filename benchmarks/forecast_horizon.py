@@ -0,0 +1,55 @@
+"""
+Checks that the Holt-Winters engine turns the forecast period (in days, as
+get_period returns it) into the right number of steps for daily, weekly and
+monthly series, and that the last forecast date lands about `period` days
+after the history. Prints OK or exits non-zero.
+
+Usage:
+    python benchmarks/forecast_horizon.py [--period 30]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+from app.fast_forecast import holt_winters_forecast  # noqa: E402
+
+SPACINGS = {
+    "daily": (np.timedelta64(1, "D"), 365),
+    "weekly": (np.timedelta64(7, "D"), 104),
+    "monthly": (np.timedelta64(30, "D"), 36),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--period", type=int, default=30)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(2)
+    failures = 0
+    for name, (step, n) in SPACINGS.items():
+        dates = np.datetime64("2022-01-01") + step * np.arange(n)
+        values = 100 + np.cumsum(rng.normal(0, 1, n))
+        result = holt_winters_forecast(dates.tolist(), values.tolist(), args.period)
+
+        forecast_dates = result.dates[result.is_forecast]
+        expected_steps = int(np.ceil(args.period / (step / np.timedelta64(1, "D"))))
+        reach_days = (forecast_dates[-1] - result.dates[~result.is_forecast][-1]) / np.timedelta64(1, "D")
+        ok = len(forecast_dates) == expected_steps and args.period <= reach_days < args.period + step / np.timedelta64(1, "D")
+        failures += not ok
+        print(f"{name:<8} {len(forecast_dates):>3} steps (expected {expected_steps}), reaches +{reach_days:.0f} days  {'ok' if ok else 'FAIL'}")
+
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
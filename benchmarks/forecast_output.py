@@ -0,0 +1,116 @@
+"""
+Post-fit cost of a forecast: turning Prophet's output into the chart config.
+
+Compares the old record path (concat + to_dict(orient='records'), pickled back
+from the worker process, then a per-row strftime loop and list slicing in
+generate_forecast_config) with the columnar ForecastSeries path, on synthetic
+Prophet-shaped frames. The fit itself is not measured; both paths get the
+same frames, and their chart configs are checked to be identical.
+
+Usage:
+    python benchmarks/forecast_output.py [--sizes 10000,100000,1000000] [--period 30] [--repeat 3]
+"""
+import argparse
+import os
+import pickle
+import sys
+import time
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+from app.forecast_result import ForecastSeries  # noqa: E402
+from app.generatefuncs import generate_forecast_config  # noqa: E402
+
+
+def prophet_frames(n, period):
+    """A fitted series of n points and a forecast frame covering it plus `period` days, as Prophet returns them."""
+    ds = pd.date_range("2000-01-01", periods=n, freq="h")
+    df = pd.DataFrame({"ds": ds, "y": np.random.default_rng(0).normal(100, 10, n)})
+    future = pd.date_range(ds[-1], periods=period + 1, freq="D")[1:]
+    forecast = pd.DataFrame({"ds": ds.append(future), "yhat": np.linspace(90, 110, n + period)})
+    return df, forecast
+
+
+def legacy_config(df, forecast, period):
+    historical_data = df[['ds', 'y']].rename(columns={'ds': 'date', 'y': 'value'})
+    historical_data['type'] = 'historical'
+    forecast_data = forecast[['ds', 'yhat']].rename(columns={'ds': 'date', 'yhat': 'value'})
+    forecast_data = forecast_data[forecast_data['date'] > df['ds'].max()]
+    forecast_data['type'] = 'forecast'
+    records = pickle.loads(pickle.dumps(pd.concat([historical_data, forecast_data]).to_dict(orient='records')))
+
+    historical_values, forecast_values, historical_dates, forecast_dates = [], [], [], []
+    for item in records:
+        date_str = item['date'].strftime('%Y-%m-%d')
+        value = float(item['value']) if isinstance(item['value'], Decimal) else item['value']
+        if item['type'] == 'historical':
+            historical_values.append(value)
+            historical_dates.append(date_str)
+        else:
+            forecast_values.append(value)
+            forecast_dates.append(date_str)
+    return (
+        historical_dates[-period:] + forecast_dates[:period],
+        historical_values[-period:] + forecast_values[:period],
+    )
+
+
+def columnar_config(df, forecast, period):
+    future_rows = forecast['ds'] > df['ds'].max()
+    series = pickle.loads(pickle.dumps(ForecastSeries.from_parts(
+        df['ds'].to_numpy(dtype='datetime64[s]'),
+        df['y'].to_numpy(dtype=float),
+        forecast.loc[future_rows, 'ds'].to_numpy(dtype='datetime64[s]'),
+        forecast.loc[future_rows, 'yhat'].to_numpy(dtype=float),
+    )))
+    config = generate_forecast_config("benchmark", series, period)
+    return config["xAxisData"], config["seriesData"][0]["data"]
+
+
+def timed(path, df, forecast, period, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = path(df, forecast, period)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--period", type=int, default=30)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'points':>9}{'records ms':>12}{'columnar ms':>13}{'speedup':>9}")
+    for n in (int(size) for size in args.sizes.split(",")):
+        df, forecast = prophet_frames(n, args.period)
+        legacy_seconds, legacy = timed(legacy_config, df, forecast, args.period, args.repeat)
+        columnar_seconds, columnar = timed(columnar_config, df, forecast, args.period, args.repeat)
+        if legacy != columnar:
+            raise SystemExit(f"Chart configs differ at {n} points")
+        print(f"{n:>9}{legacy_seconds * 1000:>12.1f}{columnar_seconds * 1000:>13.1f}{legacy_seconds / columnar_seconds:>8.0f}x")
+
+    # Payload each path sends back from the forecast worker process
+    df, forecast = prophet_frames(100_000, args.period)
+    future_rows = forecast['ds'] > df['ds'].max()
+    historical = df.rename(columns={'ds': 'date', 'y': 'value'}).assign(type='historical')
+    predicted = forecast.loc[future_rows].rename(columns={'ds': 'date', 'yhat': 'value'}).assign(type='forecast')
+    records_bytes = len(pickle.dumps(pd.concat([historical, predicted]).to_dict(orient='records')))
+    series_bytes = len(pickle.dumps(ForecastSeries.from_parts(
+        df['ds'].to_numpy(dtype='datetime64[s]'), df['y'].to_numpy(dtype=float),
+        forecast.loc[future_rows, 'ds'].to_numpy(dtype='datetime64[s]'), forecast.loc[future_rows, 'yhat'].to_numpy(dtype=float),
+    )))
+    print(f"\nPickled worker result at 100k points: records {records_bytes / 1e6:.1f} MB, columnar {series_bytes / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Checks that a capped fetch on MySQL's unbuffered SSCursor doesn't read the
+rest of the result set off the wire (SSCursor.close() drains it), for both
+fetch_bounded and an iter_batches consumer that stops early, and that the
+pool discards the closed connection. Prints OK or exits non-zero.
+
+No MySQL server is needed: the connection and cursor are pymysql subclasses
+that serve --rows rows from a counter and drain it in close() the way
+SSCursor does.
+
+Usage:
+    python benchmarks/mysql_unbuffered_cap.py [--rows 1000000] [--cap 1000]
+"""
+import argparse
+import os
+import sys
+
+import pymysql.connections
+import pymysql.cursors
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+from app.connection_pool import ConnectionPool  # noqa: E402
+from app.result_fetch import fetch_bounded, iter_batches  # noqa: E402
+
+
+class WireConnection(pymysql.connections.Connection):
+    def __init__(self, rows):
+        self.rows = rows
+        self.read = 0
+        self.is_open = True
+
+    @property
+    def open(self):
+        return self.is_open
+
+    def cursor(self, cursor=None):
+        return WireCursor(self)
+
+    def rollback(self):
+        if not self.is_open:
+            raise pymysql.err.InterfaceError("(0, '')")
+
+    def close(self):
+        self.is_open = False
+
+
+class WireCursor(pymysql.cursors.SSCursor):
+    def __init__(self, connection):
+        self.connection = connection
+        self.description = (("n",),)
+
+    def execute(self, sql, args=None):
+        return 0
+
+    def fetchmany(self, size=None):
+        conn = self.connection
+        count = min(size, conn.rows - conn.read)
+        batch = [(conn.read + i,) for i in range(count)]
+        conn.read += count
+        return batch
+
+    def close(self):
+        # Like SSCursor.close(): read whatever is left of the result set
+        if self.connection is not None:
+            self.connection.read = self.connection.rows
+            self.connection = None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--cap", type=int, default=1000)
+    args = parser.parse_args()
+
+    checks = []
+
+    connection = WireConnection(args.rows)
+    result = fetch_bounded(connection, "SELECT n FROM big", max_rows=args.cap, batch_size=500)
+    checks.append(("fetch_bounded cap", result.truncated and connection.read <= args.cap + 500, connection.read))
+
+    connection = WireConnection(args.rows)
+    batches = iter_batches(connection, "SELECT n FROM big", batch_size=500)
+    next(batches)
+    batches.close()
+    checks.append(("iter_batches stopped early", connection.read == 500, connection.read))
+
+    connection = WireConnection(300)
+    fetch_bounded(connection, "SELECT n FROM small", max_rows=args.cap, batch_size=500)
+    checks.append(("small result stays open", connection.is_open, connection.read))
+
+    pool = ConnectionPool(lambda: WireConnection(args.rows))
+    with pool.connection() as pooled:
+        fetch_bounded(pooled, "SELECT n FROM big", max_rows=args.cap, batch_size=500)
+    checks.append(("pool discards it", pool.stats()["size"] == 0, pooled.read))
+
+    for name, ok, read in checks:
+        print(f"{name:<28} rows read {read:>9,}  {'ok' if ok else 'FAIL'}")
+    if not all(ok for _, ok, _ in checks):
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
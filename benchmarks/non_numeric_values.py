@@ -0,0 +1,68 @@
+"""
+Checks that the analysis engines survive a stray non-numeric value (e.g. 'n/a')
+in a column sniffed as numeric from its first value: the value is treated as
+missing and counted as skipped instead of failing the whole request.
+Prints OK or exits non-zero.
+
+Usage:
+    python benchmarks/non_numeric_values.py
+"""
+import os
+import sys
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+from app.anomaly_detection import build_anomaly_chart_config  # noqa: E402
+from app.clustering import cluster_batches  # noqa: E402
+from app.prediction import fit_regression_batches  # noqa: E402
+
+COLUMNS = ["label", "value", "other"]
+ROWS = [(f"r{i}", Decimal(i % 7), i) for i in range(40)] + [("d", "n/a", 3), ("e", None, 4)]
+
+
+def check_anomalies():
+    config = build_anomaly_chart_config(COLUMNS, list(zip(*ROWS)))
+    return config["pointCount"] == len(ROWS) and config["skippedRows"] == 2
+
+
+def check_prediction():
+    # A missing target is predicted, an unreadable one skipped like an unreadable feature
+    rows = [(label, other, value) for label, value, other in ROWS] + [("f", 3, "n/a"), ("g", 5, None)]
+    fit = fit_regression_batches([(["label", "x", "target"], rows)])
+    return fit["row_count"] == len(rows) and fit["skipped_rows"] == 2 and len(fit["unknown"]) == 2
+
+
+def check_clustering():
+    result = cluster_batches(lambda: [(COLUMNS, ROWS)], k=2)
+    return result["row_count"] == len(ROWS) and result["skipped_rows"] == 2
+
+
+CHECKS = {
+    "anomaly_detection": check_anomalies,
+    "clustering": check_clustering,
+    "prediction": check_prediction,
+}
+
+
+def main():
+    failures = 0
+    for name, check in CHECKS.items():
+        try:
+            ok = check()
+        except Exception as e:
+            print(f"{name:<18} raised {type(e).__name__}: {e}")
+            ok = False
+        failures += not ok
+        print(f"{name:<18} {'ok' if ok else 'FAIL'}")
+
+    if failures:
+        sys.exit(1)
+    print("OK")
+
+
+if __name__ == "__main__":
+    main()
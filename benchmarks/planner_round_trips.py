@@ -0,0 +1,94 @@
+"""
+Compares LLM round trips and wall time for /dashboard/generate with the
+legacy per-step calls versus the single plan_analysis call.
+
+The LLM is simulated with a fixed per-call latency so the numbers only
+reflect how many sequential round trips each path makes.
+
+Usage:
+    python benchmarks/planner_round_trips.py [--latency 1.5]
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from app import generatefuncs  # noqa: E402
+from app.llm_gateway import llm_gateway  # noqa: E402
+
+SCHEMA = "\n### Table: sales\nColumns:\n- sold_at (date)\n- amount (numeric)"
+
+
+def make_fake_chat(latency, calls):
+    async def fake_chat(messages, timeout=None, model=None, **kwargs):
+        calls.append(messages[-1]["content"][:40])
+        await asyncio.sleep(latency)
+        content = messages[-1]["content"]
+        if "response_format" in kwargs:
+            intent = "forecasting" if "forecast" in content.split("### QUESTION ###")[-1] else "visualization"
+            return json.dumps({
+                "intent": intent,
+                "sql": 'SELECT "sold_at" AS ds, SUM("amount") AS y FROM "sales" GROUP BY 1 ORDER BY 1',
+                "chart_type": "line",
+                "forecast_period": 30 if intent == "forecasting" else None,
+                "output_format": "visual",
+            })
+        if "classify the user's request" in content:
+            return "forecasting" if "forecast" in content.split("User's Request:")[-1] else "visualization"
+        if "period the user wants" in content:
+            return "30"
+        if "chart generation assistant" in content:
+            return "{}"
+        return 'SELECT "sold_at" AS ds, SUM("amount") AS y FROM "sales" GROUP BY 1 ORDER BY 1'
+    return fake_chat
+
+
+async def legacy_path(prompt):
+    intent = await generatefuncs.classify_intent_with_llm(prompt)
+    if intent == "forecasting":
+        await generatefuncs.generate_sql_from_prompt_for_prophet(prompt, SCHEMA, "postgresql")
+        await generatefuncs.get_period(prompt)
+    else:
+        await generatefuncs.generate_sql_from_prompt(prompt, SCHEMA, "postgresql")
+        await generatefuncs.generate_echarts_config(prompt, {"columns": [], "rows": []}, "line")
+
+
+async def planned_path(prompt):
+    plan = await generatefuncs.plan_analysis(prompt, SCHEMA, "postgresql")
+    if plan["intent"] != "forecasting":
+        await generatefuncs.generate_echarts_config(prompt, {"columns": [], "rows": []}, plan["chart_type"])
+
+
+async def measure(path, prompt, latency):
+    calls = []
+    llm_gateway.chat = make_fake_chat(latency, calls)
+    start = time.perf_counter()
+    await path(prompt)
+    return len(calls), time.perf_counter() - start
+
+
+async def main(latency):
+    prompts = {
+        "forecasting": "forecast daily sales for the next 30 days",
+        "visualization": "show monthly sales trend",
+    }
+    print(f"Simulated LLM latency per call: {latency:.2f}s\n")
+    print(f"{'scenario':<15}{'path':<10}{'round trips':>12}{'wall time':>12}")
+    for scenario, prompt in prompts.items():
+        legacy_calls, legacy_time = await measure(legacy_path, prompt, latency)
+        planned_calls, planned_time = await measure(planned_path, prompt, latency)
+        print(f"{scenario:<15}{'legacy':<10}{legacy_calls:>12}{legacy_time:>11.2f}s")
+        print(f"{scenario:<15}{'planned':<10}{planned_calls:>12}{planned_time:>11.2f}s")
+        print(f"{'':<15}{'saved':<10}{legacy_calls - planned_calls:>12}{legacy_time - planned_time:>11.2f}s\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=1.5, help="Simulated seconds per LLM call")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency))
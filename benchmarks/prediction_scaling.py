@@ -0,0 +1,94 @@
+"""
+Runtime and memory of the prediction engine as the row count grows.
+
+Streams `SELECT ... LIMIT n` from an in-memory sqlite3 table through
+fit_regression_batches (co-moment normal equations built batch by batch)
+and compares it with the materializing approach: fetch_bounded the whole
+result, build the matrix and np.linalg.lstsq. Memory is the tracemalloc
+peak of a separate run; the coefficient error is against the generating
+coefficients.
+
+Usage:
+    python benchmarks/prediction_scaling.py [--sizes 10000,100000,1000000] [--features 8]
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+from app.prediction import PREDICTION_FETCH_BATCH, fit_regression_batches  # noqa: E402
+from app.result_fetch import fetch_bounded, iter_batches  # noqa: E402
+
+
+def build_database(rows, features, rng):
+    coefficients = rng.uniform(-5, 5, features)
+    # Features with large offsets and scales, as real measures have
+    x = rng.normal(0, 1, (rows, features)) * 10.0 ** rng.integers(0, 4, features) + rng.uniform(0, 1e4, features)
+    y = x @ coefficients + 42 + rng.normal(0, 1, rows)
+
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    names = [f"x{i}" for i in range(features)]
+    connection.execute(f"CREATE TABLE samples (label TEXT, {', '.join(f'{n} REAL' for n in names)}, target REAL)")
+    placeholders = ", ".join("?" for _ in range(features + 2))
+    connection.executemany(
+        f"INSERT INTO samples VALUES ({placeholders})",
+        ((f"row {i}", *row, target) for i, (row, target) in enumerate(zip(x.tolist(), y.tolist()))),
+    )
+    connection.commit()
+    return connection, coefficients
+
+
+def streaming_fit(connection, sql):
+    return fit_regression_batches(iter_batches(connection, sql, PREDICTION_FETCH_BATCH))["coefficients"]
+
+
+def materialized_fit(connection, sql):
+    result = fetch_bounded(connection, sql, max_rows=10 ** 9, max_bytes=2 ** 62)
+    matrix = np.array(result.values[1:], dtype=float).T
+    design = np.column_stack([matrix[:, :-1], np.ones(len(matrix))])
+    return np.linalg.lstsq(design, matrix[:, -1], rcond=None)[0][:-1]
+
+
+def measure(fit, connection, sql):
+    started = time.perf_counter()
+    coefficients = fit(connection, sql)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    fit(connection, sql)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2 ** 20, coefficients
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", default="10000,100000,1000000")
+    parser.add_argument("--features", type=int, default=8)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(",")]
+
+    rng = np.random.default_rng(5)
+    started = time.perf_counter()
+    connection, truth = build_database(max(sizes), args.features, rng)
+    print(f"Loaded {max(sizes):,} rows x {args.features} features in {time.perf_counter() - started:.1f}s\n")
+
+    print(f"{'rows':>9}  {'path':<13}{'seconds':>9}{'rows/s':>12}{'peak MiB':>10}{'max coef err':>14}")
+    for n in sizes:
+        sql = f"SELECT * FROM samples LIMIT {n}"
+        for name, fit in (("streaming", streaming_fit), ("materialized", materialized_fit)):
+            elapsed, peak, coefficients = measure(fit, connection, sql)
+            error = np.max(np.abs(coefficients - truth))
+            print(f"{n:>9}  {name:<13}{elapsed:>9.2f}{n / elapsed:>12,.0f}{peak:>10.1f}{error:>14.2e}")
+
+
+if __name__ == "__main__":
+    main()
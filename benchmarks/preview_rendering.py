@@ -0,0 +1,113 @@
+"""
+Compares the Data tab preview paths per table: the old pandas path
+(pd.read_sql + DataFrame.to_html) against rendering straight from the DB-API
+cursor with iter_preview_html / preview_to_json.
+
+Uses an in-memory sqlite3 database so only the client-side work is measured.
+Latency is the mean over --repeat runs; memory is the tracemalloc peak of one run.
+
+Usage:
+    python benchmarks/preview_rendering.py [--tables 50] [--columns 12] [--rows 5] [--repeat 20]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+from app.preview_service import PREVIEW_FETCH_BATCH, iter_preview_html, preview_to_json  # noqa: E402
+
+
+def build_database(table_count, column_count):
+    connection = sqlite3.connect(":memory:", check_same_thread=False)
+    for t in range(table_count):
+        columns = ", ".join(f"c{i} {'TEXT' if i % 3 else 'REAL'}" for i in range(column_count))
+        connection.execute(f"CREATE TABLE t{t} ({columns})")
+        placeholders = ", ".join("?" for _ in range(column_count))
+        connection.executemany(
+            f"INSERT INTO t{t} VALUES ({placeholders})",
+            [[r * 1.5 if i % 3 == 0 else f"<value {r}-{i} & more>" for i in range(column_count)] for r in range(50)],
+        )
+    connection.commit()
+    return connection
+
+
+def pandas_path(connection, table, rows):
+    import pandas as pd
+
+    df = pd.read_sql(f"SELECT * FROM {table} LIMIT {rows}", connection)
+    return df.to_html(classes="table table-sm table-bordered", index=False)
+
+
+def cursor_html_path(connection, table, rows):
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT * FROM {table} LIMIT {rows}")
+    columns = [desc[0] for desc in cursor.description]
+    html = "".join(iter_preview_html(columns, cursor))
+    cursor.close()
+    return html
+
+
+def cursor_json_path(connection, table, rows):
+    # The NDJSON lines the rows endpoint streams: columns, then one line per fetched batch
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT * FROM {table} LIMIT {rows}")
+    lines = [json.dumps({"columns": [desc[0] for desc in cursor.description]})]
+    while True:
+        batch = cursor.fetchmany(PREVIEW_FETCH_BATCH)
+        if not batch:
+            break
+        lines.append(json.dumps(preview_to_json({"rows": batch})))
+    cursor.close()
+    return "\n".join(lines)
+
+
+def measure(path, connection, tables, rows, repeat):
+    path(connection, tables[0], rows)  # warm-up (and, for pandas, the import)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for table in tables:
+            path(connection, table, rows)
+    per_table_ms = (time.perf_counter() - start) * 1000 / (repeat * len(tables))
+
+    tracemalloc.start()
+    for table in tables:
+        path(connection, table, rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_table_ms, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=50)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--rows", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    connection = build_database(args.tables, args.columns)
+    tables = [f"t{t}" for t in range(args.tables)]
+
+    start = time.perf_counter()
+    import pandas  # noqa: F401
+    pandas_import_ms = (time.perf_counter() - start) * 1000
+
+    print(f"{args.tables} tables x {args.columns} columns, {args.rows} preview rows\n")
+    print(f"{'path':<22}{'ms/table':>10}{'peak KiB':>10}")
+    for name, path in (("pandas read_sql+html", pandas_path), ("cursor -> html", cursor_html_path), ("cursor -> json", cursor_json_path)):
+        per_table_ms, peak_kib = measure(path, connection, tables, args.rows, args.repeat)
+        print(f"{name:<22}{per_table_ms:>10.3f}{peak_kib:>10.1f}")
+    print(f"\nOne-off pandas import avoided on the request path: {pandas_import_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Compares the markdown and compact SCHEMA_FORMAT serializations: schema size in
+tokens, and end-to-end generate_sql_from_prompt latency with the prompt that is
+actually sent (after pruning).
+
+The LLM is simulated with a fixed latency plus a per-prompt-token prefill cost,
+so the latency difference only reflects prompt size.
+
+Usage:
+    python benchmarks/schema_format_tokens.py [--tables 60] [--base-latency 0.4] [--ms-per-1k-tokens 80]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+os.environ["SQL_CACHE_ENABLED"] = "false"
+
+from app import generatefuncs  # noqa: E402
+from app.dependencies import describe_table  # noqa: E402
+from app.llm_gateway import llm_gateway  # noqa: E402
+from app.schema_index import estimate_tokens  # noqa: E402
+
+QUESTIONS = [
+    "Total order amount per customer country last month",
+    "Top 10 products by revenue",
+    "Show daily signups for the last quarter",
+]
+
+COLUMN_TYPES = [
+    ("integer", lambda rng: rng.randint(1, 100000)),
+    ("character varying", lambda rng: rng.choice(["Alice Johnson", "ACME Corporation Ltd", "north-east", "pending"])),
+    ("numeric", lambda rng: Decimal(f"{rng.uniform(0, 5000):.2f}")),
+    ("timestamp without time zone", lambda rng: datetime(2024, 1, 1) + timedelta(minutes=rng.randint(0, 500000))),
+    ("date", lambda rng: date(2024, 1, 1) + timedelta(days=rng.randint(0, 365))),
+    ("boolean", lambda rng: rng.random() > 0.5),
+    ("text", lambda rng: "Lorem ipsum dolor sit amet, consectetur adipiscing elit " * 2),
+]
+NAMES = ["customer", "order", "product", "signup", "invoice", "supplier", "shipment", "payment", "region", "event"]
+
+
+def build_tables(table_count, rng):
+    tables = []
+    for i in range(table_count):
+        name = f"{NAMES[i % len(NAMES)]}s" if i < len(NAMES) else f"{rng.choice(NAMES)}_history_{i}"
+        columns, generators = [(f"{name.rstrip('s')}_id", "integer")], [COLUMN_TYPES[0][1]]
+        for j in range(rng.randint(4, 12)):
+            dtype, generator = rng.choice(COLUMN_TYPES)
+            columns.append((f"{rng.choice(NAMES)}_{j}", dtype))
+            generators.append(generator)
+        rows = [{col: gen(rng) for (col, _), gen in zip(columns, generators)} for _ in range(3)]
+        foreign_keys = [(columns[1][0], "customers", "customer_id")] if i and rng.random() < 0.3 else None
+        tables.append((name, columns, {"rows": rows}, foreign_keys))
+    return tables
+
+
+def render(tables, schema_format):
+    return "\n".join(
+        describe_table(None, None, name, columns, sample, foreign_keys, schema_format=schema_format)
+        for name, columns, sample, foreign_keys in tables
+    )
+
+
+def make_fake_complete(base_latency, seconds_per_token, sent_tokens):
+    async def fake_complete(prompt, timeout=None, **kwargs):
+        tokens = estimate_tokens(prompt)
+        sent_tokens.append(tokens)
+        await asyncio.sleep(base_latency + tokens * seconds_per_token)
+        return 'SELECT 1'
+    return fake_complete
+
+
+async def measure(schema, base_latency, seconds_per_token):
+    sent_tokens = []
+    llm_gateway.complete = make_fake_complete(base_latency, seconds_per_token, sent_tokens)
+    start = time.perf_counter()
+    for question in QUESTIONS:
+        await generatefuncs.generate_sql_from_prompt(question, schema, "postgresql")
+    elapsed = (time.perf_counter() - start) / len(QUESTIONS)
+    return sum(sent_tokens) / len(sent_tokens), elapsed
+
+
+async def main(args):
+    tables = build_tables(args.tables, random.Random(7))
+    seconds_per_token = args.ms_per_1k_tokens / 1000 / 1000
+
+    print(f"{args.tables} tables; simulated LLM: {args.base_latency:.2f}s + {args.ms_per_1k_tokens:.0f} ms per 1k prompt tokens\n")
+    print(f"{'format':<10}{'schema tokens':>15}{'prompt tokens':>15}{'latency/question':>18}")
+    results = {}
+    for schema_format in ("markdown", "compact"):
+        schema = render(tables, schema_format)
+        prompt_tokens, latency = await measure(schema, args.base_latency, seconds_per_token)
+        results[schema_format] = estimate_tokens(schema)
+        print(f"{schema_format:<10}{results[schema_format]:>15}{prompt_tokens:>15.0f}{latency:>17.3f}s")
+
+    print(f"\nCompact schema is {1 - results['compact'] / results['markdown']:.1%} smaller")
+    print("\nSample compact line:\n" + render(tables[:1], "compact"))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=60)
+    parser.add_argument("--base-latency", type=float, default=0.4, help="Simulated seconds per LLM call")
+    parser.add_argument("--ms-per-1k-tokens", type=float, default=80, help="Simulated prefill cost")
+    asyncio.run(main(parser.parse_args()))
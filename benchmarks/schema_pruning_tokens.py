@@ -0,0 +1,105 @@
+"""
+Measures how much of the schema prompt prune_schema removes on a large
+synthetic database, whether the tables a question needs survive, and how
+long building and querying the BM25 index takes.
+
+Usage:
+    python benchmarks/schema_pruning_tokens.py [--tables 400]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Any valid Fernet key; the benchmark never encrypts anything
+os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+from app.dependencies import describe_table  # noqa: E402
+from app.schema_index import SchemaIndex, estimate_tokens, prune_schema, schema_index_cache  # noqa: E402
+
+# (question, tables the SQL needs)
+QUESTIONS = [
+    ("Total order amount per customer country last month", {"orders", "customers"}),
+    ("Top 10 products by revenue from order items", {"order_items", "products"}),
+    ("Average invoice payment delay by supplier", {"invoices", "suppliers"}),
+    ("Forecast daily shipments for the next 30 days", {"shipments"}),
+    ("Show employee headcount by department", {"employees", "departments"}),
+]
+
+CORE_TABLES = {
+    "customers": [("customer_id", "integer"), ("name", "text"), ("country", "text"), ("created_at", "timestamp")],
+    "orders": [("order_id", "integer"), ("customer_id", "integer"), ("order_date", "date"), ("amount", "numeric")],
+    "order_items": [("order_item_id", "integer"), ("order_id", "integer"), ("product_id", "integer"), ("quantity", "integer"), ("revenue", "numeric")],
+    "products": [("product_id", "integer"), ("product_name", "text"), ("category", "text"), ("price", "numeric")],
+    "suppliers": [("supplier_id", "integer"), ("supplier_name", "text"), ("country", "text")],
+    "invoices": [("invoice_id", "integer"), ("supplier_id", "integer"), ("issued_at", "date"), ("paid_at", "date"), ("payment_delay_days", "integer")],
+    "shipments": [("shipment_id", "integer"), ("order_id", "integer"), ("shipped_at", "date"), ("carrier", "text")],
+    "employees": [("employee_id", "integer"), ("department_id", "integer"), ("full_name", "text"), ("hired_at", "date")],
+    "departments": [("department_id", "integer"), ("department_name", "text")],
+}
+CORE_FOREIGN_KEYS = {
+    "orders": [("customer_id", "customers", "customer_id")],
+    "order_items": [("order_id", "orders", "order_id"), ("product_id", "products", "product_id")],
+    "invoices": [("supplier_id", "suppliers", "supplier_id")],
+    "shipments": [("order_id", "orders", "order_id")],
+    "employees": [("department_id", "departments", "department_id")],
+}
+
+FILLER_WORDS = [
+    "audit", "config", "feature", "flag", "session", "token", "webhook", "queue", "metric", "log",
+    "tenant", "role", "permission", "asset", "ticket", "campaign", "lead", "survey", "badge", "quota",
+]
+
+
+def build_schema(table_count, rng):
+    blocks = []
+    for table, columns in CORE_TABLES.items():
+        sample = {"rows": [{col: f"{col}_{i}" for col, _ in columns} for i in range(3)]}
+        blocks.append(describe_table(None, None, table, columns, sample, CORE_FOREIGN_KEYS.get(table)))
+
+    for i in range(table_count - len(CORE_TABLES)):
+        name = f"{rng.choice(FILLER_WORDS)}_{rng.choice(FILLER_WORDS)}_{i}"
+        columns = [("id", "integer")] + [
+            (f"{rng.choice(FILLER_WORDS)}_{j}", rng.choice(["text", "integer", "timestamp", "boolean"]))
+            for j in range(rng.randint(4, 15))
+        ]
+        sample = {"rows": [{col: f"v{k}" for col, _ in columns[:6]} for k in range(3)]}
+        blocks.append(describe_table(None, None, name, columns, sample))
+
+    rng.shuffle(blocks)
+    return "\n".join(blocks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tables", type=int, default=400)
+    args = parser.parse_args()
+
+    schema = build_schema(args.tables, random.Random(42))
+    full_tokens = estimate_tokens(schema)
+
+    start = time.perf_counter()
+    index = SchemaIndex(schema)
+    build_ms = (time.perf_counter() - start) * 1000
+    schema_index_cache.get_index(schema)
+
+    print(f"Schema: {len(index.tables)} tables, ~{full_tokens} tokens; index built in {build_ms:.1f} ms\n")
+    print(f"{'question':<55} {'tables':>6} {'tokens':>7} {'kept':>6} {'recall':>6} {'ms':>6}")
+    for question, needed in QUESTIONS:
+        start = time.perf_counter()
+        pruned = prune_schema(schema, question)
+        prune_ms = (time.perf_counter() - start) * 1000
+        kept = {block["table"] for block in SchemaIndex(pruned).blocks}
+        tokens = estimate_tokens(pruned)
+        recall = len(needed & kept) / len(needed)
+        print(f"{question[:55]:<55} {len(kept):>6} {tokens:>7} {tokens / full_tokens:>6.1%} {recall:>6.0%} {prune_ms:>6.2f}")
+
+    stats = schema_index_cache.stats()
+    print(f"\nOverall prompt token reduction: {stats['reduction']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
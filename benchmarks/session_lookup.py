@@ -0,0 +1,60 @@
+"""
+Latency of session lookups (every authenticated request makes one).
+
+Creates --sessions logins in a SQLite app database, then looks them up
+--lookups times through the session store, once with the in-process cache
+and once with it disabled (every lookup hits the `user_sessions` table).
+
+Usage:
+    python benchmarks/session_lookup.py [--sessions 200] [--lookups 20000] [--db /tmp/sessions.db]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--lookups", type=int, default=20000)
+    parser.add_argument("--db", default=os.path.join(tempfile.mkdtemp(), "sessions.db"))
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{args.db}")
+    # Any valid Fernet key; the benchmark never encrypts anything
+    os.environ.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+
+    import app.models.dashboards, app.models.query_history, app.models.user, app.models.user_connection  # noqa: E401,F401
+    from app.database import Base, engine
+    from app.session_manager import (
+        SESSION_CACHE_MAX_ENTRIES, SESSION_CACHE_TTL_SECONDS, SESSION_TTL_SECONDS,
+        DatabaseSessionBackend, SessionStore,
+    )
+    Base.metadata.create_all(bind=engine)
+
+    backend = DatabaseSessionBackend()
+    cached = SessionStore(backend, SESSION_TTL_SECONDS, SESSION_CACHE_TTL_SECONDS, SESSION_CACHE_MAX_ENTRIES)
+    uncached = SessionStore(backend, SESSION_TTL_SECONDS, 0, SESSION_CACHE_MAX_ENTRIES)
+
+    started = time.perf_counter()
+    session_ids = [cached.create(user_id) for user_id in range(args.sessions)]
+    print(f"Created {args.sessions:,} sessions in {time.perf_counter() - started:.2f}s ({engine.url})\n")
+
+    rng = random.Random(3)
+    lookups = [rng.choice(session_ids) for _ in range(args.lookups)]
+    for name, store in (("cached", cached), ("database only", uncached)):
+        started = time.perf_counter()
+        for session_id in lookups:
+            assert store.get_user_id(session_id) is not None
+        elapsed = time.perf_counter() - started
+        stats = store.stats()
+        print(f"{name:<14}{elapsed / args.lookups * 1e6:>9.1f} us/lookup   cache hit rate {stats['cache_hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
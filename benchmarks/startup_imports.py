@@ -0,0 +1,116 @@
+"""
+Cold-start check for the web app: reports where `import main` spends its time
+and fails (exit code 1) when startup goes over budget or a heavy analytics
+dependency is imported eagerly again.
+
+Each measurement runs `import main` in a fresh interpreter, so nothing is
+cached in-process. The report comes from `python -X importtime`.
+
+Usage:
+    python benchmarks/startup_imports.py [--budget 1.5] [--runs 5] [--top 25]
+
+The budget defaults to STARTUP_BUDGET_SECONDS (1.5s).
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "1.5"))
+
+# Must only be imported when a forecast / LLM call / preview actually needs them
+LAZY_MODULES = ["prophet", "pandas", "matplotlib", "openai", "psycopg"]
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+TIMING_SNIPPET = (
+    "import sys, time\n"
+    "start = time.perf_counter()\n"
+    "import main\n"
+    "elapsed = time.perf_counter() - start\n"
+    f"lazy = [m for m in {LAZY_MODULES!r} if m in sys.modules]\n"
+    "print(elapsed, ','.join(lazy))\n"
+)
+
+
+def _env():
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    # Any valid Fernet key; nothing is encrypted
+    env.setdefault("ENCRYPTION_KEY", "YmVuY2htYXJrLWtleS1ub3QtZm9yLXByb2R1Y3Rpb24=")
+    return env
+
+
+def measure_cold_start():
+    """Returns (seconds to import main, eagerly imported lazy modules) from a fresh interpreter."""
+    output = subprocess.run(
+        [sys.executable, "-c", TIMING_SNIPPET], cwd=ROOT, env=_env(), capture_output=True, text=True, check=True
+    ).stdout.strip().splitlines()[-1]
+    elapsed, lazy = output.split(" ", 1) if " " in output else (output, "")
+    return float(elapsed), [m for m in lazy.split(",") if m]
+
+
+def import_report():
+    """
+    Returns:
+        tuple: ([(cumulative_us, self_us, module)], { top-level package: self_us })
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=ROOT, env=_env(), capture_output=True, text=True, check=True
+    ).stderr
+
+    modules = []
+    by_package = defaultdict(int)
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, _, module = match.groups()
+        modules.append((int(cumulative_us), int(self_us), module))
+        by_package[module.split(".")[0]] += int(self_us)
+    return modules, by_package
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=STARTUP_BUDGET_SECONDS, help="Max median seconds for `import main`")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25, help="Modules to list in the report")
+    args = parser.parse_args()
+
+    modules, by_package = import_report()
+    print(f"Top {args.top} modules by cumulative import time:")
+    print(f"{'cumulative ms':>14}{'self ms':>10}  module")
+    for cumulative_us, self_us, module in sorted(modules, reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f}{self_us / 1000:>10.1f}  {module}")
+
+    print(f"\nTop {args.top} packages by total self time:")
+    for package, self_us in sorted(by_package.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{self_us / 1000:>14.1f}  {package}")
+
+    timings, eager = [], set()
+    for _ in range(args.runs):
+        elapsed, lazy = measure_cold_start()
+        timings.append(elapsed)
+        eager.update(lazy)
+    median = statistics.median(timings)
+    print(f"\nCold start (import main): median {median:.3f}s over {args.runs} runs, budget {args.budget:.3f}s")
+
+    failed = False
+    if median > args.budget:
+        print(f"FAIL: cold start is {median - args.budget:.3f}s over budget")
+        failed = True
+    if eager:
+        print(f"FAIL: imported at startup but should be lazy: {', '.join(sorted(eager))}")
+        failed = True
+    if not failed:
+        print("OK")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
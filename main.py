@@ -3,6 +3,9 @@ from app.api import signup  # import your signup module
 from app.database import Base, engine
 from app.models.user import User  # Ensure this import exists
 from app.models.user_connection import UserConnection 
+from app.models.sql_cache import SqlCacheEntry
+from app.models.schema_catalog import SchemaCatalogTable
+from app.models.user_session import UserSession
 from fastapi.staticfiles import StaticFiles
 from app.api import login  # import your login module
 from app.api import logout  # Uncomment if you have a logout module
@@ -21,6 +24,10 @@ from app.api import delete
 from app.api import thumbnail
 from app.api import askai
 from app.api import wip
+from app.llm_gateway import llm_gateway
+from app.connection_pool import pool_registry
+from app.dependencies import bootstrap_executor
+from app.forecast_executor import forecast_executor
 from starlette.middleware.base import BaseHTTPMiddleware
 from fastapi.responses import RedirectResponse
 from fastapi import Request
@@ -72,4 +79,28 @@ app.include_router(thumbnail.router)
 app.include_router(askai.router)
 app.include_router(wip.router)
 
+
+@app.on_event("shutdown")
+async def close_llm_gateway():
+    await llm_gateway.aclose()
+
+
+@app.on_event("shutdown")
+def close_connection_pools():
+    # Stop pending bootstraps first so they don't open connections into closed pools
+    bootstrap_executor.shutdown(wait=False, cancel_futures=True)
+    pool_registry.close_all()
+
+
+@app.on_event("startup")
+def start_forecast_workers():
+    # Spawns the workers in the background; startup doesn't wait for Prophet to load
+    forecast_executor.start()
+
+
+@app.on_event("shutdown")
+def stop_forecast_workers():
+    forecast_executor.shutdown()
+
+
 Base.metadata.create_all(bind=engine)
\ No newline at end of file
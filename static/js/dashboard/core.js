@@ -25,10 +25,11 @@ async function generateDashboard() {
   };
 
   try {
-    const response = await fetch('/dashboard/generate', {
+    const response = await fetch('/dashboard/generate/stream', {
       method: 'POST',
       headers: {
-        'Content-Type': 'application/json'
+        'Content-Type': 'application/json',
+        'Accept': 'text/event-stream'
       },
       body: JSON.stringify(payload)
     });
@@ -37,26 +38,30 @@ async function generateDashboard() {
       throw new Error(`Server responded with status ${response.status}`);
     }
 
-    const result = await response.json();
-    
-
-    if (result.status === 'success') {
-      const intent = result.intent;
-      const outputFormat = result.output_format || 'visual';
-
-      if (intent === 'forecasting') {
-        if (outputFormat === 'visual' || outputFormat === 'both') {
-          renderChartToCanvas(result.echarts_config, "line");
-        }
-        if (outputFormat === 'text' || outputFormat === 'both') {
-          renderTextOutput(result.forecast);
-        }
-      } else if (intent === 'visualization') {
-        renderChartToCanvas(result.echarts_config, result.chart_type);
-      } else {
-        alert('Unsupported intent. Please try again.');
+    // Render progressively as each pipeline stage arrives
+    resetGenerateProgress();
+    let intent = null;
+    let result = null;
+    await readGenerateStream(response, (event, data) => {
+      if (event === 'intent') {
+        intent = data.intent;
+        generateBtn.innerHTML = `<span class="btn-icon">⏳</span> Writing query...`;
+      } else if (event === 'sql') {
+        showGeneratedSql(data.sql);
+        generateBtn.innerHTML = `<span class="btn-icon">⏳</span> Running query...`;
+      } else if (event === 'rows') {
+        showRowsPreview(data);
+        generateBtn.innerHTML = `<span class="btn-icon">⏳</span> ${data.row_count} rows, building chart...`;
+      } else if (event === 'chart') {
+        renderGeneratedChart(intent, data);
+      } else if (event === 'done') {
+        result = data;
+      } else if (event === 'error') {
+        result = { status: 'failed', error: data.error };
       }
-    } else {
+    });
+
+    if (!result || result.status !== 'success') {
       alert('Dashboard generation failed. Please try again.');
     }
 
@@ -72,6 +77,90 @@ async function generateDashboard() {
 
 
 
+// Draws the chart as soon as the stream's chart event arrives
+function renderGeneratedChart(intent, data) {
+  const outputFormat = data.output_format || 'visual';
+
+  if (intent === 'forecasting') {
+    if (outputFormat === 'visual' || outputFormat === 'both') {
+      renderChartToCanvas(data.echarts_config, "line");
+    }
+    if (outputFormat === 'text' || outputFormat === 'both') {
+      renderTextOutput(data.forecast);
+    }
+  } else if (['visualization', 'anomaly_detection', 'clustering', 'prediction'].includes(intent)) {
+    renderChartToCanvas(data.echarts_config, data.chart_type);
+  } else {
+    alert('Unsupported intent. Please try again.');
+  }
+}
+
+
+function resetGenerateProgress() {
+  document.getElementById('generatedSql').textContent = '';
+  document.getElementById('rowsPreview').replaceChildren();
+  document.getElementById('generateProgress').style.display = 'none';
+}
+
+
+function showGeneratedSql(sql) {
+  document.getElementById('generatedSql').textContent = sql;
+  document.getElementById('generateProgress').style.display = 'block';
+}
+
+
+// Row count plus the first rows of the result, as a small table
+function showRowsPreview(data) {
+  const container = document.getElementById('rowsPreview');
+  const summary = document.createElement('p');
+  summary.textContent = `${data.row_count} rows${data.truncated ? ' (truncated)' : ''}`;
+
+  const table = document.createElement('table');
+  const header = table.createTHead().insertRow();
+  data.columns.forEach(column => {
+    const th = document.createElement('th');
+    th.textContent = column;
+    header.appendChild(th);
+  });
+  const body = table.createTBody();
+  data.preview.forEach(record => {
+    const row = body.insertRow();
+    data.columns.forEach(column => {
+      row.insertCell().textContent = record[column] ?? '';
+    });
+  });
+
+  container.replaceChildren(summary, table);
+  document.getElementById('generateProgress').style.display = 'block';
+}
+
+
+// Parses a text/event-stream response body and calls onEvent(event, data) per message
+async function readGenerateStream(response, onEvent) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+
+      let event = 'message';
+      let data = '';
+      for (const line of message.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) data += line.slice(5).trim();
+      }
+      if (data) onEvent(event, JSON.parse(data));
+    }
+  }
+}
 
 
 function applyCustomSize() {
@@ -73,12 +73,17 @@ export function renderChartToCanvas(chartData, chartType = 'bar', shouldSave = t
               ? chartData.seriesData[0].borderColor 
               : chartData.seriesData[0].borderColor || 'rgba(54, 162, 235, 1)'),
         borderWidth: 1,
-        pointBackgroundColor: 'rgba(54, 162, 235, 1)',
+        // Per-point arrays flag individual points (e.g. anomalies)
+        pointBackgroundColor: chartData.seriesData[0]?.pointBackgroundColor || 'rgba(54, 162, 235, 1)',
+        pointRadius: chartData.seriesData[0]?.pointRadius ?? 3,
         tension: chartType === 'line' ? 0.4 : 0
-      }]
+      }, ...extraDatasets(chartData, chartType, backgroundColors)]
     },
     options: getChartOptions(chartType, chartTitle, chartData.xAxisLabel || '', chartData.yAxisLabel || '')
   };
+  if (config.data.datasets.length > 1) {
+    config.options.plugins.legend.display = true;
+  }
 
   const chart = new Chart(canvas, config);
   chartContainer._chartInstance = chart;
@@ -109,6 +114,24 @@ export function renderChartToCanvas(chartData, chartType = 'bar', shouldSave = t
 }
 
 
+// Further series (e.g. actual next to predicted values) drawn over the first one
+function extraDatasets(chartData, chartType, backgroundColors) {
+  if (chartType === 'pie' || chartType === 'scatter') return [];
+  return chartData.seriesData.slice(1).map((series, index) => {
+    const color = backgroundColors[(index + 1) % backgroundColors.length];
+    return {
+      label: series.name || `Series ${index + 2}`,
+      data: series.data,
+      backgroundColor: series.backgroundColor || color,
+      borderColor: series.borderColor || color.replace('0.7', '1'),
+      borderWidth: 1,
+      pointBackgroundColor: series.pointBackgroundColor || color,
+      pointRadius: series.pointRadius ?? 3,
+      tension: chartType === 'line' ? 0.4 : 0
+    };
+  });
+}
+
 // Chart options configuration
 function getChartOptions(chartType, title, xAxisLabel = '', yAxisLabel = '') {
   const commonOptions = {
@@ -223,5 +246,33 @@ function getChartOptions(chartType, title, xAxisLabel = '', yAxisLabel = '') {
     };
   }
 
+  if (chartType === 'scatter') {
+    return {
+      ...commonOptions,
+      plugins: {
+        ...commonOptions.plugins,
+        tooltip: {
+          ...commonOptions.plugins.tooltip,
+          callbacks: {
+            label: context => `(${context.raw.x}, ${context.raw.y})`
+          }
+        }
+      },
+      scales: {
+        x: {
+          type: 'linear',
+          title: { display: !!xAxisLabel, text: xAxisLabel, font: { size: 9 } },
+          ticks: { font: { size: 8 } },
+          grid: { color: 'rgba(0, 0, 0, 0.05)' }
+        },
+        y: {
+          title: { display: !!yAxisLabel, text: yAxisLabel, font: { size: 9 } },
+          ticks: { font: { size: 8 } },
+          grid: { color: 'rgba(0, 0, 0, 0.05)' }
+        }
+      }
+    };
+  }
+
   return commonOptions;
 }
\ No newline at end of file
@@ -247,8 +247,17 @@ export function getFullChartConfig(chart) {
         : [dataset.backgroundColor], // Always store as array for consistency
       borderColor: Array.isArray(dataset.borderColor) 
         ? dataset.borderColor 
-        : [dataset.borderColor]
-    }];
+        : [dataset.borderColor],
+      pointBackgroundColor: dataset.pointBackgroundColor,
+      pointRadius: dataset.pointRadius
+    }, ...chart.data.datasets.slice(1).map(extra => ({
+      name: extra.label || '',
+      data: extra.data || [],
+      backgroundColor: extra.backgroundColor,
+      borderColor: extra.borderColor,
+      pointBackgroundColor: extra.pointBackgroundColor,
+      pointRadius: extra.pointRadius
+    }))];
   }
 
 
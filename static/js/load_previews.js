@@ -1,3 +1,16 @@
+// Table previews are fetched in batches once their card scrolls into view
+const PREVIEW_BATCH_SIZE = 12;
+const pendingPreviews = {};   // { connId: [tableBox, ...] }
+let previewFlushTimer = null;
+
+const previewObserver = new IntersectionObserver((entries) => {
+  entries.forEach(entry => {
+    if (!entry.isIntersecting) return;
+    previewObserver.unobserve(entry.target);
+    queuePreview(entry.target);
+  });
+}, { rootMargin: "200px" });
+
 document.addEventListener("DOMContentLoaded", () => {
   const spinner = document.getElementById("loadingSpinner");
   const previewContent = document.getElementById("previewContent");
@@ -6,16 +19,22 @@ document.addEventListener("DOMContentLoaded", () => {
   spinner.style.display = "flex";
   previewContent.style.display = "none";
   
-  // Try to load from cache first
+  // Try to load from cache first (table list only - previews are refetched lazily)
   const cachedContent = sessionStorage.getItem("cachedPreviews");
   if (cachedContent) {
     previewContent.innerHTML = cachedContent;
     previewContent.style.display = "block";
     spinner.style.display = "none";
+    observePreviews(previewContent);
   }
   
   // Then load fresh data (but don't show spinner if we had cache)
   loadPreviews(!cachedContent);
+
+  previewContent.addEventListener("click", (event) => {
+    const button = event.target.closest(".load-more-tables-btn");
+    if (button) loadMoreTables(button);
+  });
   
   // Refresh button handler - will force fresh load
   const refreshBtn = document.getElementById("refreshPreviewsBtn");
@@ -60,6 +79,7 @@ async function loadPreviews(showLoading = true) {
     
     previewContent.innerHTML = html;
     previewContent.style.display = "block";
+    observePreviews(previewContent);
     
   } catch (err) {
     // Try to show cached content if available
@@ -67,6 +87,7 @@ async function loadPreviews(showLoading = true) {
     if (cachedContent) {
       previewContent.innerHTML = cachedContent;
       previewContent.style.display = "block";
+      observePreviews(previewContent);
     } else {
       previewContent.innerHTML = `
         <div class="error-message">
@@ -80,4 +101,142 @@ async function loadPreviews(showLoading = true) {
     spinner.style.display = "none";
     if (refreshBtn) refreshBtn.disabled = false;
   }
-}
\ No newline at end of file
+}
+
+function observePreviews(root) {
+  root.querySelectorAll(".table-box[data-table]").forEach(box => {
+    if (box.querySelector(".preview-pending")) previewObserver.observe(box);
+  });
+  if (typeof applyTranslations === "function") applyTranslations();
+}
+
+function queuePreview(box) {
+  const connId = box.dataset.connId;
+  (pendingPreviews[connId] = pendingPreviews[connId] || []).push(box);
+  // Collect the cards that became visible together into one request
+  clearTimeout(previewFlushTimer);
+  previewFlushTimer = setTimeout(flushPreviews, 50);
+}
+
+function flushPreviews() {
+  Object.keys(pendingPreviews).forEach(connId => {
+    const boxes = pendingPreviews[connId];
+    delete pendingPreviews[connId];
+    for (let i = 0; i < boxes.length; i += PREVIEW_BATCH_SIZE) {
+      fetchPreviewBatch(connId, boxes.slice(i, i + PREVIEW_BATCH_SIZE));
+    }
+  });
+}
+
+async function fetchPreviewBatch(connId, boxes) {
+  const params = new URLSearchParams({ format: "json" });
+  boxes.forEach(box => params.append("table", box.dataset.table));
+  const boxByTable = new Map(boxes.map(box => [box.dataset.table, box]));
+
+  try {
+    const res = await fetch(`/dashboard/data/previews/${connId}/rows?${params}`, { credentials: "include" });
+    if (!res.ok) {
+      const data = await res.json().catch(() => ({}));
+      throw new Error(data.error || res.statusText);
+    }
+
+    // Each table arrives as columns, row batches and done (or an error), interleaved with other tables
+    await readPreviewStream(res, (chunk) => {
+      const box = boxByTable.get(chunk.table);
+      if (!box) return;
+      if (chunk.columns) {
+        showPreview(box, { columns: chunk.columns, rows: [] });
+      } else if (chunk.rows) {
+        appendPreviewRows(box, chunk.rows);
+      } else if (chunk.done || chunk.error) {
+        boxByTable.delete(chunk.table);
+        if (chunk.error) showPreview(box, chunk);
+      }
+    });
+  } catch (err) {
+    boxByTable.forEach(box => showPreview(box, { error: `Failed to load preview: ${err.message}` }));
+    return;
+  }
+  boxByTable.forEach(box => showPreview(box, { error: "No preview returned" }));
+}
+
+async function readPreviewStream(response, onPreview) {
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { value, done } = await reader.read();
+    buffer += decoder.decode(value || new Uint8Array(), { stream: !done });
+    const lines = buffer.split("\n");
+    buffer = lines.pop();
+    lines.filter(line => line.trim()).forEach(line => onPreview(JSON.parse(line)));
+    if (done) break;
+  }
+  if (buffer.trim()) onPreview(JSON.parse(buffer));
+}
+
+function showPreview(box, preview) {
+  const content = box.querySelector(".table-content");
+  content.classList.remove("preview-pending");
+  content.replaceChildren(preview.error ? previewError(preview.error) : previewTable(preview.columns, preview.rows));
+}
+
+function previewError(message) {
+  const p = document.createElement("p");
+  p.textContent = `⚠️ ${message}`;
+  return p;
+}
+
+function appendPreviewRows(box, rows) {
+  const body = box.querySelector(".table-content tbody");
+  if (body) appendRows(body, rows);
+}
+
+function appendRows(body, rows) {
+  rows.forEach(row => {
+    const tr = body.insertRow();
+    row.forEach(value => { tr.insertCell().textContent = value === null ? "None" : String(value); });
+  });
+}
+
+function previewTable(columns, rows) {
+  // textContent keeps cell values escaped
+  const table = document.createElement("table");
+  table.className = "table table-sm table-bordered";
+  const headRow = table.createTHead().insertRow();
+  columns.forEach(column => {
+    const th = document.createElement("th");
+    th.textContent = column;
+    headRow.appendChild(th);
+  });
+  appendRows(table.createTBody(), rows);
+  return table;
+}
+
+async function loadMoreTables(button) {
+  const section = button.closest(".db-section");
+  const grid = section.querySelector(".tables-grid");
+  button.disabled = true;
+
+  try {
+    const res = await fetch(
+      `/dashboard/data/previews/${section.dataset.connId}/tables?page=${button.dataset.nextPage}`,
+      { credentials: "include" }
+    );
+    const data = await res.json();
+    if (!res.ok) throw new Error(data.error || res.statusText);
+
+    grid.insertAdjacentHTML("beforeend", data.html);
+    observePreviews(grid);
+    if (data.next_page) {
+      button.dataset.nextPage = data.next_page;
+      button.disabled = false;
+    } else {
+      button.remove();
+    }
+  } catch (err) {
+    console.error("Failed to load more tables:", err);
+    button.disabled = false;
+  }
+}